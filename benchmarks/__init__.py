@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+
+"""
+Performance benchmarks for the WhatsApp Archive Manager.
+
+Run individual benchmarks from the repository root, e.g.:
+    python -m benchmarks.bench_renderers
+"""
@@ -0,0 +1,110 @@
+# benchmarks/bench_decoding.py
+
+"""
+Compare ways of decoding a chat export into lines, per encoding: the whole
+file at once (read_text + splitlines), incremental decoding into a list
+(read_lines, as convert_chatfile_to_html does) and streamed line batches
+(iter_line_batches, as the pipelined and JSONL paths do).
+
+Peak memory is measured in a separate pass under tracemalloc. Legacy 8-bit
+encodings cannot hold the generator's emoji and scripts, so their chats are
+generated without unicode noise.
+
+Usage:
+    python -m benchmarks.bench_decoding [--encodings E ...] [--messages N] [--repeat N]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, List
+from src.configuration_and_enums.whatsapp_formats import WhatsAppFormat
+from src.utils.line_reader import iter_line_batches, read_lines
+from src.utils.synthetic_chat import SyntheticChatConfig, SyntheticChatGenerator
+
+UNICODE_ENCODINGS = ('utf-8', 'utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be', 'utf-32')
+
+
+def whole_file(path: Path, encoding: str) -> int:
+    return len(path.read_text(encoding=encoding, errors='replace').splitlines())
+
+
+def incremental(path: Path, encoding: str) -> int:
+    return len(read_lines(path, encoding))
+
+
+def streamed(path: Path, encoding: str) -> int:
+    return sum(len(batch) for batch in iter_line_batches(path, encoding))
+
+
+METHODS: Dict[str, Callable[[Path, str], int]] = {
+    'read_text': whole_file,
+    'read_lines': incremental,
+    'line_batches': streamed,
+}
+
+
+def run_case(encoding: str, config: SyntheticChatConfig, work_dir: Path, repeat: int = 3) -> dict:
+    """Generate one chat in encoding and time every method on it after a warm-up."""
+    if encoding.lower() not in UNICODE_ENCODINGS:
+        config = replace(config, unicode_noise_ratio=0.0)
+    chat_file = work_dir / f"chat_{encoding}.txt"
+    SyntheticChatGenerator(WhatsAppFormat.IOS_US_BRACKET_12H, config).write(chat_file, encoding, newline='\r\n')
+    expected = chat_file.read_text(encoding=encoding, errors='replace').splitlines()
+    if read_lines(chat_file, encoding, chunk_size=4093) != expected:
+        raise AssertionError(f"Incremental decoding of {encoding} differs from read_text")
+
+    methods = {}
+    for name, method in METHODS.items():
+        method(chat_file, encoding)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            method(chat_file, encoding)
+            samples.append(time.perf_counter() - started)
+        tracemalloc.start()
+        try:
+            method(chat_file, encoding)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        methods[name] = {'seconds': statistics.median(samples), 'peak_bytes': peak}
+    return {
+        'encoding': encoding,
+        'input_bytes': chat_file.stat().st_size,
+        'lines': len(expected),
+        'methods': methods,
+    }
+
+
+def format_results(results: List[dict]) -> str:
+    rows = [f"{'encoding':<12} {'size':>9} " + ' '.join(f"{name:>22}" for name in METHODS)]
+    for result in results:
+        cells = [
+            f"{data['seconds'] * 1000:>10.1f}ms {data['peak_bytes'] / (1024 * 1024):>8.1f}MB"
+            for data in result['methods'].values()
+        ]
+        rows.append(f"{result['encoding']:<12} {result['input_bytes'] / (1024 * 1024):>7.1f}MB " + ' '.join(cells))
+    return '\n'.join(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--encodings', nargs='+', default=['utf-8', 'utf-16', 'cp1252'])
+    parser.add_argument('--messages', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = SyntheticChatConfig(messages=args.messages, seed=args.seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = [run_case(encoding, config, Path(work_dir), args.repeat) for encoding in args.encodings]
+    print(format_results(results))
+
+
+if __name__ == '__main__':
+    main()
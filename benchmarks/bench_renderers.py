@@ -0,0 +1,90 @@
+# benchmarks/bench_renderers.py
+
+"""
+Compare message rendering throughput (messages per second) of the
+available MessageHTMLRendererInterface implementations.
+
+Usage:
+    python -m benchmarks.bench_renderers [--messages N] [--participants N] [--repeat N]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+from src.data_models import Message, ChatMetadata
+from src.modules.html_generator import (
+    HTMLGenerator,
+    DefaultMessageHTMLRenderer,
+    PrecomputedMessageHTMLRenderer,
+)
+from src.modules.media_handler import MediaHandler
+
+RENDERERS = {
+    'default': DefaultMessageHTMLRenderer,
+    'precomputed': PrecomputedMessageHTMLRenderer,
+}
+
+
+def build_messages(count: int, participants: List[str], seed: int = 42) -> List[Message]:
+    """Build a deterministic mix of text, call and attachment messages."""
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1, 8, 0, 0)
+    messages = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            content = 'null'
+        elif roll < 0.15:
+            content = f'<attached: {i:08d}-PHOTO-2022-01-01.jpg>'
+        else:
+            content = ' '.join(rng.choice(('ok', 'see you <soon>', 'lol', 'R&D', 'on my way')) for _ in range(rng.randint(1, 12)))
+        messages.append(Message(
+            timestamp=start + timedelta(seconds=i * 7),
+            sender=rng.choice(participants),
+            content=content,
+        ))
+    return messages
+
+
+def measure(renderer_name: str, messages: List[Message], chat_metadata: ChatMetadata,
+            media_handler: MediaHandler, repeat: int) -> tuple:
+    generator = HTMLGenerator(message_renderer=RENDERERS[renderer_name]())
+    best = float('inf')
+    output = ''
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = generator._generate_message_html(messages, chat_metadata, media_handler)
+        best = min(best, time.perf_counter() - started)
+    return len(messages) / best, output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200_000)
+    parser.add_argument('--participants', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    participants = [f'Participant <{i}> & Co' for i in range(args.participants)]
+    messages = build_messages(args.messages, participants)
+    chat_metadata = ChatMetadata(participant_names=set(participants), date_format='', my_name=participants[0])
+
+    with tempfile.TemporaryDirectory() as media_folder:
+        media_handler = MediaHandler(Path(media_folder))
+        results = {
+            name: measure(name, messages, chat_metadata, media_handler, args.repeat)
+            for name in RENDERERS
+        }
+
+    baseline_rate, baseline_output = results['default']
+    for name, (rate, output) in results.items():
+        identical = 'identical' if output == baseline_output else 'DIFFERENT OUTPUT'
+        print(f"{name:>12}: {rate:12,.0f} msg/s  x{rate / baseline_rate:5.2f}  ({identical})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+# benchmarks/bench_stages.py
+
+"""
+Time each conversion stage on synthetic chats in every supported format and
+record the results, plus per-stage peak memory, as JSON (by default in
+benchmarks/results/). The committed baseline is only rewritten by
+regression_gate --update-baseline.
+
+Timings come from the converter's own stage metrics. Peak memory is measured
+in a separate pass under tracemalloc, so tracing does not distort timings.
+A case fails if its parsing or rendering stage handled no messages, since
+its timings would then measure nothing.
+
+Usage:
+    python -m benchmarks.bench_stages [--formats F ...] [--sizes N ...] [--repeat N] [--output PATH]
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.configuration_and_enums.whatsapp_formats import WhatsAppFormat
+from src.main_orchastrator import WhatsAppChatConverter
+from src.utils.custom_logging.decorators import StageMetrics, add_stage_listener, remove_stage_listener
+from src.utils.synthetic_chat import LINE_PREFIXES, SyntheticChatConfig, SyntheticChatGenerator
+
+BASELINE_SCHEMA_VERSION = 1
+DEFAULT_BASELINE = Path(__file__).parent / 'baseline.json'
+DEFAULT_OUTPUT = Path(__file__).parent / 'results' / 'stages.json'
+
+# Converter stage names reported under each benchmark stage
+STAGES: Dict[str, tuple] = {
+    'detection': ('encoding_detection', 'format_detection', 'date_order_resolution'),
+    'grouping': ('grouping',),
+    'parsing': ('parsing',),
+    'rendering': ('rendering',),
+}
+# Benchmark stages whose items are messages; a case where one of them saw none measured nothing
+MESSAGE_STAGES = ('parsing', 'rendering')
+
+
+def run_case(
+    whatsapp_format: WhatsAppFormat,
+    config: SyntheticChatConfig,
+    work_dir: Path,
+    repeat: int = 3,
+    memory: bool = True
+) -> dict:
+    """Generate one chat, convert it repeat times after a warm-up and return its per-stage results."""
+    chat_file = work_dir / f"{whatsapp_format.value}_{config.messages}.txt"
+    lines = SyntheticChatGenerator(whatsapp_format, config).write(chat_file)
+    output_path = work_dir / f"{chat_file.stem}.html"
+    converter = WhatsAppChatConverter()
+
+    # Untimed warm-up run so imports, regex compilation and the page cache do not skew the first sample
+    converter.convert_chatfile_to_html(chat_file, output_path)
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    items: Dict[str, int] = {}
+    calibration: List[float] = []
+    for _ in range(repeat):
+        calibration.append(calibrate())
+        converter.convert_chatfile_to_html(chat_file, output_path)
+        by_name = {stage['name']: stage for stage in converter.last_metrics.stages}
+        for stage, names in STAGES.items():
+            samples[stage].append(sum(by_name[name]['wall_seconds'] for name in names if name in by_name))
+            items[stage] = by_name.get(names[-1], {}).get('items', 0)
+
+    empty = [stage for stage in MESSAGE_STAGES if not items[stage]]
+    if empty:
+        raise ValueError(f"{' and '.join(empty)} processed 0 of {config.messages:,} messages")
+
+    peaks = measure_peak_memory(converter, chat_file, output_path) if memory else {}
+    stages = {}
+    for stage, stage_samples in samples.items():
+        median = statistics.median(stage_samples)
+        stages[stage] = {
+            'seconds': median,
+            'mad_seconds': median_absolute_deviation(stage_samples),
+            'samples': stage_samples,
+            'items': items[stage],
+            'items_per_second': items[stage] / median if median else 0.0,
+            'peak_bytes': peaks.get(stage),
+        }
+    return {
+        'format': whatsapp_format.value,
+        'messages': config.messages,
+        'lines': lines,
+        'input_bytes': chat_file.stat().st_size,
+        'calibration_seconds': statistics.median(calibration),
+        'stages': stages,
+    }
+
+
+def calibrate(iterations: int = 200_000) -> float:
+    """
+    Time a fixed pure-Python workload.
+
+    Run next to each trial, it tells how fast the machine was at that moment
+    so results from other machines or busy periods can be compared.
+    """
+    started = time.perf_counter()
+    total = 0
+    for i in range(iterations):
+        total += i * i % 7
+    return time.perf_counter() - started
+
+
+def median_absolute_deviation(samples: List[float]) -> float:
+    """Spread of samples that, unlike the standard deviation, ignores a few outlier runs."""
+    median = statistics.median(samples)
+    return statistics.median(abs(sample - median) for sample in samples)
+
+
+def measure_peak_memory(converter: WhatsAppChatConverter, chat_file: Path, output_path: Path) -> Dict[str, int]:
+    """Convert once under tracemalloc and return the traced peak of each benchmark stage."""
+    stage_of = {name: stage for stage, names in STAGES.items() for name in names}
+    peaks: Dict[str, int] = {}
+
+    def on_stage_end(metrics: StageMetrics) -> None:
+        stage = stage_of.get(metrics.name)
+        if stage is not None:
+            peaks[stage] = max(peaks.get(stage, 0), tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    tracemalloc.start()
+    add_stage_listener(on_stage_end)
+    try:
+        converter.convert_chatfile_to_html(chat_file, output_path)
+    finally:
+        remove_stage_listener(on_stage_end)
+        tracemalloc.stop()
+    return peaks
+
+
+def run_suite(
+    formats: List[WhatsAppFormat],
+    sizes: List[int],
+    config: SyntheticChatConfig,
+    repeat: int = 3,
+    memory: bool = True
+) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for whatsapp_format in formats:
+            for size in sizes:
+                try:
+                    result = run_case(whatsapp_format, replace(config, messages=size), Path(work_dir), repeat, memory)
+                except Exception as e:
+                    # Keep going so one unsupported format does not hide the others' numbers
+                    result = {'format': whatsapp_format.value, 'messages': size, 'error': f"{type(e).__name__}: {e}"}
+                results.append(result)
+    case_config = asdict(config)
+    del case_config['messages']
+    case_config['start'] = config.start.isoformat()
+    return {
+        'schema_version': BASELINE_SCHEMA_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'config': case_config,
+        'results': results,
+    }
+
+
+def format_results(report: dict) -> str:
+    rows = [f"{'format':<20} {'messages':>10} " + ' '.join(f"{stage:>22}" for stage in STAGES)]
+    for result in report['results']:
+        if 'error' in result:
+            rows.append(f"{result['format']:<20} {result['messages']:>10,} failed: {result['error']}")
+            continue
+        cells = []
+        for stage in STAGES:
+            data = result['stages'][stage]
+            peak = f"{data['peak_bytes'] / (1024 * 1024):6.1f}MB" if data['peak_bytes'] is not None else ''
+            rate = f"{data['items_per_second']:>12,.0f}/s" if data['items'] else f"{data['seconds'] * 1000:>11.1f}ms"
+            cells.append(f"{rate} {peak:>8}")
+        rows.append(f"{result['format']:<20} {result['messages']:>10,} " + ' '.join(cells))
+    return '\n'.join(rows)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--formats', nargs='+', default=[fmt.value for fmt in LINE_PREFIXES],
+                        choices=[fmt.value for fmt in LINE_PREFIXES])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10_000],
+                        help='messages per chat, e.g. 10000 100000 1000000 10000000')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--participants', type=int, default=4)
+    parser.add_argument('--multiline-ratio', type=float, default=0.1)
+    parser.add_argument('--attachment-ratio', type=float, default=0.05)
+    parser.add_argument('--unicode-noise-ratio', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT)
+    return parser.parse_args(argv)
+
+
+def config_from_args(args: argparse.Namespace) -> SyntheticChatConfig:
+    return SyntheticChatConfig(
+        participants=args.participants,
+        multiline_ratio=args.multiline_ratio,
+        attachment_ratio=args.attachment_ratio,
+        unicode_noise_ratio=args.unicode_noise_ratio,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    # Missing attachments are expected in synthetic chats
+    logging.getLogger('src').setLevel(logging.ERROR)
+    started = time.perf_counter()
+    report = run_suite(
+        [WhatsAppFormat(value) for value in args.formats],
+        args.sizes,
+        config_from_args(args),
+        args.repeat,
+        memory=not args.no_memory,
+    )
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(format_results(report))
+    print(f"\nWrote {args.output} in {time.perf_counter() - started:.1f}s")
+    if any('error' in result for result in report['results']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+# benchmarks/regression_gate.py
+
+"""
+Fail when conversion stages got slower or use more memory than the baseline.
+
+Runs the stage benchmarks for every case in the baseline (same formats, sizes
+and generator config), repeating each case to get a median and its median
+absolute deviation (MAD). Baseline times are scaled by how fast a fixed
+calibration workload ran in each run, so a slower machine or a busy period
+is not reported as a regression. A stage regresses when its median time
+exceeds the scaled baseline by more than the tolerance plus the run-to-run
+noise, or when its peak memory exceeds the baseline by more than the memory
+tolerance. Exits with status 1 on any regression, so it can gate CI. Needs
+no network access.
+
+Usage:
+    python -m benchmarks.regression_gate [--baseline PATH] [--repeat N] [--tolerance 0.15]
+    python -m benchmarks.regression_gate --update-baseline [--stage grouping ...] [--format android_us ...]
+"""
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from benchmarks.bench_stages import DEFAULT_BASELINE, STAGES, BASELINE_SCHEMA_VERSION, run_suite
+from src.configuration_and_enums.whatsapp_formats import WhatsAppFormat
+from src.utils.synthetic_chat import SyntheticChatConfig
+
+
+@dataclass
+class StageComparison:
+    """One stage of one case, baseline (scaled to the current machine speed) against current run."""
+    case: str
+    stage: str
+    baseline_seconds: float
+    current_seconds: float
+    allowed_seconds: float
+    baseline_peak: Optional[int]
+    current_peak: Optional[int]
+    allowed_peak: Optional[float]
+
+    @property
+    def time_regressed(self) -> bool:
+        return self.current_seconds > self.allowed_seconds
+
+    @property
+    def memory_regressed(self) -> bool:
+        return self.allowed_peak is not None and self.current_peak is not None and self.current_peak > self.allowed_peak
+
+    @property
+    def regressed(self) -> bool:
+        return self.time_regressed or self.memory_regressed
+
+    def format(self) -> str:
+        change = (self.current_seconds / self.baseline_seconds - 1) * 100 if self.baseline_seconds else 0.0
+        line = (
+            f"{self.case:<28} {self.stage:<10} {self.baseline_seconds * 1000:>10.2f}ms -> "
+            f"{self.current_seconds * 1000:>10.2f}ms {change:>+7.1f}%"
+        )
+        if self.baseline_peak and self.current_peak is not None:
+            line += f"   peak {self.baseline_peak / 1024:>9,.0f}KB -> {self.current_peak / 1024:>9,.0f}KB"
+        flags = [label for label, flag in (('TIME', self.time_regressed), ('MEMORY', self.memory_regressed)) if flag]
+        return f"{line}   {'REGRESSED: ' + ', '.join(flags) if flags else 'ok'}"
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    tolerance: float,
+    memory_tolerance: float,
+    noise_factor: float = 3.0,
+    min_seconds: float = 0.005,
+    normalize: bool = True
+) -> tuple:
+    """
+    Compare two benchmark reports.
+
+    Returns (comparisons, failures) where failures describes cases that ran in
+    the baseline but failed now. Differences smaller than min_seconds are
+    treated as timer noise.
+    """
+    current_cases = {(result['format'], result['messages']): result for result in current['results']}
+    comparisons: List[StageComparison] = []
+    failures: List[str] = []
+    for base in baseline['results']:
+        key = (base['format'], base['messages'])
+        case = f"{base['format']} x {base['messages']:,}"
+        if 'error' in base:
+            continue
+        result = current_cases.get(key)
+        if result is None or 'error' in result:
+            failures.append(f"{case}: {result['error'] if result else 'not run'}")
+            continue
+        speed = 1.0
+        if normalize and base.get('calibration_seconds') and result.get('calibration_seconds'):
+            speed = result['calibration_seconds'] / base['calibration_seconds']
+        for stage in STAGES:
+            base_stage, stage_now = base['stages'][stage], result['stages'][stage]
+            noise = noise_factor * max(base_stage.get('mad_seconds', 0.0) * speed, stage_now.get('mad_seconds', 0.0))
+            allowed = base_stage['seconds'] * speed * (1 + tolerance) + max(noise, min_seconds)
+            base_peak = base_stage.get('peak_bytes')
+            comparisons.append(StageComparison(
+                case=case,
+                stage=stage,
+                baseline_seconds=base_stage['seconds'] * speed,
+                current_seconds=stage_now['seconds'],
+                allowed_seconds=allowed,
+                baseline_peak=base_peak,
+                current_peak=stage_now.get('peak_bytes'),
+                allowed_peak=base_peak * (1 + memory_tolerance) if base_peak else None,
+            ))
+    return comparisons, failures
+
+
+def rerecord_stages(baseline: dict, current: dict, stages: List[str], formats: Optional[List[str]] = None) -> List[str]:
+    """
+    Replace only the given stages of baseline with the current run, in place,
+    in every case or only the cases of the given formats.
+
+    Times are scaled to the baseline's calibration, so they stay comparable
+    with the stages that keep their recorded numbers. Returns one before ->
+    after line per replaced stage, for the commit that records the change.
+    """
+    current_cases = {(result['format'], result['messages']): result for result in current['results']}
+    changes: List[str] = []
+    for base in baseline['results']:
+        result = current_cases.get((base['format'], base['messages']))
+        if 'error' in base or result is None or 'error' in result:
+            continue
+        if formats and base['format'] not in formats:
+            continue
+        scale = 1.0
+        if base.get('calibration_seconds') and result.get('calibration_seconds'):
+            scale = base['calibration_seconds'] / result['calibration_seconds']
+        for stage in stages:
+            before, stage_now = base['stages'][stage], dict(result['stages'][stage])
+            stage_now['seconds'] *= scale
+            stage_now['mad_seconds'] *= scale
+            stage_now['samples'] = [sample * scale for sample in stage_now['samples']]
+            stage_now['items_per_second'] = stage_now['items'] / stage_now['seconds'] if stage_now['seconds'] else 0.0
+            base['stages'][stage] = stage_now
+            changes.append(
+                f"{base['format']} x {base['messages']:,} {stage}: "
+                f"{before['seconds'] * 1000:.2f} -> {stage_now['seconds'] * 1000:.2f} ms, "
+                f"peak {before.get('peak_bytes') or 0:,} -> {stage_now.get('peak_bytes') or 0:,} bytes"
+            )
+    return changes
+
+
+def run_like(baseline: dict, repeat: int, memory: bool) -> dict:
+    """Run the benchmark cases recorded in baseline with the same generator config."""
+    config = dict(baseline['config'])
+    config['start'] = datetime.fromisoformat(config['start'])
+    formats = list(dict.fromkeys(WhatsAppFormat(result['format']) for result in baseline['results']))
+    sizes = list(dict.fromkeys(result['messages'] for result in baseline['results']))
+    return run_suite(formats, sizes, SyntheticChatConfig(**config), repeat, memory)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed relative slowdown per stage (default: 0.15)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10,
+                        help='allowed relative peak memory growth per stage (default: 0.10)')
+    parser.add_argument('--noise-factor', type=float, default=3.0,
+                        help='MADs of run-to-run noise added to the allowance (default: 3)')
+    parser.add_argument('--no-normalize', action='store_true',
+                        help='compare raw times instead of scaling the baseline by the calibration workload')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--report', type=Path, help='also write the current results to this JSON file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='overwrite the baseline with this run instead of comparing')
+    parser.add_argument('--stage', action='append', choices=STAGES, dest='stages',
+                        help='with --update-baseline, re-record only this stage (repeatable) '
+                             'and keep the recorded numbers of the others')
+    parser.add_argument('--format', action='append', dest='formats', metavar='FORMAT',
+                        help='with --stage, re-record only the cases of this format (repeatable)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger('src').setLevel(logging.ERROR)
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    if baseline.get('schema_version') != BASELINE_SCHEMA_VERSION:
+        print(f"Baseline schema {baseline.get('schema_version')} is not {BASELINE_SCHEMA_VERSION}; "
+              f"regenerate it with --update-baseline", file=sys.stderr)
+        return 2
+
+    current = run_like(baseline, args.repeat, memory=not args.no_memory)
+    if args.report:
+        args.report.write_text(json.dumps(current, indent=2), encoding='utf-8')
+    if args.update_baseline:
+        failed = [result for result in current['results'] if 'error' in result]
+        if failed:
+            for result in failed:
+                print(f"{result['format']} x {result['messages']:,}: {result['error']}", file=sys.stderr)
+            print("Not updating the baseline while cases fail", file=sys.stderr)
+            return 1
+        if args.stages:
+            for change in rerecord_stages(baseline, current, args.stages, args.formats):
+                print(change)
+            current = baseline
+        args.baseline.write_text(json.dumps(current, indent=2), encoding='utf-8')
+        print(f"Updated {args.baseline}")
+        return 0
+
+    comparisons, failures = compare(
+        baseline, current, args.tolerance, args.memory_tolerance, args.noise_factor,
+        normalize=not args.no_normalize
+    )
+    print(f"Baseline: {args.baseline} ({baseline['created']}, Python {baseline['python']})")
+    for comparison in comparisons:
+        print(comparison.format())
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions or failures:
+        print(f"\n{len(regressions)} stage regression(s), {len(failures)} failed case(s)")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
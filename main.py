@@ -1,17 +1,168 @@
 # main.py
 
+from datetime import datetime
 from pathlib import Path
 from src.utils.custom_logging.setup_logging import setup_logging
+from src.utils.profiling import ConversionProfiler
 from src.main_orchastrator import WhatsAppChatConverter
+from src.modules.conversion_progress import ConversionCancelled, ConversionProgress, ProgressEvent
+from src.modules.html_generator import HTMLGenerator
+from src.modules.message_filter import MessageFilter
+from src.modules.parallel_renderer import ParallelSingleFileHTMLBackend
+from src.modules.owner_resolver import DefaultOwnerResolver
 
+import argparse
+import queue
+import threading
 import zipfile
-import tempfile
-from tkinter import Tk, filedialog, messagebox
+from tkinter import Tk, StringVar, filedialog, messagebox, ttk
 
 setup_logging()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert a WhatsApp ZIP export into an HTML archive.")
+    parser.add_argument(
+        "--profile", type=Path, metavar="DIR",
+        help="profile the conversion and write the reports to DIR"
+    )
+    parser.add_argument(
+        "--profile-mode", choices=("cpu", "memory", "all"), default="all",
+        help="profile CPU time (cProfile), memory (tracemalloc) or both (default: all)"
+    )
+    parser.add_argument(
+        "--sender", action="append", metavar="NAME",
+        help="only keep messages from this sender; may be given several times"
+    )
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat, metavar="DATE",
+        help="only keep messages from this date/time on (ISO format, e.g. 2021-03-01)"
+    )
+    parser.add_argument(
+        "--until", type=datetime.fromisoformat, metavar="DATE",
+        help="only keep messages before this date/time (ISO format)"
+    )
+    parser.add_argument(
+        "--media-only", action="store_true",
+        help="only keep messages with attachments"
+    )
+    parser.add_argument(
+        "--search-index", action="store_true",
+        help="add a search bar backed by a static index written beside the HTML"
+    )
+    parser.add_argument(
+        "--render-workers", type=int, metavar="N",
+        help="render the HTML in N worker processes (0 for one per CPU); output is identical to serial rendering"
+    )
+    parser.add_argument(
+        "--owners", type=Path, metavar="FILE",
+        help='JSON file with "known_owners" names and "chat_owners" per chat name'
+    )
+    return parser.parse_args()
+
+def format_progress(event: ProgressEvent) -> str:
+    if event.stage == "reading":
+        detail = f"Reading chat: {event.bytes_read / (1024 * 1024):.1f} of {event.total_bytes / (1024 * 1024):.1f} MB"
+    elif event.stage == "parsing":
+        detail = f"Parsing messages: {event.messages_parsed:,} of {event.total_messages:,}"
+    elif event.stage == "rendering":
+        detail = f"Rendering messages: {event.messages_rendered:,} of {event.total_messages:,}"
+    elif event.stage == "packaging":
+        detail = f"Packaging media: {event.media_files_packaged:,} of {event.total_media_files:,} files"
+    else:
+        detail = "Converting"
+    if event.eta_seconds is not None and not event.done:
+        minutes, seconds = divmod(int(event.eta_seconds + 0.5), 60)
+        detail += f" (about {minutes}:{seconds:02d} left)"
+    return detail
+
+class ConversionWindow:
+    """
+    Progress window running a conversion on a worker thread.
+
+    The worker only puts items on a queue, which the Tk thread polls with
+    after(), so the window stays responsive however long the conversion takes.
+    """
+
+    POLL_MS = 100
+
+    def __init__(
+        self,
+        root: Tk,
+        converter: WhatsAppChatConverter,
+        events: queue.Queue,
+        zip_path: Path,
+        package_path: Path
+    ):
+        """events must be the queue the converter's progress callback puts events on."""
+        self.root = root
+        self.converter = converter
+        self.events = events
+        self.zip_path = zip_path
+        self.package_path = package_path
+
+        root.title(f"Converting {zip_path.name}")
+        root.protocol("WM_DELETE_WINDOW", self.cancel)
+        frame = ttk.Frame(root, padding=12)
+        frame.grid()
+        self.status = StringVar(value="Starting...")
+        ttk.Label(frame, textvariable=self.status, width=60).grid(row=0, column=0, sticky="w")
+        self.progress_bar = ttk.Progressbar(frame, length=400, maximum=1.0)
+        self.progress_bar.grid(row=1, column=0, pady=8)
+        self.cancel_button = ttk.Button(frame, text="Cancel", command=self.cancel)
+        self.cancel_button.grid(row=2, column=0, sticky="e")
+
+    def start(self) -> None:
+        threading.Thread(target=self._convert, name="conversion", daemon=True).start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def cancel(self) -> None:
+        self.converter.progress.cancel()
+        self.cancel_button.state(["disabled"])
+        self.status.set("Cancelling...")
+
+    def _convert(self) -> None:
+        try:
+            report = self.converter.convert_zip_export(self.zip_path, self.package_path, temp_parent=self.zip_path.parent)
+            self.events.put(("finished", report))
+        except Exception as e:
+            self.events.put(("failed", e))
+
+    def _poll(self) -> None:
+        outcome = None
+        while True:
+            try:
+                item = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, ProgressEvent):
+                if not self.converter.progress.cancelled:
+                    self.status.set(format_progress(item))
+                self.progress_bar["value"] = item.fraction
+            else:
+                outcome = item
+        if outcome is None:
+            self.root.after(self.POLL_MS, self._poll)
+            return
+        self.root.withdraw()
+        self._show_outcome(*outcome)
+        self.root.destroy()
+
+    def _show_outcome(self, kind, value) -> None:
+        if kind == "finished":
+            messagebox.showinfo("Success", f"✅ Archive created:\n{self.package_path}\n\n{value.format()}")
+        elif isinstance(value, ConversionCancelled):
+            messagebox.showinfo("Cancelled", "Conversion cancelled.")
+        elif isinstance(value, zipfile.BadZipFile):
+            messagebox.showerror("Error", f"Problem opening ZIP file:\n{value}")
+        else:
+            import traceback
+            traceback_str = ''.join(traceback.format_exception(None, value, value.__traceback__))
+            messagebox.showerror("Error", f"❌ Error converting chat:\n{value}\n\nDetails:\n{traceback_str}")
+
 def main():
-    Tk().withdraw()  # Hide root window
+    args = parse_args()
+    root = Tk()
+    root.withdraw()  # Hidden until the conversion starts
 
     # Ask user to select a WhatsApp ZIP export file
     zip_path = filedialog.askopenfilename(
@@ -23,41 +174,40 @@ def main():
         return
 
     zip_path = Path(zip_path)
-    temp_dir = tempfile.TemporaryDirectory(dir=zip_path.parent)
-    try:
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(temp_dir.name)
-    except Exception as ex:
-        messagebox.showerror("Error", f"Problem opening ZIP file:\n{ex}")
-        temp_dir.cleanup()
-        return
-
-    # Find possible chat TXT files in the extracted folder
-    chat_files = [
-        f for f in Path(temp_dir.name).rglob("*.txt")
-        if "_chat" in f.name or "WhatsApp Chat" in f.name
-    ]
-    if not chat_files:
-        messagebox.showerror("Error", "No chat text file found in the ZIP!")
-        temp_dir.cleanup()
-        return
-
-    selected_chat_file = chat_files[0]  # Take the first if multiple
-
-    # Convert to HTML
-    converter = WhatsAppChatConverter()
-    try:
-        output_file = converter.convert_chatfile_to_html(
-            selected_chat_file,
-            output_path=zip_path.parent / f"{selected_chat_file.stem}.html",
+    profiler = None
+    if args.profile:
+        profiler = ConversionProfiler(
+            args.profile,
+            cpu=args.profile_mode in ("cpu", "all"),
+            memory=args.profile_mode in ("memory", "all"),
+        )
+    owner_resolver = DefaultOwnerResolver.from_file(args.owners) if args.owners else None
+    message_filter = None
+    if args.sender or args.since or args.until or args.media_only:
+        message_filter = MessageFilter(
+            senders=frozenset(args.sender) if args.sender else None,
+            start=args.since,
+            end=args.until,
+            media_only=args.media_only,
         )
-        messagebox.showinfo("Success", f"✅ HTML file created:\n{output_file}")
-    except Exception as e:
-        import traceback
-        traceback_str = ''.join(traceback.format_exception(None, e, e.__traceback__))
-        messagebox.showerror("Error", f"❌ Error converting chat:\n{e}\n\nDetails:\n{traceback_str}")
+    output_backend = None
+    if args.render_workers is not None:
+        output_backend = ParallelSingleFileHTMLBackend(workers=args.render_workers or None)
+    events = queue.Queue()
+    converter = WhatsAppChatConverter(
+        profiler=profiler,
+        owner_resolver=owner_resolver,
+        message_filter=message_filter,
+        html_generator=HTMLGenerator(output_backend=output_backend, search_index=args.search_index),
+        progress=ConversionProgress(events.put),
+    )
 
-    temp_dir.cleanup()
+    # Convert to HTML and package it with the media it references, off the Tk thread
+    package_path = zip_path.with_name(f"{zip_path.stem}_archive.zip")
+    window = ConversionWindow(root, converter, events, zip_path, package_path)
+    root.deiconify()
+    window.start()
+    root.mainloop()
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,15 @@
 # src/configuration_and_enums/format_detector.py
 
-import re
+import codecs
+import logging
 from typing import Dict, Tuple, Optional
 import chardet
 from .whatsapp_formats import WhatsAppFormat, FormatInfo
 from .whatsapp_format_patterns import FORMATS
 import os
 
+logger = logging.getLogger(__name__)
+
 def normalize_encoding(encoding):
     if not encoding:
         return 'utf-8'
@@ -27,22 +30,22 @@ class DefaultFormatDetectionStrategy(FormatDetectionStrategyInterface):
     def detect_format(self, sample_lines: list, min_confidence: float = 0.3) -> Tuple[WhatsAppFormat, float, Dict[WhatsAppFormat, int]]:
         lines = [line for line in sample_lines if line and len(line) > 10]
         if not lines:
-            print("No lines to parse")
+            logger.warning("No lines to parse")
             return WhatsAppFormat.UNKNOWN, 0.0, {}
         format_scores: Dict[WhatsAppFormat, int] = {fmt: 0 for fmt in self.formats}
         for line in lines:
             for fmt, info in self.formats.items():
-                if re.match(info.regex, line, re.IGNORECASE):
+                if info.pattern.match(line):
                     format_scores[fmt] += 1
         if not any(format_scores.values()):
-            print("No formats matched")
+            logger.warning("No formats matched")
             return WhatsAppFormat.UNKNOWN, 0.0, format_scores
         best_format, match_count = max(format_scores.items(), key=lambda x: x[1])
         confidence = match_count / len(lines)
         if confidence < min_confidence:
-            print(f"Confidence too low for {best_format}: {confidence}")
+            logger.warning("Confidence too low for %s: %s", best_format, confidence)
             return WhatsAppFormat.UNKNOWN, confidence, format_scores
-        print(f"Best format: {best_format} with {match_count} matches and confidence {confidence}")
+        logger.info("Best format: %s with %d matches and confidence %s", best_format, match_count, confidence)
         return best_format, confidence, format_scores
 
 class FormatDetector:
@@ -57,22 +60,33 @@ class FormatDetector:
             with open(file_path, 'rb') as f:
                 raw_data = f.read(sample_size)
             if not raw_data:
-                print("No data to parse")
+                logger.warning("No data to parse")
                 return 'utf-8', 0.0
             result = chardet.detect(raw_data)
             encoding = result.get('encoding', 'utf-8')
             confidence = result.get('confidence', 0.0)
             if encoding == 'ISO-8859-1' and confidence < 0.7:
-                encoding = 'utf-8'
+                # A weak Latin-1 guess is usually UTF-8, unless the bytes are not valid UTF-8
+                # at all, as in legacy Windows exports
+                encoding = 'utf-8' if FormatDetector._is_utf8(raw_data) else 'cp1252'
             elif encoding in ['ascii', 'ASCII']:
                 encoding = 'utf-8'
             elif encoding and 'UTF-16' in encoding.upper():
                 encoding = 'utf-16'
             return encoding, confidence
         except Exception as e:
-            print(f"Error detecting encoding: {e}")
+            logger.error("Error detecting encoding: %s", e)
             return 'utf-8', 0.0
 
+    @staticmethod
+    def _is_utf8(raw_data: bytes) -> bool:
+        # Incremental decoding tolerates a character cut off at the end of the sample
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(raw_data)
+        except UnicodeDecodeError:
+            return False
+        return True
+
     def detect_format(
         self,
         file_path: str,
@@ -95,14 +109,16 @@ class FormatDetector:
                     for _ in range(sample_lines)
                 ]
         except Exception as e:
-            print(f"Error reading file: {e}")
+            logger.error("Error reading file: %s", e)
             return WhatsAppFormat.UNKNOWN, 0.0, {}
 
-        print("Sample lines for format detection:")
-        for idx, line in enumerate(lines):
-            print(f"{idx+1:02}: {line!r}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Sample lines for format detection:\n%s",
+                "\n".join(f"{idx+1:02}: {line!r}" for idx, line in enumerate(lines))
+            )
         detected_format, confidence, format_scores = self.detection_strategy.detect_format(lines, min_confidence)
-        print(f"DETECTOR DEBUG: format={detected_format} confidence={confidence} scores={format_scores}")
+        logger.debug("format=%s confidence=%s scores=%s", detected_format, confidence, format_scores)
 
         return detected_format, confidence, format_scores
 
@@ -116,6 +132,6 @@ class FormatDetector:
 
     def validate_format(self, file_path: str, expected_format: WhatsAppFormat, encoding: Optional[str] = None) -> bool:
         detected_format, confidence, format_scores = self.detect_format(file_path, encoding)
-        print(f"DETECTOR DEBUG: format={detected_format} confidence={confidence} scores={format_scores}")
+        logger.debug("format=%s confidence=%s scores=%s", detected_format, confidence, format_scores)
         return detected_format == expected_format and confidence > 0.5
 
@@ -1,7 +1,7 @@
 # src/configuration_and_enums/media_type.py
 
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class MediaType(Enum):
     """Enumeration of supported media types."""
@@ -17,12 +17,15 @@ class MediaType(Enum):
     @classmethod
     def from_filename(cls, filename: str) -> Optional['MediaType']:
         """Determine media type from filename extension."""
-        lower_filename = filename.lower()
-        return next(
-            (
-                media_type
-                for media_type in cls
-                if any(lower_filename.endswith(ext) for ext in media_type.extensions)
-            ),
-            None,
-        )
+        _, dot, extension = filename.rpartition('.')
+        if not dot:
+            return None
+        return _EXTENSION_MAP.get(f".{extension.lower()}")
+
+
+# Built once at import; Enum bodies cannot hold plain class attributes.
+_EXTENSION_MAP: Dict[str, MediaType] = {
+    extension: media_type
+    for media_type in MediaType
+    for extension in media_type.extensions
+}
@@ -0,0 +1,141 @@
+# src/configuration_and_enums/system_messages.py
+
+from typing import Dict, Tuple
+
+# Notices WhatsApp writes as a message body, per export language. A body is a
+# system message only if its first and only line is one of these as a whole:
+# matched case-insensitively, with ' and ’ interchangeable, " standing for any
+# quotation mark and a final period optional. Slots stand for the parts that
+# vary: {name} for a contact name or number, {value} for a quoted group
+# subject or a setting, and {more} for further sentences after a period.
+# Android writes most of these without a sender, which the parser flags on
+# its own; iOS puts the group name in front as the sender.
+SYSTEM_MESSAGE_PHRASES: Dict[str, Tuple[str, ...]] = {
+    'en': (
+        'Messages and calls are end-to-end encrypted{more}',
+        'Messages to this group are now secured with end-to-end encryption{more}',
+        'Messages you send to this chat and calls are now secured with end-to-end encryption{more}',
+        "{name} joined using this group's invite link",
+        'This message was deleted',
+        'You deleted this message',
+        'Waiting for this message{more}',
+        '{name} created group "{value}"',
+        '{name} changed the subject from "{value}" to "{value}"',
+        '{name} changed the subject to "{value}"',
+        "{name} changed this group's icon",
+        "{name} deleted this group's icon",
+        '{name} changed the group description',
+        "{name} changed this group's settings to {value}",
+        '{name} changed their phone number to a new number{more}',
+        'Your security code with {name} changed{more}',
+        '{name} turned on disappearing messages{more}',
+        '{name} turned off disappearing messages',
+        'This chat is with a business account{more}',
+        'You blocked this contact',
+        'You unblocked this contact',
+        "You're now an admin",
+        'You were added',
+    ),
+    'es': (
+        'Los mensajes y las llamadas están cifrados de extremo a extremo{more}',
+        '{name} se unió usando el enlace de invitación de este grupo',
+        'Se eliminó este mensaje',
+        'Eliminaste este mensaje',
+        '{name} creó el grupo "{value}"',
+        '{name} cambió el asunto de "{value}" a "{value}"',
+        '{name} cambió el ícono de este grupo',
+        '{name} cambió la descripción del grupo',
+        'Tu código de seguridad con {name} cambió{more}',
+        '{name} activó los mensajes temporales{more}',
+        '{name} desactivó los mensajes temporales',
+    ),
+    'pt': (
+        'As mensagens e as chamadas são protegidas com a criptografia de ponta a ponta{more}',
+        '{name} entrou usando o link de convite deste grupo',
+        'Você apagou esta mensagem',
+        'Essa mensagem foi apagada',
+        '{name} criou o grupo "{value}"',
+        '{name} mudou a imagem deste grupo',
+        '{name} mudou a descrição do grupo',
+        'Seu código de segurança com {name} mudou{more}',
+        '{name} ativou as mensagens temporárias{more}',
+        '{name} desativou as mensagens temporárias',
+    ),
+    'de': (
+        'Nachrichten und Anrufe sind Ende-zu-Ende-verschlüsselt{more}',
+        '{name} ist über den Einladungslink dieser Gruppe beigetreten',
+        'Diese Nachricht wurde gelöscht',
+        'Du hast diese Nachricht gelöscht',
+        '{name} hat den Betreff von "{value}" zu "{value}" geändert',
+        '{name} hat das Gruppenbild geändert',
+        '{name} hat die Gruppenbeschreibung geändert',
+        'Deine Sicherheitsnummer für {name} hat sich geändert{more}',
+        '{name} hat selbstlöschende Nachrichten aktiviert{more}',
+        '{name} hat selbstlöschende Nachrichten deaktiviert',
+    ),
+    'fr': (
+        'Les messages et les appels sont chiffrés de bout en bout{more}',
+        "{name} a rejoint ce groupe via le lien d'invitation",
+        'Ce message a été supprimé',
+        'Vous avez supprimé ce message',
+        '{name} a créé le groupe "{value}"',
+        '{name} a changé le sujet de "{value}" à "{value}"',
+        "{name} a changé l'icône de ce groupe",
+        '{name} a modifié la description du groupe',
+        'Votre code de sécurité avec {name} a changé{more}',
+        '{name} a activé les messages éphémères{more}',
+        '{name} a désactivé les messages éphémères',
+    ),
+    'it': (
+        'I messaggi e le chiamate sono crittografati end-to-end{more}',
+        "{name} si è unito tramite il link d'invito a questo gruppo",
+        'Questo messaggio è stato eliminato',
+        'Hai eliminato questo messaggio',
+        '{name} ha creato il gruppo "{value}"',
+        "{name} ha cambiato l'oggetto da \"{value}\" a \"{value}\"",
+        "{name} ha cambiato l'immagine di questo gruppo",
+        '{name} ha modificato la descrizione del gruppo',
+        'Il tuo codice di sicurezza con {name} è cambiato{more}',
+        '{name} ha attivato i messaggi effimeri{more}',
+        '{name} ha disattivato i messaggi effimeri',
+    ),
+    'nl': (
+        'Berichten en oproepen worden end-to-end versleuteld{more}',
+        '{name} neemt deel via de uitnodigingslink van deze groep',
+        'Dit bericht is verwijderd',
+        'Je hebt dit bericht verwijderd',
+        '{name} heeft het onderwerp gewijzigd van "{value}" naar "{value}"',
+        '{name} heeft het groepsicoon gewijzigd',
+        '{name} heeft de groepsbeschrijving gewijzigd',
+        'Je beveiligingscode met {name} is gewijzigd{more}',
+    ),
+    'ru': (
+        'Сообщения и звонки защищены сквозным шифрованием{more}',
+        '{name} присоединился(-ась) к группе по ссылке-приглашению этой группы',
+        'Данное сообщение удалено',
+        'Вы удалили данное сообщение',
+        '{name} создал(-а) группу "{value}"',
+        '{name} изменил(-а) тему с "{value}" на "{value}"',
+        '{name} изменил(-а) изображение этой группы',
+        '{name} изменил(-а) описание группы',
+        'Ваш код безопасности для {name} изменился{more}',
+    ),
+    'tr': (
+        'Mesajlar ve aramalar uçtan uca şifrelidir{more}',
+        '{name} bu grubun davet bağlantısını kullanarak katıldı',
+        'Bu mesaj silindi',
+        'Bu mesajı sildiniz',
+        '{name} "{value}" grubunu oluşturdu',
+        '{name} grup açıklamasını değiştirdi',
+        '{name} ile olan güvenlik kodunuz değişti{more}',
+    ),
+    'id': (
+        'Pesan dan panggilan terenkripsi secara end-to-end{more}',
+        '{name} bergabung menggunakan tautan undangan grup ini',
+        'Pesan ini telah dihapus',
+        'Anda menghapus pesan ini',
+        '{name} mengubah subjek dari "{value}" menjadi "{value}"',
+        '{name} mengubah deskripsi grup',
+        'Kode keamanan Anda dengan {name} telah berubah{more}',
+    ),
+}
@@ -131,20 +131,11 @@ FORMATS: Dict[WhatsAppFormat, FormatInfo] = {
         description='US/International bracket format with AM/PM (YYYY-MM-DD, h:mm:ssAM/PM)',
         regions=['Modern WhatsApp Export', 'US', 'International']
     ),
-    WhatsAppFormat.CUSTOM_COMMA_TIME: FormatInfo(
-        regex=r'^\d{4}-\d{2}-\d{2}, \d{6} [AP]M(?: [^ ]+)? .+',
-        date_format='%Y-%m-%d',
-        time_format='%I%M%S %p',
-        separator=' ',
-        timestamp_wrapper=None,
-        description='YYYY-MM-DD, HHMMSS AM/PM Name Message (no brackets, comma after date, no colon)',
-        regions=['Export variant', 'Custom detected']
-    ),
     WhatsAppFormat.CUSTOM_COMMA_TIME: FormatInfo(
         # Change regex to make sender optional (username may be missing)
         regex=r'^\d{4}-\d{2}-\d{2}, \d{6} [AP]M(?: [^ ]+)? .+',
-        date_format="Y-m-d",
-        time_format="IMS p",
+        date_format="%Y-%m-%d",
+        time_format="%I%M%S %p",
         separator=" ",
         timestamp_wrapper=None,
         description="YYYY-MM-DD, HHMMSS AMPM Name Message (sender optional)",
@@ -152,8 +143,8 @@ FORMATS: Dict[WhatsAppFormat, FormatInfo] = {
     ),
     WhatsAppFormat.US_COMMA_COMPACT: FormatInfo(
         regex=r'^\d{4}-\d{2}-\d{2}, \d{6} [AP]M(?: [^ ]+)? .+',
-        date_format="Y-m-d",
-        time_format="IMS p",
+        date_format="%Y-%m-%d",
+        time_format="%I%M%S %p",
         separator=" ",
         timestamp_wrapper=None,
         description="US/Canada WhatsApp export (sender optional)",
@@ -161,8 +152,8 @@ FORMATS: Dict[WhatsAppFormat, FormatInfo] = {
     ),
     WhatsAppFormat.US_COMPACT_NOSEP: FormatInfo(
         regex=r'^\d{4}-\d{2}-\d{2}, \d{6} [AP]M(?: [^ ]+)? .+',
-        date_format="Y-m-d",
-        time_format="IMS p",
+        date_format="%Y-%m-%d",
+        time_format="%I%M%S %p",
         separator=" ",
         timestamp_wrapper=None,
         description="US/Canada export no separator, sender optional",
@@ -178,3 +169,9 @@ FORMATS: Dict[WhatsAppFormat, FormatInfo] = {
         regions=['US', 'iOS', 'Modern WhatsApp Export']
     ),
 }
+
+
+def precompile_formats() -> None:
+    """Compile every format's regex now, e.g. in a long-lived worker before the first job."""
+    for info in FORMATS.values():
+        info.pattern
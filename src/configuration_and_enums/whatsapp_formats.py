@@ -1,8 +1,10 @@
 # src/configuration_and_enums/whatsapp_formats.py
 
+import re
 from enum import Enum
 from dataclasses import dataclass
-from typing import Optional, List
+from functools import cached_property
+from typing import Optional, List, Pattern
 
 class WhatsAppFormat(Enum):
     ANDROID_US = "android_us"
@@ -35,3 +37,8 @@ class FormatInfo:
     timestamp_wrapper: Optional[str]
     description: str
     regions: List[str]
+
+    @cached_property
+    def pattern(self) -> Pattern[str]:
+        """The regex compiled once, case-insensitively as format detection matches it."""
+        return re.compile(self.regex, re.IGNORECASE)
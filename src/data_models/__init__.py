@@ -6,12 +6,18 @@ Data models for the WhatsApp Archive Manager.
 This package contains:
 - Message: Represents a single WhatsApp message
 - ChatMetadata: Metadata about a chat conversation
+- ConversionMetrics: Timing and throughput report of a conversion
+- ParticipantStats: Senders and per-sender message counts of a chat
 """
 
 from .message import Message
 from .chat_metadata import ChatMetadata
+from .conversion_metrics import ConversionMetrics
+from .participant_stats import ParticipantStats
 
 __all__ = [
     'Message',
     'ChatMetadata',
+    'ConversionMetrics',
+    'ParticipantStats',
 ]
@@ -1,7 +1,8 @@
 # src/data_models/chat_metadata.py
 
 from dataclasses import dataclass
-from typing import Set
+from typing import Optional, Set
+from src.data_models.participant_stats import ParticipantStats
 
 @dataclass
 class ChatMetadata:
@@ -9,3 +10,4 @@ class ChatMetadata:
     participant_names: Set[str]
     date_format: str
     my_name: str
+    participant_stats: Optional[ParticipantStats] = None
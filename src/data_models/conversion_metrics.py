@@ -0,0 +1,53 @@
+# src/data_models/conversion_metrics.py
+
+import json
+import platform
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+# Bump when fields are renamed or removed so stored reports stay comparable
+METRICS_SCHEMA_VERSION = 1
+
+@dataclass
+class ConversionMetrics:
+    """Timing and throughput report for one chat conversion."""
+    chat_file: str
+    output_path: str
+    input_bytes: int
+    lines: int
+    messages: int
+    wall_seconds: float
+    cpu_seconds: float
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.input_bytes / (1024 * 1024) / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'schema_version': METRICS_SCHEMA_VERSION,
+            'python': platform.python_version(),
+            'chat_file': self.chat_file,
+            'output_path': self.output_path,
+            'input_bytes': self.input_bytes,
+            'lines': self.lines,
+            'messages': self.messages,
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'lines_per_second': self.lines_per_second,
+            'messages_per_second': self.messages_per_second,
+            'mb_per_second': self.mb_per_second,
+            'stages': self.stages,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
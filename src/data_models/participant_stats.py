@@ -0,0 +1,22 @@
+# src/data_models/participant_stats.py
+
+from dataclasses import dataclass, field
+from typing import Dict, Set
+
+@dataclass
+class ParticipantStats:
+    """Senders of a chat and how many messages each sent, gathered while parsing."""
+    message_counts: Dict[str, int] = field(default_factory=dict)
+    # Messages carrying SpecialMessages.MY_MESSAGE_PREFIX instead of a sender name
+    owner_marked_messages: int = 0
+
+    @property
+    def participant_names(self) -> Set[str]:
+        return set(self.message_counts)
+
+    @property
+    def total_messages(self) -> int:
+        return sum(self.message_counts.values()) + self.owner_marked_messages
+
+    def record(self, sender: str) -> None:
+        self.message_counts[sender] = self.message_counts.get(sender, 0) + 1
@@ -1,17 +1,65 @@
 # src/main_orchastrator.py
 
-import os
-from pathlib import Path
-from typing import List, Set
+import logging
+import tempfile
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from datetime import datetime
+from typing import Iterable, Iterator, List, Tuple
 from src.modules.message_extractor import MessageExtractor
 from src.modules.message_grouper import MessageGrouper
 from src.modules.file_manager import FileManager
-from src.modules.message_parser import MessageParser
-from src.modules.html_generator import HTMLGenerator
-from src.modules.media_handler import MediaHandler
+from src.modules.message_parser import DefaultStructuredMessageStrategy, MessageParser
+from src.modules.html_generator import HTMLGenerator, SingleFileHTMLBackend
+from src.modules.pipeline_executor import PipelineExecutor, PipelineStage
+from src.modules.media_handler import MediaHandler, DefaultMediaEmbedder
+from src.modules.media_index import MediaIndex
+from src.modules.media_store import ContentAddressedMediaStore
+from src.modules.message_filter import MessageFilter
+from src.modules.conversion_progress import ConversionCancelled, ConversionProgress
+from src.modules.timestamp_parser import best_timestamp_format, create_timestamp_parser
+from src.modules.jsonl_exporter import ExportReport, JSONLExporter
+from src.modules.time_index import TimeIndex, is_line_seekable
+from src.modules.format_switch_detector import FormatSwitchDetector
+from src.modules.date_order_resolver import (
+    DateOrderResolverInterface,
+    DefaultDateOrderResolver,
+    iter_line_chunks,
+    iter_text_chunks,
+)
+from src.modules.owner_resolver import (
+    OWNER_PLACEHOLDER,
+    DefaultOwnerResolver,
+    OwnerResolverInterface,
+    assign_owner,
+    chat_name_from_path,
+)
+from src.modules.archive_packager import (
+    ArchivePackager,
+    DirectoryMediaSource,
+    MediaSourceInterface,
+    PackagingReport,
+    ZipMediaSource,
+)
 from src.data_models.chat_metadata import ChatMetadata
 from src.data_models.message import Message
+from src.data_models.participant_stats import ParticipantStats
+from src.data_models.conversion_metrics import ConversionMetrics
+from src.utils.custom_logging.decorators import stage_timer, timed_stage
+from src.utils.text_utils import TextUtils
+from src.utils.line_reader import iter_line_batches, read_lines
+from src.utils.profiling import ConversionProfiler
 from src.configuration_and_enums.format_detector import FormatDetector, WhatsAppFormat, normalize_encoding
+from src.configuration_and_enums.whatsapp_formats import FormatInfo
+
+logger = logging.getLogger(__name__)
+
+# Timestamps sampled from the start of a chat to check its date format, and where to look for them
+_TIMESTAMP_SAMPLES = 50
+_TIMESTAMP_SAMPLE_CHARS = 1 << 16
+# Messages parsed between progress reports
+_PROGRESS_EVERY = 1000
 
 
 class WhatsAppChatConverter:
@@ -24,99 +72,648 @@ class WhatsAppChatConverter:
         self,
         message_extractor: MessageExtractor = None,
         message_grouper: MessageGrouper = None,
-        file_manager: FileManager = None
+        file_manager: FileManager = None,
+        format_detector: FormatDetector = None,
+        html_generator: HTMLGenerator = None,
+        media_store: ContentAddressedMediaStore = None,
+        profiler: ConversionProfiler = None,
+        owner_resolver: OwnerResolverInterface = None,
+        time_index_every: int = None,
+        message_filter: MessageFilter = None,
+        date_order_resolver: DateOrderResolverInterface = None,
+        progress: ConversionProgress = None,
+        detect_format_switches: bool = True
     ):
+        """
+        With time_index_every set, conversions also write a sparse time index
+        sidecar (an entry per day and at least every time_index_every messages)
+        next to the chat file, unless an up-to-date one exists.
+
+        With a message_filter, conversions and reads only keep the messages it
+        accepts; the others are dropped while parsing.
+
+        The date_order_resolver settles the chat's day/month/year order from
+        all of its dates before parsing, so every timestamp is parsed once
+        with the right format. With detect_format_switches, a chat whose export
+        format changes part-way (concatenated exports) switches to the new
+        format's date format where the change is noticed.
+
+        progress receives progress events while converting and packaging, and
+        cancelling it stops the conversion at its next report with
+        ConversionCancelled; partial output and temporary files are removed.
+        """
         self.message_extractor = message_extractor or MessageExtractor()
         self.message_grouper = message_grouper or MessageGrouper()
         self.file_manager = file_manager or FileManager()
+        self.format_detector = format_detector or FormatDetector()
+        self.html_generator = html_generator or HTMLGenerator()
+        self.media_store = media_store
+        self.profiler = profiler
+        self.owner_resolver = owner_resolver or DefaultOwnerResolver()
+        self.time_index_every = time_index_every
+        self.message_filter = message_filter
+        self.date_order_resolver = date_order_resolver or DefaultDateOrderResolver()
+        self.progress = progress or ConversionProgress()
+        self.detect_format_switches = detect_format_switches
+        self.last_pipeline_report = None
+        self.last_media_handler = None
+        self.last_metrics = None
+        self.stage_metrics = None
+
+    def convert_chatfile_to_html(
+        self,
+        chat_txt_file: Path,
+        output_path: Path = None,
+        media_index: MediaIndex = None
+    ) -> Path:
+        """
+        Convert a chat file to HTML.
+
+        media_index may describe media that are not extracted next to the chat
+        file, e.g. an index of the export ZIP. The media handler used for the
+        conversion is kept in self.last_media_handler, and per-stage timings in
+        self.last_metrics.
+
+        With a profiler configured, the conversion runs under it and its
+        reports are written when the conversion finishes.
+        """
+        with self.progress.run(('reading', 'parsing', 'rendering')):
+            if self.profiler is None:
+                return self._convert_chatfile_to_html(chat_txt_file, output_path, media_index)
+            with self.profiler:
+                return self._convert_chatfile_to_html(chat_txt_file, output_path, media_index)
+
+    def _convert_chatfile_to_html(self, chat_txt_file: Path, output_path: Path, media_index: MediaIndex) -> Path:
+        self.stage_metrics = {}
+        self.html_generator.stage_metrics = self.stage_metrics
+        self.html_generator.progress = self.progress
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        encoding, format_info = self._detect_encoding_and_format(chat_txt_file)
+
+        # Read lines, decoding chunk by chunk so the whole text is never held next to its lines
+        input_bytes = chat_txt_file.stat().st_size
+        with stage_timer(self.stage_metrics, 'reading', bytes=input_bytes) as stage:
+            lines = read_lines(chat_txt_file, encoding, on_bytes=lambda done: self.progress.read(done, input_bytes))
+            stage.items = len(lines)
+        self.progress.read(input_bytes, input_bytes)
+        date_format = self._resolve_date_format(iter_line_chunks(lines), format_info)
+
+        # Parse messages, collecting participants on the way; the owner is resolved afterwards
+        participant_stats = ParticipantStats()
+        message_parser = MessageParser(
+            date_format,
+            OWNER_PLACEHOLDER,
+            participant_stats=participant_stats,
+            message_filter=self.message_filter
+        )
+        messages = self._parse_all_messages(lines, message_parser, format_info)
+
+        # Resolve the owner from the participants found while parsing
+        chat_metadata = self._extract_chat_metadata(participant_stats, date_format, chat_name_from_path(chat_txt_file))
+        if participant_stats.owner_marked_messages:
+            assign_owner(messages, chat_metadata.my_name)
+            messages = self._filter_owner_messages(messages)
+
+        # Generate and save output
+        if output_path is None:
+            output_path = self._default_output_path(chat_txt_file)
+        media_handler = self._create_media_handler(chat_txt_file.parent, output_path, media_index)
+        try:
+            output_path = self.html_generator.write_output(messages, chat_metadata, media_handler, output_path)
+        except ConversionCancelled:
+            output_path.unlink(missing_ok=True)
+            raise
+        finally:
+            self.html_generator.progress = None
+        self._report_media(media_handler)
+
+        if self.time_index_every and is_line_seekable(encoding):
+            with stage_timer(self.stage_metrics, 'time_index') as stage:
+                stage.items = len(self.load_time_index(chat_txt_file, self.time_index_every).entries)
+
+        self.last_metrics = ConversionMetrics(
+            chat_file=str(chat_txt_file),
+            output_path=str(output_path),
+            input_bytes=input_bytes,
+            lines=len(lines),
+            messages=len(messages),
+            wall_seconds=time.perf_counter() - wall_started,
+            cpu_seconds=time.process_time() - cpu_started,
+            stages=[metrics.to_dict() for metrics in self.stage_metrics.values()],
+        )
+        self.stage_metrics = self.html_generator.stage_metrics = None
+        logger.debug("Conversion metrics: %s", self.last_metrics.to_json())
+        return output_path
+
+    def convert_chatfile_with_metrics(
+        self,
+        chat_txt_file: Path,
+        output_path: Path = None,
+        metrics_path: Path = None
+    ) -> ConversionMetrics:
+        """Convert a chat to HTML and return its metrics report, also written as JSON to metrics_path if given."""
+        self.convert_chatfile_to_html(chat_txt_file, output_path)
+        if metrics_path is not None:
+            metrics_path.write_text(self.last_metrics.to_json(), encoding='utf-8')
+        return self.last_metrics
+
+    def convert_and_package(
+        self,
+        chat_txt_file: Path,
+        package_path: Path,
+        media_source: MediaSourceInterface = None,
+        packager: ArchivePackager = None
+    ) -> PackagingReport:
+        """
+        Convert a chat and write a ZIP holding the output plus only the media it references.
+
+        media_source defaults to the chat file's folder; pass a ZipMediaSource to
+        read media straight from the export ZIP without extracting it. Media keep
+        the relative paths the HTML links to, so this cannot be combined with a
+        shared media store.
+        """
+        with self.progress.run(('reading', 'parsing', 'rendering', 'packaging')):
+            return self._convert_and_package(chat_txt_file, package_path, media_source, packager)
+
+    def _convert_and_package(
+        self,
+        chat_txt_file: Path,
+        package_path: Path,
+        media_source: MediaSourceInterface,
+        packager: ArchivePackager
+    ) -> PackagingReport:
+        media_source = media_source or DirectoryMediaSource(chat_txt_file.parent)
+        media_index = media_source.index()
+        with tempfile.TemporaryDirectory() as work_dir:
+            work_dir = Path(work_dir)
+            self.convert_chatfile_to_html(chat_txt_file, work_dir / f"{chat_txt_file.stem}.html", media_index)
+            media_handler = self.last_media_handler
+            media_files = {
+                name: media_handler.media_embedder.media_src(media_handler.media_folder / name)
+                for name in sorted(media_handler.referenced_files)
+            }
+            output_files = [
+                (path, path.relative_to(work_dir).as_posix())
+                for path in sorted(work_dir.rglob('*')) if path.is_file()
+            ]
+            try:
+                report = (packager or ArchivePackager()).package_zip(
+                    output_files, media_source, media_files, package_path, media_index, self.progress
+                )
+            except ConversionCancelled:
+                package_path.unlink(missing_ok=True)
+                raise
+        logger.info(report.format())
+        return report
+
+    def convert_zip_export(self, zip_path: Path, package_path: Path = None, temp_parent: Path = None) -> PackagingReport:
+        """
+        Convert a WhatsApp ZIP export into an archive ZIP next to it (or at package_path).
+
+        Only the chat text is extracted, into a temporary folder named after the
+        export (created under temp_parent if given) so media links in the HTML
+        stay readable; media are read straight from the export when packaging.
+        The temporary folder is removed however the conversion ends, including
+        when it is cancelled.
+        """
+        if package_path is None:
+            package_path = zip_path.with_name(f"{zip_path.stem}_archive.zip")
+        with self.progress.run(('reading', 'parsing', 'rendering', 'packaging')), zipfile.ZipFile(zip_path) as zip_file:
+            chat_member = self.find_chat_member(zip_file)
+            with tempfile.TemporaryDirectory(dir=temp_parent) as temp_dir:
+                chat_folder = Path(temp_dir) / zip_path.stem
+                chat_folder.mkdir()
+                chat_txt_file = chat_folder / chat_member.name
+                chat_txt_file.write_bytes(zip_file.read(str(chat_member)))
+                self.progress.check_cancelled()
+                member_prefix = "" if str(chat_member.parent) == "." else f"{chat_member.parent}/"
+                return self.convert_and_package(
+                    chat_txt_file,
+                    package_path,
+                    media_source=ZipMediaSource(zip_path, member_prefix),
+                )
+
+    @staticmethod
+    def find_chat_member(zip_file: zipfile.ZipFile) -> PurePosixPath:
+        """Return the chat text file of an export, the first one if there are several."""
+        chat_members = [
+            name for name in zip_file.namelist()
+            if name.endswith(".txt") and ("_chat" in name or "WhatsApp Chat" in name)
+        ]
+        if not chat_members:
+            raise ValueError("No chat text file found in the ZIP")
+        return PurePosixPath(chat_members[0])
+
+    def convert_chatfile_pipelined(
+        self,
+        chat_txt_file: Path,
+        output_path: Path = None,
+        queue_size: int = 8,
+        batch_size: int = 2000
+    ) -> Path:
+        """
+        Convert a chat with decode, group/parse, render and write stages running
+        concurrently, linked by bounded queues.
+
+        Produces the same single-document HTML as convert_chatfile_to_html.
+        Per-stage statistics of the run are kept in self.last_pipeline_report.
+        Progress is reported by the participant pre-pass and the render stage;
+        cancelling stops every stage and removes the partial output.
+        """
+        if not isinstance(self.html_generator.output_backend, SingleFileHTMLBackend):
+            raise ValueError("Pipelined conversion only supports the single-file HTML output backend")
+        with self.progress.run(('reading', 'rendering')):
+            return self._convert_chatfile_pipelined(chat_txt_file, output_path, queue_size, batch_size)
+
+    def _convert_chatfile_pipelined(self, chat_txt_file: Path, output_path: Path, queue_size: int, batch_size: int) -> Path:
+        progress = self.progress
+        encoding, format_info = self._detect_encoding_and_format(chat_txt_file)
+
+        date_format = self._resolve_date_format(iter_text_chunks(chat_txt_file, encoding), format_info)
+
+        # The owner must be known before rendering; collect participants in a streaming pre-pass
+        participant_stats = ParticipantStats()
+        scan_parser = MessageParser(date_format, OWNER_PLACEHOLDER, participant_stats=participant_stats, parse_timestamps=False)
+        input_bytes = chat_txt_file.stat().st_size
+        total_messages = 0
+        line_batches = iter_line_batches(chat_txt_file, encoding, on_bytes=lambda done: progress.read(done, input_bytes))
+        lines = (line for batch in line_batches for line in batch)
+        for message_lines in self.message_grouper.iter_message_groups(lines):
+            scan_parser.parse_message(message_lines, '')
+            total_messages += 1
+        progress.read(input_bytes, input_bytes)
+        chat_metadata = self._extract_chat_metadata(participant_stats, date_format, chat_name_from_path(chat_txt_file))
+        message_parser = MessageParser(chat_metadata.date_format, chat_metadata.my_name, message_filter=self.message_filter)
+        if output_path is None:
+            output_path = self._default_output_path(chat_txt_file)
+        media_handler = self._create_media_handler(chat_txt_file.parent, output_path)
+
+        def decode():
+            yield from iter_line_batches(chat_txt_file, encoding)
+
+        def group_and_parse(line_batches):
+            lines = (line for batch in line_batches for line in batch)
+            batch = []
+            last_sender = ""
+            for message_lines in self._iter_message_groups(lines, format_info, message_parser):
+                message = message_parser.parse_message(message_lines, last_sender)
+                if message is None:
+                    continue
+                if message.sender:
+                    last_sender = message.sender
+                batch.append(message)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        def render(message_batches):
+            def reported(batches):
+                rendered = 0
+                for batch in batches:
+                    # Rendering of the previous batch has finished when the next one is requested
+                    progress.rendered(rendered, total_messages)
+                    rendered += len(batch)
+                    yield batch
+            return self.html_generator.iter_message_html(reported(message_batches), chat_metadata, media_handler)
+
+        def write(html_chunks):
+            with open(output_path, 'w', encoding='utf-8', newline='') as out:
+                out.write(self.html_generator.document_head())
+                for chunk in html_chunks:
+                    out.write(chunk)
+                out.write(self.html_generator.document_tail())
 
-    def convert_chatfile_to_html(self, chat_txt_file: Path, output_path: Path = None) -> Path:
+        self.html_generator.begin_search_index(output_path)
+        executor = PipelineExecutor(queue_size=queue_size)
+        try:
+            self.last_pipeline_report = executor.run([
+                PipelineStage('decode', decode),
+                PipelineStage('parse', group_and_parse),
+                PipelineStage('render', render),
+                PipelineStage('write', write),
+            ])
+        except ConversionCancelled:
+            output_path.unlink(missing_ok=True)
+            raise
+        self.html_generator.finish_search_index()
+        logger.info(self.last_pipeline_report.format())
+        self._report_media(media_handler)
+        return output_path
+
+    def export_jsonl(
+        self,
+        chat_txt_file: Path,
+        output_path: Path = None,
+        compress: bool = None,
+        exporter: JSONLExporter = None
+    ) -> ExportReport:
+        """
+        Export the chat's messages as JSON Lines, streamed straight from the parser.
+
+        The file is read in chunks and each message is written as soon as it is
+        parsed, so memory use stays flat however long the chat is. The message
+        filter applies. With compress=None, output paths ending in .gz are gzipped.
+        """
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        encoding, format_info = self._detect_encoding_and_format(chat_txt_file)
+        if output_path is None:
+            output_path = chat_txt_file.with_suffix('.jsonl.gz' if compress else '.jsonl')
+        exporter = exporter or JSONLExporter(compress=compress)
+        chat_name = chat_name_from_path(chat_txt_file)
+        participant_stats = ParticipantStats()
+        parser = MessageParser(
+            self._resolve_date_format(iter_text_chunks(chat_txt_file, encoding), format_info), OWNER_PLACEHOLDER,
+            participant_stats=participant_stats, message_filter=self.message_filter
+        )
+
+        def parse() -> Iterator[Message]:
+            lines = (line for batch in iter_line_batches(chat_txt_file, encoding) for line in batch)
+            last_sender = ''
+            for message_lines in self._iter_message_groups(lines, format_info, parser):
+                message = parser.parse_message(message_lines, last_sender)
+                if message is None:
+                    continue
+                if message.sender:
+                    last_sender = message.sender
+                yield message
+
+        report = exporter.export(
+            parse(), output_path, chat_name, participant_stats,
+            lambda: self.owner_resolver.resolve(participant_stats, chat_name)
+        )
+        self.last_metrics = ConversionMetrics(
+            chat_file=str(chat_txt_file),
+            output_path=str(output_path),
+            input_bytes=chat_txt_file.stat().st_size,
+            lines=0,
+            messages=report.messages,
+            wall_seconds=time.perf_counter() - wall_started,
+            cpu_seconds=time.process_time() - cpu_started,
+        )
+        logger.info(
+            "Exported %d message(s) to %s (%d bytes) in %.2fs",
+            report.messages, output_path, report.bytes_written, self.last_metrics.wall_seconds
+        )
+        return report
+
+    def load_time_index(self, chat_txt_file: Path, every: int = 1000) -> TimeIndex:
+        """Return the chat's sidecar time index, building and saving it first if it is missing or stale."""
+        sidecar = TimeIndex.sidecar_path(chat_txt_file)
+        index = TimeIndex.load(sidecar)
+        if index is not None and index.is_current(chat_txt_file):
+            return index
+        encoding, format_info = self._detect_encoding_and_format(chat_txt_file)
+        date_format = self._resolve_date_format(iter_text_chunks(chat_txt_file, encoding), format_info)
+        index = TimeIndex.build(chat_txt_file, encoding, date_format, self.message_grouper, every)
+        try:
+            index.save(sidecar)
+        except OSError as e:
+            logger.warning("Could not write time index %s: %s", sidecar, e)
+        logger.info("Time index of %s: %d entries for %d messages", chat_txt_file, len(index.entries), index.message_count)
+        return index
+
+    def read_messages(self, chat_txt_file: Path, start: datetime = None, end: datetime = None) -> List[Message]:
+        """
+        Messages timestamped in [start, end) (either bound may be None).
+
+        Only the span located through the time index is read and parsed, so the
+        cost follows the size of the result rather than of the chat. Lines
+        without a timestamp of their own stay with the message before them.
+        """
+        index = self.load_time_index(chat_txt_file)
+        span_start, span_end, _ = index.span_for_time(start, end)
+        selected = []
+        in_range = False
+        for message in self._parse_span(chat_txt_file, index, span_start, span_end):
+            if message.timestamp is not None:
+                in_range = (start is None or message.timestamp >= start) and (end is None or message.timestamp < end)
+            if in_range:
+                selected.append(message)
+        return selected
+
+    def read_message_range(self, chat_txt_file: Path, first_message: int, count: int) -> List[Message]:
+        """Messages first_message .. first_message + count - 1 (0-based), read through the time index."""
+        index = self.load_time_index(chat_txt_file)
+        span_start, span_end, ordinal = index.span_for_messages(first_message, count)
+        messages = self._parse_span(chat_txt_file, index, span_start, span_end)
+        skip = first_message - ordinal
+        return messages[skip:skip + count]
+
+    def _parse_span(self, chat_txt_file: Path, index: TimeIndex, start: int, end: int) -> List[Message]:
+        """Parse the messages in a byte span of the chat file, resolving the owner from them."""
+        with open(chat_txt_file, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        participant_stats = ParticipantStats()
+        parser = MessageParser(
+            index.date_format, OWNER_PLACEHOLDER,
+            participant_stats=participant_stats, message_filter=self.message_filter
+        )
+        messages = []
+        last_sender = ''
+        for message_lines in self.message_grouper.iter_message_groups(data.decode(index.encoding, errors='replace').splitlines()):
+            message = parser.parse_message(message_lines, last_sender)
+            if message is None:
+                continue
+            messages.append(message)
+            if message.sender:
+                last_sender = message.sender
+        if participant_stats.owner_marked_messages:
+            assign_owner(messages, self.owner_resolver.resolve(participant_stats, chat_name_from_path(chat_txt_file)))
+            messages = self._filter_owner_messages(messages)
+        return messages
+
+    def _detect_encoding_and_format(self, chat_txt_file: Path) -> Tuple[str, FormatInfo]:
         # Check for invalid input
         if not chat_txt_file.exists() or not chat_txt_file.is_file():
             raise FileNotFoundError(f"Chat file {chat_txt_file} does not exist")
 
         # Detect encoding and format
-        print(f"Chat file path: {chat_txt_file}")
-        print(f"File exists: {os.path.exists(chat_txt_file)}")
-        encoding, _ = FormatDetector.detect_encoding(str(chat_txt_file))
-        encoding = normalize_encoding(encoding)
-        encoding = normalize_encoding(encoding)
-        print(f"Detected encoding: {encoding}")
-        whatsapp_format, confidence, scores = FormatDetector.detect_format(str(chat_txt_file), encoding)
-        print(f"Detected format: {whatsapp_format}, confidence: {confidence}")
-        print(f"Format scores: {scores}")
+        logger.info("Chat file path: %s", chat_txt_file)
+        with stage_timer(self.stage_metrics, 'encoding_detection'):
+            encoding, _ = FormatDetector.detect_encoding(str(chat_txt_file))
+            encoding = normalize_encoding(encoding)
+        logger.info("Detected encoding: %s", encoding)
+        with stage_timer(self.stage_metrics, 'format_detection'):
+            whatsapp_format, confidence, scores = self.format_detector.detect_format(str(chat_txt_file), encoding)
+        logger.info("Detected format: %s, confidence: %s", whatsapp_format, confidence)
+        logger.debug("Format scores: %s", scores)
 
         if whatsapp_format == WhatsAppFormat.UNKNOWN:
             raise ValueError("Could not detect WhatsApp format in chat file")
 
         # Get format info
-        format_info = FormatDetector.get_format_info(whatsapp_format)
+        return encoding, FormatDetector.get_format_info(whatsapp_format)
 
-        # Read lines
-        lines = chat_txt_file.read_text(encoding=encoding).splitlines()
+    def _default_output_path(self, chat_txt_file: Path) -> Path:
+        version = self.file_manager.get_next_version_number(chat_txt_file.parent, chat_txt_file.stem)
+        return chat_txt_file.parent / f"{chat_txt_file.stem}_v{version}.html"
 
-        # Extract metadata using the detected format
-        chat_metadata = self._extract_chat_metadata(lines, format_info)
+    def _create_media_handler(self, media_folder: Path, output_path: Path, media_index: MediaIndex = None) -> MediaHandler:
+        """Create the media handler, first adding the export's media to the shared store if one is configured."""
+        if self.media_store is None:
+            self.last_media_handler = MediaHandler(media_folder, media_index=media_index)
+            return self.last_media_handler
+        if media_index is None:
+            media_index = MediaIndex.scan(media_folder)
+        with stage_timer(self.stage_metrics, 'media_store') as stage:
+            report = self.media_store.add_files(
+                media_folder / name for name in media_index
+                if not name.lower().endswith(MediaHandler.NON_MEDIA_SUFFIXES)
+            )
+            stage.items, stage.bytes = report.files, report.hashed_bytes
+        logger.info(
+            "Media store: %d file(s), %d hashed, %d new blob(s), %d byte(s) deduplicated",
+            report.files, report.hashed_files, report.new_blobs, report.deduplicated_bytes
+        )
+        embedder = DefaultMediaEmbedder(self.media_store, output_path.parent)
+        self.last_media_handler = MediaHandler(media_folder, embedder, media_index)
+        return self.last_media_handler
 
-        # Create parser with detected format
-        message_parser = MessageParser(
-            chat_metadata.date_format,
-            chat_metadata.my_name
+    @staticmethod
+    def _report_media(media_handler: MediaHandler) -> None:
+        report = media_handler.media_report()
+        if report.missing:
+            logger.warning("%d attachment(s) missing from %s: %s", len(report.missing), media_handler.media_folder, report.missing[:10])
+        if report.orphaned:
+            logger.info("%d media file(s) not referenced by any message: %s", len(report.orphaned), report.orphaned[:10])
+
+    def _create_format_switch_detector(self, format_info: FormatInfo, date_format: str) -> FormatSwitchDetector:
+        format_type = next(
+            (fmt for fmt, info in self.format_detector.FORMATS.items() if info is format_info), WhatsAppFormat.UNKNOWN
+        )
+        return FormatSwitchDetector(
+            format_info,
+            date_format,
+            format_type,
+            format_detector=self.format_detector,
+            date_order_resolver=self.date_order_resolver,
+            start_strategy=self.message_grouper.start_strategy,
         )
 
-        # Parse messages
-        messages = self._parse_all_messages(lines, message_parser)
+    def _iter_message_groups(self, lines: Iterable[str], format_info: FormatInfo, message_parser: MessageParser) -> Iterator[List[str]]:
+        """Group lines into messages, switching message_parser's date format where the export format switches."""
+        if not self.detect_format_switches:
+            yield from self.message_grouper.iter_message_groups(lines)
+            return
+        detector = self._create_format_switch_detector(format_info, message_parser.date_format)
+        for segment, message_lines in detector.iter_message_groups(lines):
+            message_parser.set_date_format(segment.date_format)
+            yield message_lines
 
-        # Generate HTML
-        media_handler = MediaHandler(chat_txt_file.parent)
-        html_generator = HTMLGenerator()
-        html_content = html_generator.generate_html(messages, chat_metadata, media_handler)
+    def _resolve_date_format(self, texts: Iterable[str], format_info: FormatInfo) -> str:
+        """
+        The '<date> <time>' format of the chat, with its date order settled from the chat's own dates.
 
-        # Save output
-        if output_path is None:
-            version = self.file_manager.get_next_version_number(chat_txt_file.parent, chat_txt_file.stem)
-            output_path = chat_txt_file.parent / f"{chat_txt_file.stem}_v{version}.html"
-        output_path.write_text(html_content, encoding='utf-8')
-        return output_path
+        The format is checked against timestamps sampled from the start of the
+        chat before it is used, falling back to the format that reads most of
+        them if it reads none.
+        """
+        samples: List[str] = []
+
+        def sampled(chunks: Iterable[str]) -> Iterator[str]:
+            chunks = iter(chunks)
+            first = next(chunks, None)
+            if first is None:
+                return
+            samples.extend(self._sample_timestamps(first))
+            yield first
+            yield from chunks
+
+        with stage_timer(self.stage_metrics, 'date_order_resolution') as stage:
+            resolution = self.date_order_resolver.resolve(sampled(texts), format_info)
+            stage.items = resolution.distinct_dates
+            date_format = self._checked_date_format(resolution.date_format, samples, format_info)
+        logger.info("Date format: %s (%d distinct dates)", date_format, resolution.distinct_dates)
+        return date_format
+
+    @staticmethod
+    def _sample_timestamps(text: str) -> List[str]:
+        """Timestamps of the first message lines in text, as the message parser extracts them."""
+        strategy = DefaultStructuredMessageStrategy()
+        samples = []
+        for line in text[:_TIMESTAMP_SAMPLE_CHARS].splitlines():
+            parsed = strategy.try_parse_structured_message(TextUtils.clean_unicode(line))
+            if parsed is not None:
+                samples.append(parsed[0])
+                if len(samples) >= _TIMESTAMP_SAMPLES:
+                    break
+        return samples
+
+    def _checked_date_format(self, date_format: str, samples: List[str], format_info: FormatInfo) -> str:
+        if not samples:
+            return date_format
+        parse = create_timestamp_parser(date_format).parse
+        if any(parse(sample) is not None for sample in samples):
+            return date_format
+        candidates = dict.fromkeys(
+            [f"{format_info.date_format} {format_info.time_format}"]
+            + [f"{info.date_format} {info.time_format}" for info in self.format_detector.FORMATS.values()]
+        )
+        fallback, matched = best_timestamp_format(candidates, samples)
+        if fallback is None:
+            logger.warning(
+                "Date format %s matches none of %d sampled timestamps (e.g. %r); messages will have no timestamps",
+                date_format, len(samples), samples[0]
+            )
+            return date_format
+        logger.warning(
+            "Date format %s matches none of %d sampled timestamps (e.g. %r); using %s, which matches %d",
+            date_format, len(samples), samples[0], fallback, matched
+        )
+        return fallback
 
-    def _extract_chat_metadata(self, lines: List[str], format_info) -> ChatMetadata:
-        """Extract metadata using the detected format info."""
-        date_format = f"{format_info.date_format} {format_info.time_format}"
-        participant_names = self.message_extractor.extract_participant_names(lines)
-        my_name = self._determine_my_name(participant_names)
+    @timed_stage('metadata_extraction', count_items=lambda metadata: len(metadata.participant_names))
+    def _extract_chat_metadata(self, participant_stats: ParticipantStats, date_format: str, chat_name: str = '') -> ChatMetadata:
+        """Build the metadata from the participants found while parsing, resolving the owner without prompting."""
+        my_name = self.owner_resolver.resolve(participant_stats, chat_name)
+        logger.info("%d participant(s); owner: %s", len(participant_stats.message_counts), my_name or '(unknown)')
         return ChatMetadata(
-            participant_names=participant_names,
+            participant_names=participant_stats.participant_names,
             date_format=date_format,
-            my_name=my_name
+            my_name=my_name,
+            participant_stats=participant_stats
         )
 
-    @staticmethod
-    def _determine_my_name(participant_names: Set[str]) -> str:
-        if len(participant_names) == 1:
-            return list(participant_names)[0]
-        if len(participant_names) == 2:
-            print("\nDetected participants:")
-            for i, name in enumerate(sorted(participant_names), 1):
-                print(f"{i}. {name}")
-            choice = input("\nWhich one is you? (enter number): ")
-            try:
-                index = int(choice) - 1
-                return sorted(participant_names)[index]
-            except (ValueError, IndexError):
-                return sorted(participant_names)[0]
-        return sorted(participant_names)[0]
-
-    def _parse_all_messages(self, lines: List[str], message_parser: MessageParser) -> List[Message]:
-        message_start_lines = self.message_grouper.get_message_start_lines(lines)
-        messages = []
-        last_sender = ""
-        for i in range(len(message_start_lines)):
-            start = message_start_lines[i]
-            end = message_start_lines[i + 1] if i + 1 < len(message_start_lines) else len(lines)
-            message_lines = lines[start:end]
-            message = message_parser.parse_message(message_lines, last_sender)
-            messages.append(message)
-            if message.sender:
-                last_sender = message.sender
+    def _filter_owner_messages(self, messages: List[Message]) -> List[Message]:
+        """Apply the sender filter to messages whose owner was only resolved after parsing."""
+        if self.message_filter is None or self.message_filter.senders is None:
+            return messages
+        return [message for message in messages if self.message_filter.accepts_sender(message.sender)]
+
+    def _parse_all_messages(self, lines: List[str], message_parser: MessageParser, format_info: FormatInfo = None) -> List[Message]:
+        with stage_timer(self.stage_metrics, 'grouping', items=len(lines)):
+            if self.detect_format_switches and format_info is not None:
+                detector = self._create_format_switch_detector(format_info, message_parser.date_format)
+                message_start_lines = detector.get_message_start_lines(lines)
+                # Later segments, each applied from the first message starting in it
+                switches = detector.segments[:0:-1]
+            else:
+                message_start_lines = self.message_grouper.get_message_start_lines(lines)
+                switches = []
+        total = len(message_start_lines)
+        progress = self.progress
+        with stage_timer(self.stage_metrics, 'parsing', items=total):
+            messages = []
+            last_sender = ""
+            for i in range(total):
+                if not i % _PROGRESS_EVERY:
+                    progress.parsed(i, total)
+                start = message_start_lines[i]
+                while switches and start >= switches[-1].first_line:
+                    message_parser.set_date_format(switches.pop().date_format)
+                end = message_start_lines[i + 1] if i + 1 < len(message_start_lines) else len(lines)
+                message_lines = lines[start:end]
+                message = message_parser.parse_message(message_lines, last_sender)
+                if message is None:
+                    continue
+                messages.append(message)
+                if message.sender:
+                    last_sender = message.sender
+            progress.parsed(total, total)
         return messages
 
@@ -4,26 +4,74 @@
 Core business logic modules for the WhatsApp Archive Manager.
 
 This package contains all the main processing classes:
+- ArchivePackager: Packages output with only the media it references
 - FileManager: Manages file system operations
+- FormatSwitchDetector: Follows export format changes part-way through a chat
 - HTMLGenerator: Generates HTML output from messages
+- JSONLExporter: Streams parsed messages as JSON Lines
 - MediaHandler: Handles media file detection and embedding
+- MediaIndex: Single-scan index of a media folder
+- ContentAddressedMediaStore: Deduplicated media storage shared across archives
+- ConversionProgress: Progress/ETA events and cancellation for a running conversion
+- DefaultDateOrderResolver: Settles a chat's day/month/year order from all of its dates
 - MessageExtractor: Extracts raw data from chat lines
+- MessageFilter: Sender, date range and media filters applied while parsing
 - MessageGrouper: Groups chat lines into messages
 - MessageParser: Parses individual messages
+- ParallelSingleFileHTMLBackend: Renders single-file HTML in worker processes, written in order
+- CompiledTimestampParser: Regex-compiled replacement for strptime on chat timestamps
+- DefaultOwnerResolver: Decides who exported a chat without prompting
+- DefaultSystemMessageClassifier: Recognises system notices in every supported language
+- PipelineExecutor: Runs conversion stages concurrently over bounded queues
+- SearchIndexBuilder: Prefix-sharded static search index built while rendering
+- TimeIndex: Sparse byte-offset index for reading a time range or run of messages
+- VirtualizedViewerBackend: Writes JSON shards plus a windowed viewer page
 """
 
+from .archive_packager import ArchivePackager
+from .conversion_progress import ConversionProgress
+from .date_order_resolver import DefaultDateOrderResolver
 from .file_manager import FileManager
+from .format_switch_detector import FormatSwitchDetector
 from .html_generator import HTMLGenerator
+from .jsonl_exporter import JSONLExporter
 from .media_handler import MediaHandler
+from .media_index import MediaIndex
+from .media_store import ContentAddressedMediaStore
 from .message_extractor import MessageExtractor
+from .message_filter import MessageFilter
 from .message_grouper import MessageGrouper
 from .message_parser import MessageParser
+from .owner_resolver import DefaultOwnerResolver
+from .parallel_renderer import ParallelSingleFileHTMLBackend
+from .pipeline_executor import PipelineExecutor
+from .search_index import SearchIndexBuilder
+from .system_message_classifier import DefaultSystemMessageClassifier
+from .time_index import TimeIndex
+from .timestamp_parser import CompiledTimestampParser
+from .virtualized_viewer import VirtualizedViewerBackend
 
 __all__ = [
+    'ArchivePackager',
+    'CompiledTimestampParser',
+    'ContentAddressedMediaStore',
+    'ConversionProgress',
+    'DefaultDateOrderResolver',
+    'DefaultOwnerResolver',
+    'DefaultSystemMessageClassifier',
     'FileManager',
+    'FormatSwitchDetector',
     'HTMLGenerator',
+    'JSONLExporter',
     'MediaHandler',
+    'MediaIndex',
     'MessageExtractor',
+    'MessageFilter',
     'MessageGrouper',
     'MessageParser',
+    'ParallelSingleFileHTMLBackend',
+    'PipelineExecutor',
+    'SearchIndexBuilder',
+    'TimeIndex',
+    'VirtualizedViewerBackend',
 ]
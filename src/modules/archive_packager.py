@@ -0,0 +1,253 @@
+# src/modules/archive_packager.py
+
+import shutil
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+from src.modules.conversion_progress import ConversionProgress
+from src.modules.media_index import MediaIndex
+
+
+class MediaSourceInterface:
+    """Interface for reading media files by name from an export."""
+
+    def index(self) -> MediaIndex:
+        raise NotImplementedError
+
+    def open(self, name: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release handles held open between reads; the source stays usable."""
+
+
+class DirectoryMediaSource(MediaSourceInterface):
+    """Media files in an extracted export folder."""
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+
+    def index(self) -> MediaIndex:
+        return MediaIndex.scan(self.folder)
+
+    def open(self, name: str) -> BinaryIO:
+        return open(self.folder / name, 'rb')
+
+
+class ZipMediaSource(MediaSourceInterface):
+    """
+    Media files read straight from a WhatsApp ZIP export, without extracting it.
+
+    member_prefix is the folder of the chat file inside the ZIP ('' for the root).
+    Each thread gets its own ZipFile handle so reads can proceed in parallel;
+    close() closes them all, and later reads open new ones.
+    """
+
+    def __init__(self, zip_path: Path, member_prefix: str = ''):
+        self.zip_path = zip_path
+        self.member_prefix = member_prefix
+        self._local = threading.local()
+        self._handles: List[zipfile.ZipFile] = []
+        self._handles_lock = threading.Lock()
+
+    def index(self) -> MediaIndex:
+        with zipfile.ZipFile(self.zip_path) as zip_file:
+            return MediaIndex.from_zip(zip_file, self.member_prefix)
+
+    def open(self, name: str) -> BinaryIO:
+        zip_file = getattr(self._local, 'zip_file', None)
+        if zip_file is None:
+            zip_file = self._local.zip_file = zipfile.ZipFile(self.zip_path)
+            with self._handles_lock:
+                self._handles.append(zip_file)
+        return zip_file.open(f"{self.member_prefix}{name}")
+
+    def close(self) -> None:
+        with self._handles_lock:
+            handles, self._handles = self._handles, []
+            # Threads that outlive this call must not reuse a closed handle
+            self._local = threading.local()
+        for zip_file in handles:
+            zip_file.close()
+
+
+@dataclass
+class PackagingReport:
+    """Amount of data packaged and how fast."""
+    files: int = 0
+    bytes: int = 0
+    skipped_files: int = 0
+    seconds: float = 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+    def format(self) -> str:
+        return (
+            f"Packaged {self.files} file(s), {self.bytes / (1024 * 1024):.1f} MB in {self.seconds:.2f}s "
+            f"({self.megabytes_per_second:.1f} MB/s); skipped {self.skipped_files} unreferenced file(s)"
+        )
+
+
+class ArchivePackager:
+    """
+    Packages converted output together with only the media it references.
+
+    Media are read by a thread pool; ZIP output is written by the calling
+    thread since a ZIP file can only be appended to sequentially. Media are
+    stored uncompressed because photos, video and audio are already compressed.
+    """
+
+    # Files at least this large are streamed by the writer instead of prefetched into memory
+    STREAM_THRESHOLD = 32 * 1024 * 1024
+    COPY_BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, max_workers: Optional[int] = None, max_prefetch: int = 16):
+        self.max_workers = max_workers
+        self.max_prefetch = max_prefetch
+
+    def package_zip(
+        self,
+        output_files: Iterable[Tuple[Path, str]],
+        media_source: MediaSourceInterface,
+        media_files: Dict[str, str],
+        package_path: Path,
+        media_index: Optional[MediaIndex] = None,
+        progress: Optional[ConversionProgress] = None
+    ) -> PackagingReport:
+        """
+        Write output files and referenced media into a new ZIP.
+
+        Args:
+            output_files: (path on disk, name in archive) of converted output, e.g. the HTML
+            media_source: Where the referenced media are read from
+            media_files: Media name in the source -> name in the archive
+            package_path: ZIP file to create
+            media_index: Index of media_source, if already built
+            progress: Told of every media file written; cancelling it stops packaging
+                      with ConversionCancelled, leaving an incomplete ZIP behind
+        """
+        started = time.perf_counter()
+        if media_index is None:
+            media_index = media_source.index()
+        report = PackagingReport(skipped_files=self._count_unreferenced(media_index, media_files))
+        try:
+            self._write_package(package_path, output_files, media_source, media_files, media_index, report, progress)
+        finally:
+            media_source.close()
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def _write_package(
+        self,
+        package_path: Path,
+        output_files: Iterable[Tuple[Path, str]],
+        media_source: MediaSourceInterface,
+        media_files: Dict[str, str],
+        media_index: MediaIndex,
+        report: PackagingReport,
+        progress: Optional[ConversionProgress]
+    ) -> None:
+        with zipfile.ZipFile(package_path, 'w', allowZip64=True) as package:
+            for path, arcname in output_files:
+                package.write(path, self._checked_arcname(arcname), compress_type=zipfile.ZIP_DEFLATED)
+                report.files += 1
+                report.bytes += path.stat().st_size
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                pending = deque()
+                written = 0
+                for name, arcname in media_files.items():
+                    arcname = self._checked_arcname(arcname)
+                    info = media_index.get(name)
+                    if info is not None and info.size >= self.STREAM_THRESHOLD:
+                        pending.append((arcname, name, None))
+                    else:
+                        pending.append((arcname, name, pool.submit(self._read_all, media_source, name)))
+                    # Bound memory held by prefetched files
+                    while len(pending) > self.max_prefetch:
+                        report.bytes += self._write_media(package, media_source, *pending.popleft())
+                        report.files += 1
+                        written += 1
+                        if progress is not None:
+                            progress.packaged(written, len(media_files))
+                while pending:
+                    report.bytes += self._write_media(package, media_source, *pending.popleft())
+                    report.files += 1
+                    written += 1
+                    if progress is not None:
+                        progress.packaged(written, len(media_files))
+
+    def extract_to_directory(
+        self,
+        media_source: MediaSourceInterface,
+        media_files: Dict[str, str],
+        target_dir: Path,
+        media_index: Optional[MediaIndex] = None
+    ) -> PackagingReport:
+        """Copy or extract referenced media into target_dir in parallel."""
+        started = time.perf_counter()
+        if media_index is None:
+            media_index = media_source.index()
+
+        def copy(item: Tuple[str, str]) -> int:
+            name, arcname = item
+            target = target_dir / self._checked_arcname(arcname)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with media_source.open(name) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, self.COPY_BUFFER_SIZE)
+            return target.stat().st_size
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                sizes: List[int] = list(pool.map(copy, media_files.items()))
+        finally:
+            media_source.close()
+        return PackagingReport(
+            files=len(sizes),
+            bytes=sum(sizes),
+            skipped_files=self._count_unreferenced(media_index, media_files),
+            seconds=time.perf_counter() - started,
+        )
+
+    def _write_media(self, package: zipfile.ZipFile, media_source: MediaSourceInterface,
+                     arcname: str, name: str, future) -> int:
+        if future is not None:
+            data = future.result()
+            package.writestr(arcname, data, compress_type=zipfile.ZIP_STORED)
+            return len(data)
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        written = 0
+        with media_source.open(name) as src, package.open(info, 'w', force_zip64=True) as dst:
+            while chunk := src.read(self.COPY_BUFFER_SIZE):
+                dst.write(chunk)
+                written += len(chunk)
+        return written
+
+    @staticmethod
+    def _count_unreferenced(media_index: MediaIndex, media_files: Dict[str, str]) -> int:
+        """Indexed files that are not packaged, other than the chat transcripts."""
+        referenced = {media_index.lookup(name) for name in media_files}
+        return sum(
+            1 for name in media_index
+            if name not in referenced and not name.lower().endswith('.txt')
+        )
+
+    @staticmethod
+    def _read_all(media_source: MediaSourceInterface, name: str) -> bytes:
+        with media_source.open(name) as src:
+            return src.read()
+
+    @staticmethod
+    def _checked_arcname(arcname: str) -> str:
+        path = PurePosixPath(arcname.replace('\\', '/'))
+        if path.is_absolute() or '..' in path.parts:
+            raise ValueError(f"Cannot package {arcname!r}: path must stay inside the archive")
+        return str(path)
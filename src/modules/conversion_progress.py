@@ -0,0 +1,168 @@
+# src/modules/conversion_progress.py
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+
+class ConversionCancelled(Exception):
+    """Raised inside a conversion once it has been cancelled."""
+
+
+@dataclass
+class ProgressEvent:
+    """Snapshot of a running conversion, passed to progress callbacks."""
+    stage: str
+    bytes_read: int = 0
+    total_bytes: int = 0
+    messages_parsed: int = 0
+    messages_rendered: int = 0
+    total_messages: int = 0
+    media_files_packaged: int = 0
+    total_media_files: int = 0
+    elapsed_seconds: float = 0.0
+    # Share of the whole conversion done, 0.0 to 1.0
+    fraction: float = 0.0
+    eta_seconds: Optional[float] = None
+    done: bool = False
+
+
+class ConversionProgress:
+    """
+    Reports how far a conversion got and lets another thread cancel it.
+
+    The callback receives a ProgressEvent at most every min_interval seconds
+    (and at every stage change and at the end), on the converting thread; pass
+    queue.put to hand events to a GUI thread. cancel() may be called from any
+    thread: the conversion raises ConversionCancelled at its next progress
+    report, which the converter turns into removing its partial output. A
+    cancel made before a conversion starts stops it at once; the event is
+    cleared when the outermost run ends, however it ends, so one progress
+    object can be reused. Pipeline threads may share it while a run is open.
+
+    The estimated time remaining assumes each stage takes its STAGE_WEIGHTS
+    share of the conversion, scaled to the stages the conversion runs.
+    """
+
+    # Rough relative cost of each stage on a typical export
+    STAGE_WEIGHTS: Dict[str, float] = {
+        'reading': 1.0,
+        'parsing': 3.0,
+        'rendering': 4.0,
+        'packaging': 2.0,
+    }
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[ProgressEvent], object]] = None,
+        min_interval: float = 0.1,
+        cancel_event: threading.Event = None
+    ):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.cancel_event = cancel_event or threading.Event()
+        self._stages: Sequence[str] = ()
+        self._depth = 0
+        self._depth_lock = threading.Lock()
+        self._reset('')
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise ConversionCancelled()
+
+    @contextmanager
+    def run(self, stages: Sequence[str]) -> Iterator['ConversionProgress']:
+        """
+        Track one conversion made of the given stages, emitting a final event when it succeeds.
+
+        Nested runs, e.g. the conversion inside a packaging run, belong to the
+        outermost one and do not restart it. The outermost run clears the
+        cancel event when it ends.
+        """
+        with self._depth_lock:
+            outermost = self._depth == 0
+            if outermost:
+                self._stages = tuple(stages)
+                self._reset(self._stages[0] if self._stages else '')
+            self._depth += 1
+        try:
+            if outermost:
+                self.check_cancelled()
+            yield self
+        finally:
+            with self._depth_lock:
+                self._depth -= 1
+                finished = self._depth == 0
+            if finished:
+                self.cancel_event.clear()
+        if finished:
+            self._event.done = True
+            self._event.fraction = 1.0
+            self._event.eta_seconds = 0.0
+            self._emit(force=True)
+
+    def read(self, bytes_read: int, total_bytes: int) -> None:
+        self._event.bytes_read = bytes_read
+        self._event.total_bytes = total_bytes
+        self._update('reading', bytes_read, total_bytes)
+
+    def parsed(self, messages: int, total_messages: int) -> None:
+        self._event.messages_parsed = messages
+        self._event.total_messages = total_messages
+        self._update('parsing', messages, total_messages)
+
+    def rendered(self, messages: int, total_messages: int) -> None:
+        self._event.messages_rendered = messages
+        self._update('rendering', messages, total_messages)
+
+    def packaged(self, media_files: int, total_media_files: int) -> None:
+        self._event.media_files_packaged = media_files
+        self._event.total_media_files = total_media_files
+        self._update('packaging', media_files, total_media_files)
+
+    def _reset(self, stage: str) -> None:
+        self._event = ProgressEvent(stage)
+        self._started = time.perf_counter()
+        self._last_emit = float('-inf')
+
+    def _update(self, stage: str, done: int, total: int) -> None:
+        self.check_cancelled()
+        event = self._event
+        stage_changed = stage != event.stage
+        event.stage = stage
+        event.fraction = self._fraction(stage, done / total if total else 1.0)
+        self._emit(force=stage_changed)
+
+    def _fraction(self, stage: str, stage_fraction: float) -> float:
+        weights = [self.STAGE_WEIGHTS.get(name, 1.0) for name in self._stages]
+        if stage not in self._stages or not sum(weights):
+            return self._event.fraction
+        index = self._stages.index(stage)
+        done = sum(weights[:index]) + weights[index] * min(stage_fraction, 1.0)
+        # Never move backwards, e.g. when a nested run reports an earlier stage again
+        return max(self._event.fraction, done / sum(weights))
+
+    def _emit(self, force: bool = False) -> None:
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+        event = self._event
+        event.elapsed_seconds = now - self._started
+        if not event.done:
+            event.eta_seconds = (
+                event.elapsed_seconds * (1.0 - event.fraction) / event.fraction if event.fraction > 0 else None
+            )
+        # Callbacks get their own copy since the converter keeps updating this one
+        self.callback(ProgressEvent(**vars(event)))
@@ -0,0 +1,186 @@
+# src/modules/date_order_resolver.py
+
+import logging
+import re
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+from src.configuration_and_enums.whatsapp_formats import FormatInfo
+from src.utils.line_reader import iter_decoded_chunks
+
+logger = logging.getLogger(__name__)
+
+# Date at the start of a line: three numeric fields with one separator, after an optional '[' or LRM mark
+_DATE_BODY = r'[‎\[]*(\d{1,4})([./-])(\d{1,2})\2(\d{1,4})'
+_FIRST_DATE = re.compile(_DATE_BODY)
+# Anchoring on '\n' rather than (?m)^ makes findall over a whole chat markedly faster
+_LINE_DATES = re.compile('\n' + _DATE_BODY)
+
+ORDER_DMY = 'dmy'
+ORDER_MDY = 'mdy'
+ORDER_YMD = 'ymd'
+ORDER_YDM = 'ydm'
+
+
+@dataclass
+class DateOrderResolution:
+    """Field order decided for a chat and the '<date> <time>' strptime-style format that follows from it."""
+    date_format: str
+    order: str
+    distinct_dates: int
+    # True if the values alone could not tell day from month and the chronology decided
+    by_chronology: bool = False
+
+
+class DateOrderResolverInterface:
+    """Interface for deciding the day/month/year order of a chat's timestamps."""
+    def resolve(self, texts: Iterable[str], format_info: FormatInfo) -> DateOrderResolution:
+        raise NotImplementedError
+
+
+class DefaultDateOrderResolver(DateOrderResolverInterface):
+    """
+    Decides the date field order from every date in the chat rather than a guess.
+
+    Formats such as ANDROID_US and ANDROID_EU share one regex, so the detected
+    format's date order is only a prior. All line-leading dates are pulled out
+    with one findall per chunk, reduced to the distinct dates in order of first
+    appearance and held as integer arrays. Dates not shaped like the majority
+    (separator, 4-digit first field) are ignored. A 4-digit first field puts
+    the year first. Otherwise a field exceeding 12 is the day; if neither does, the
+    order under which the dates run chronologically (fewest inversions) wins,
+    and a tie keeps the format's own order.
+    """
+
+    def resolve(self, texts: Iterable[str], format_info: FormatInfo) -> DateOrderResolution:
+        """texts: the chat, whole or in chunks that each start at a line start (see iter_text_chunks, iter_line_chunks)."""
+        dates = dict.fromkeys(self._iter_dates(texts))
+        default_format = f"{format_info.date_format} {format_info.time_format}"
+        if not dates:
+            return DateOrderResolution(default_format, self._order_of(format_info.date_format), 0)
+        # Message lines share one shape; dates of other shapes come from message bodies or,
+        # in concatenated exports, from other formats, so the format's own shape comes first
+        shapes = Counter((fields[1], len(fields[0]) == 4) for fields in dates)
+        format_shape = self._shape_of(format_info.date_format)
+        separator, first_is_year = format_shape if format_shape in shapes else shapes.most_common(1)[0][0]
+        dates = [fields for fields in dates if fields[1] == separator and (len(fields[0]) == 4) == first_is_year]
+        first = array('H', (int(fields[0]) for fields in dates))
+        second = array('H', (int(fields[2]) for fields in dates))
+        third = array('H', (int(fields[3]) for fields in dates))
+        by_chronology = False
+        if first_is_year:
+            year_digits = 4
+            order = ORDER_YDM if max(second) > 12 >= max(third) else ORDER_YMD
+        else:
+            year_digits = 4 if max(third) > 99 else 2
+            first_max, second_max = max(first), max(second)
+            if first_max > 12 >= second_max:
+                order = ORDER_DMY
+            elif second_max > 12 >= first_max:
+                order = ORDER_MDY
+            else:
+                order = self._order_by_chronology(first, second, third, format_info)
+                by_chronology = first_max <= 12 and second_max <= 12
+        date_format = self._date_format(order, separator, year_digits)
+        resolution = DateOrderResolution(f"{date_format} {format_info.time_format}", order, len(dates), by_chronology)
+        if resolution.date_format != default_format:
+            logger.info("Date order resolved to %s (%s) instead of %s", order, date_format, format_info.date_format)
+        return resolution
+
+    @staticmethod
+    def _iter_dates(texts: Iterable[str], window: int = 1 << 22) -> Iterator[Tuple[str, str, str, str]]:
+        """Line-leading date fields; findall runs over windows ending at a line end to bound its result list."""
+        for text in texts:
+            if match := _FIRST_DATE.match(text):
+                yield match.groups()
+            position = 0
+            while position < len(text):
+                end = text.rfind('\n', position + 1, position + window) if position + window < len(text) else -1
+                end = len(text) if end < 0 else end
+                yield from _LINE_DATES.findall(text, position, end)
+                position = end
+
+    @staticmethod
+    def _order_by_chronology(first: array, second: array, third: array, format_info: FormatInfo) -> str:
+        """
+        The order whose dates go backwards least often. On a tie the order
+        spanning fewer days wins (a chat on Jan 1, 2 and 3 rather than on the
+        1st of Jan, Feb and Mar), then the format's own order.
+        """
+        dmy = list(zip(third, second, first))
+        mdy = list(zip(third, first, second))
+        dmy_rank = (DefaultDateOrderResolver._inversions(dmy), DefaultDateOrderResolver._span_days(dmy))
+        mdy_rank = (DefaultDateOrderResolver._inversions(mdy), DefaultDateOrderResolver._span_days(mdy))
+        if dmy_rank == mdy_rank:
+            return ORDER_MDY if DefaultDateOrderResolver._order_of(format_info.date_format) == ORDER_MDY else ORDER_DMY
+        return ORDER_DMY if dmy_rank < mdy_rank else ORDER_MDY
+
+    @staticmethod
+    def _inversions(keys: List[Tuple[int, int, int]]) -> int:
+        return sum(1 for previous, current in zip(keys, keys[1:]) if current < previous)
+
+    @staticmethod
+    def _span_days(keys: List[Tuple[int, int, int]]) -> int:
+        """Days from the earliest to the latest (year, month, day) key; keys that are no valid date are skipped."""
+        ordinals = []
+        for year, month, day in keys:
+            try:
+                ordinals.append(date(year if year > 99 else year + 2000, month, day).toordinal())
+            except ValueError:
+                continue
+        return max(ordinals) - min(ordinals) if ordinals else 0
+
+    @staticmethod
+    def _shape_of(date_format: str) -> Tuple[Optional[str], bool]:
+        """(separator, starts with a 4-digit year) of a date format such as '%d/%m/%Y'."""
+        separator = next((char for char in date_format if char in './-'), None)
+        return separator, date_format.lstrip('%').startswith('Y')
+
+    @staticmethod
+    def _order_of(date_format: str) -> str:
+        fields = [code for code in re.findall(r'%(.)', date_format) if code in 'dmYy']
+        return ''.join('y' if code in 'Yy' else code for code in fields) or ORDER_DMY
+
+    @staticmethod
+    def _date_format(order: str, separator: str, year_digits: int) -> str:
+        codes = {'d': '%d', 'm': '%m', 'y': '%Y' if year_digits == 4 else '%y'}
+        return separator.join(codes[field] for field in order)
+
+
+def iter_text_chunks(
+    chat_file: Path,
+    encoding: str,
+    max_chars: Optional[int] = None,
+    chunk_size: int = 1 << 22
+) -> Iterator[str]:
+    """Read a chat file in chunks that each end at a line end; max_chars stops early."""
+    remaining = max_chars
+    pending = ''
+    if max_chars is not None:
+        # Every character takes at least one byte, so no chunk is read far past the limit
+        chunk_size = max(1, min(chunk_size, max_chars))
+    for chunk in iter_decoded_chunks(chat_file, encoding, chunk_size=chunk_size):
+        if remaining is not None:
+            if remaining <= 0:
+                break
+            chunk = chunk[:remaining]
+            remaining -= len(chunk)
+        chunk = pending + chunk
+        cut = chunk.rfind('\n')
+        if cut < 0:
+            pending = chunk
+            continue
+        # The newline stays with the next chunk so its first date is still found
+        pending = chunk[cut:]
+        yield chunk[:cut]
+    if pending:
+        yield pending
+
+
+def iter_line_chunks(lines: List[str], lines_per_chunk: int = 1 << 12) -> Iterator[str]:
+    """Join already split lines into chunks that each start at a line start, for resolve()."""
+    for start in range(0, len(lines), lines_per_chunk):
+        yield '\n'.join(lines[start:start + lines_per_chunk])
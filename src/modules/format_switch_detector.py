@@ -0,0 +1,180 @@
+# src/modules/format_switch_detector.py
+
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+from src.configuration_and_enums.format_detector import FormatDetector, WhatsAppFormat
+from src.configuration_and_enums.whatsapp_formats import FormatInfo
+from src.modules.date_order_resolver import DateOrderResolverInterface, DefaultDateOrderResolver
+from src.modules.message_grouper import DefaultMessageStartStrategy, MessageStartStrategyInterface
+from src.utils.custom_logging.decorators import temporary_log_level
+
+logger = logging.getLogger(__name__)
+
+# The clean-up FormatDetector applies to sample lines before matching format regexes
+_DETECTION_CLEANUP = str.maketrans({'\u202f': ' ', '\xa0': ' ', '\u200e': None, '\u200f': None, '\u202a': None})
+# Invisible marks that may precede a timestamp
+_LEADING_MARKS = '\u200e\u200f\u202a\ufeff'
+# Where the sender part of a format regex begins
+_SENDER_GROUPS = ('([^:]+)', '(?P<sender>')
+
+
+@lru_cache(maxsize=64)
+def timestamp_pattern(regex: str) -> Pattern[str]:
+    """
+    The part of a format regex before the sender, matching the timestamp alone.
+
+    It is short and anchored, so checking every line against it is cheap, and
+    system notices (which have no sender) still match. Regexes without a
+    sender group are used whole.
+    """
+    cut = min((regex.find(group) for group in _SENDER_GROUPS if group in regex), default=len(regex))
+    return re.compile(regex[:cut], re.IGNORECASE)
+
+
+@dataclass
+class FormatSegment:
+    """A run of chat lines written in one export format."""
+    first_line: int
+    format_type: WhatsAppFormat
+    format_info: FormatInfo
+    date_format: str
+
+
+class FormatSwitchDetector:
+    """
+    Notices an export format switching part-way through a chat.
+
+    This happens when several exports are concatenated, e.g. after a phone
+    locale change or a move from iOS to Android. Lines are classified as they
+    stream past. A line that looks timestamped is suspicious if its timestamp
+    does not fit the active format (see timestamp_pattern), and a fitting line
+    ends a run of suspicious lines. After run_length suspicious lines in a row, formats are detected
+    again on just those lines. If another format fits them with at least
+    min_confidence, it becomes active from the first of them on, with its date
+    order resolved from the same lines. Lines of an unsettled run are held
+    back, so at most one run is buffered and the file is read once.
+
+    Failed re-detections double the run needed before the next attempt, until
+    a fitting line resets it.
+    """
+
+    def __init__(
+        self,
+        format_info: FormatInfo,
+        date_format: str,
+        format_type: WhatsAppFormat = WhatsAppFormat.UNKNOWN,
+        format_detector: FormatDetector = None,
+        date_order_resolver: DateOrderResolverInterface = None,
+        start_strategy: MessageStartStrategyInterface = None,
+        run_length: int = 8,
+        min_confidence: float = 0.6
+    ):
+        if run_length < 1:
+            raise ValueError("run_length must be at least 1")
+        self.format_detector = format_detector or FormatDetector()
+        self.date_order_resolver = date_order_resolver or DefaultDateOrderResolver()
+        self.start_strategy = start_strategy or DefaultMessageStartStrategy()
+        self.run_length = run_length
+        self.min_confidence = min_confidence
+        # Every segment seen so far, in file order
+        self.segments: List[FormatSegment] = [FormatSegment(0, format_type, format_info, date_format)]
+
+    def classify(self, lines: Iterable[str]) -> Iterator[Tuple[str, bool, FormatSegment]]:
+        """Yield (line, starts a message, segment of the line) for every line, in order."""
+        is_generic_start = self.start_strategy.is_message_start
+        segment = self.segments[-1]
+        match = segment.format_info.pattern.match
+        fits = timestamp_pattern(segment.format_info.regex).match
+        pending: List[Tuple[int, str, str]] = []
+        suspicious = 0
+        retry_at = self.run_length
+        for index, line in enumerate(lines):
+            generic = is_generic_start(line)
+            head = line.lstrip(_LEADING_MARKS)
+            first = head[:1]
+            if not (generic or first.isdigit() or (first == '[' and head[1:2].isdigit())):
+                # Cannot start a message in any format
+                if pending:
+                    pending.append((index, line, ''))
+                else:
+                    yield line, generic, segment
+                continue
+            if fits(head):
+                if pending:
+                    yield from self._settle(pending, segment)
+                    pending = []
+                    suspicious = 0
+                retry_at = self.run_length
+                yield line, generic or match(line.translate(_DETECTION_CLEANUP).strip()) is not None, segment
+                continue
+            pending.append((index, line, line.translate(_DETECTION_CLEANUP).strip()))
+            suspicious += 1
+            if suspicious < retry_at:
+                continue
+            switched = self._redetect(pending, segment)
+            if switched is None:
+                retry_at *= 2
+            else:
+                segment = switched
+                match = segment.format_info.pattern.match
+                fits = timestamp_pattern(segment.format_info.regex).match
+                retry_at = self.run_length
+            yield from self._settle(pending, segment)
+            pending = []
+            suspicious = 0
+        yield from self._settle(pending, segment)
+
+    def iter_message_groups(self, lines: Iterable[str]) -> Iterator[Tuple[FormatSegment, List[str]]]:
+        """
+        Group a stream of lines into per-message line lists, each with its segment.
+
+        Like MessageGrouper.iter_message_groups, lines before the first
+        message start are skipped.
+        """
+        group: List[str] = []
+        group_segment = None
+        for line, is_start, segment in self.classify(lines):
+            if is_start:
+                if group:
+                    yield group_segment, group
+                group = [line]
+                group_segment = segment
+            elif group:
+                group.append(line)
+        if group:
+            yield group_segment, group
+
+    def get_message_start_lines(self, lines: List[str]) -> List[int]:
+        """Indices of message start lines; the segments found are in self.segments."""
+        return [index for index, (_, is_start, _) in enumerate(self.classify(lines)) if is_start]
+
+    def _settle(self, pending: List[Tuple[int, str, str]], segment: FormatSegment) -> Iterator[Tuple[str, bool, FormatSegment]]:
+        is_generic_start = self.start_strategy.is_message_start
+        match = segment.format_info.pattern.match
+        for _, line, clean in pending:
+            yield line, bool(clean) and (is_generic_start(line) or match(clean) is not None), segment
+
+    def _redetect(self, pending: List[Tuple[int, str, str]], segment: FormatSegment) -> Optional[FormatSegment]:
+        window = [clean for _, _, clean in pending if clean]
+        # A failed attempt is routine here, not worth FormatDetector's warnings
+        with temporary_log_level(logging.getLogger(FormatDetector.__module__), logging.ERROR):
+            format_type, confidence, _ = self.format_detector.detection_strategy.detect_format(
+                window, self.min_confidence
+            )
+        if format_type == WhatsAppFormat.UNKNOWN:
+            return None
+        format_info = self.format_detector.get_format_info(format_type)
+        if format_info.regex == segment.format_info.regex:
+            return None
+        resolution = self.date_order_resolver.resolve(['\n'.join(window)], format_info)
+        first_line = next(index for index, _, clean in pending if clean)
+        switched = FormatSegment(first_line, format_type, format_info, resolution.date_format)
+        self.segments.append(switched)
+        logger.info(
+            "Export format switches from %s to %s at line %d (confidence %.2f, date format %s)",
+            segment.format_type.value, format_type.value, first_line + 1, confidence, switched.date_format
+        )
+        return switched
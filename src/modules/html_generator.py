@@ -1,9 +1,12 @@
 import html
-from typing import List, Optional
-from src.modules.media_handler import MediaHandler
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from src.modules.media_handler import MediaHandler, CONTENT_TEXT
+from src.modules.search_index import SEARCH_BAR_HTML, SEARCH_CSS, SearchIndexBuilder, search_page_script
 from src.data_models.chat_metadata import ChatMetadata
 from src.data_models import Message
 from src.utils.text_utils import TextUtils
+from src.utils.custom_logging.decorators import stage_timer
 
 
 class MessageHTMLRendererInterface:
@@ -12,6 +15,19 @@ class MessageHTMLRendererInterface:
     def render(self, message: Message, sender_class: str, media_handler: MediaHandler) -> str:
         raise NotImplementedError
 
+    def prepare(self, chat_metadata: ChatMetadata, media_handler: MediaHandler) -> None:
+        """Hook for per-chat precomputation before the first message is rendered."""
+
+    def render_to(
+        self,
+        write: Callable[[str], object],
+        message: Message,
+        sender_class: str,
+        media_handler: MediaHandler
+    ) -> None:
+        """Render a message by passing its HTML fragments to write."""
+        write(self.render(message, sender_class, media_handler))
+
 
 class DefaultMessageHTMLRenderer(MessageHTMLRendererInterface):
     """Default renderer for user messages."""
@@ -28,16 +44,171 @@ class DefaultMessageHTMLRenderer(MessageHTMLRendererInterface):
         )
 
 
+class PrecomputedMessageHTMLRenderer(MessageHTMLRendererInterface):
+    """
+    Low-allocation renderer producing the same markup as DefaultMessageHTMLRenderer.
+
+    Participant names are escaped once per chat, formatted timestamps are
+    cached per minute, content is classified in a single scan and fragments
+    are written straight to the output buffer.
+    """
+
+    _TEXT_CLOSE = '</span>'
+    _MESSAGE_CLOSE = '</div></div>'
+    _TIMESTAMP_OPEN = '</div><div class="timestamp">'
+    _CONTENT_OPEN = '</div><div class="content">'
+
+    def __init__(self):
+        self._sender_html: Dict[str, str] = {}
+        self._timestamp_cache: Dict[int, str] = {}
+        self._message_open: Dict[str, str] = {}
+        self._text_open: Dict[str, str] = {}
+
+    def prepare(self, chat_metadata: ChatMetadata, media_handler: MediaHandler) -> None:
+        self._sender_html = {name: html.escape(name) for name in chat_metadata.participant_names}
+        self._timestamp_cache = {}
+
+    def render(self, message: Message, sender_class: str, media_handler: MediaHandler) -> str:
+        parts: List[str] = []
+        self.render_to(parts.append, message, sender_class, media_handler)
+        return ''.join(parts)
+
+    def render_to(
+        self,
+        write: Callable[[str], object],
+        message: Message,
+        sender_class: str,
+        media_handler: MediaHandler
+    ) -> None:
+        message_open = self._message_open.get(sender_class)
+        if message_open is None:
+            message_open = self._message_open[sender_class] = (
+                f'<div class="message {sender_class}"><div class="sender">'
+            )
+            self._text_open[sender_class] = f'<span class="{sender_class}">'
+        sender_html = self._sender_html.get(message.sender)
+        if sender_html is None:
+            sender_html = self._sender_html[message.sender] = html.escape(message.sender)
+
+        write(message_open)
+        write(sender_html)
+        write(self._TIMESTAMP_OPEN)
+        if message.timestamp:
+            write(self._format_timestamp(message.timestamp))
+        write(self._CONTENT_OPEN)
+        content = message.content
+        kind, filename = media_handler.classify_content(content)
+        if kind == CONTENT_TEXT:
+            write(self._text_open[sender_class])
+            write(TextUtils.escape_html(content))
+            write(self._TEXT_CLOSE)
+        else:
+            write(media_handler.create_classified_embed(kind, filename, content, sender_class))
+        write(self._MESSAGE_CLOSE)
+
+    def _format_timestamp(self, timestamp) -> str:
+        minute_key = (timestamp.toordinal() * 24 + timestamp.hour) * 60 + timestamp.minute
+        display = self._timestamp_cache.get(minute_key)
+        if display is None:
+            display = self._timestamp_cache[minute_key] = timestamp.strftime('%Y-%m-%d %H:%M')
+        return display
+
+
+class HTMLOutputBackendInterface:
+    """Interface for writing a converted chat to disk."""
+
+    def write(
+        self,
+        html_generator: 'HTMLGenerator',
+        messages: List[Message],
+        chat_metadata: ChatMetadata,
+        media_handler: MediaHandler,
+        output_path: Path
+    ) -> Path:
+        raise NotImplementedError
+
+
+class SingleFileHTMLBackend(HTMLOutputBackendInterface):
+    """Default backend writing one self-contained HTML document."""
+
+    def write(
+        self,
+        html_generator: 'HTMLGenerator',
+        messages: List[Message],
+        chat_metadata: ChatMetadata,
+        media_handler: MediaHandler,
+        output_path: Path
+    ) -> Path:
+        stage_metrics = getattr(html_generator, 'stage_metrics', None)
+        html_generator.begin_search_index(output_path)
+        with stage_timer(stage_metrics, 'rendering', items=len(messages)):
+            html_content = html_generator.generate_html(messages, chat_metadata, media_handler)
+        with stage_timer(stage_metrics, 'writing') as stage:
+            encoded = html_content.encode('utf-8')
+            output_path.write_bytes(encoded)
+            stage.bytes = len(encoded)
+        html_generator.finish_search_index()
+        return output_path
+
+
 class HTMLGenerator:
     """Responsible for generating HTML output."""
 
+    # Messages rendered between progress reports
+    PROGRESS_SLICE = 1000
+
     def __init__(
         self,
         css_template: Optional[str] = None,
-        message_renderer: Optional[MessageHTMLRendererInterface] = None
+        message_renderer: Optional[MessageHTMLRendererInterface] = None,
+        output_backend: Optional[HTMLOutputBackendInterface] = None,
+        search_index: bool = False
     ):
+        """
+        With search_index, written output gets a search bar backed by a static
+        index built while rendering, in a "<output stem>_search" folder beside it.
+        """
         self.css_template = css_template or self._default_css()
         self.message_renderer = message_renderer or DefaultMessageHTMLRenderer()
+        self.output_backend = output_backend or SingleFileHTMLBackend()
+        self.search_index = search_index
+        # Index of the output being written, between begin_search_index and finish_search_index
+        self.search_index_builder: Optional[SearchIndexBuilder] = None
+        # Set by the converter to collect per-stage timings
+        self.stage_metrics = None
+        # Set by the converter to report rendering progress
+        self.progress = None
+
+    def write_output(
+        self,
+        messages: List[Message],
+        chat_metadata: ChatMetadata,
+        media_handler: MediaHandler,
+        output_path: Path
+    ) -> Path:
+        """Write messages to output_path using the configured output backend."""
+        return self.output_backend.write(self, messages, chat_metadata, media_handler, output_path)
+
+    def begin_search_index(self, output_path: Path) -> Optional[SearchIndexBuilder]:
+        """
+        Start indexing the messages rendered from now on for the page at output_path.
+
+        Does nothing unless search_index is enabled. While indexing, the
+        document head and tail include the search bar and script.
+        """
+        if self.search_index:
+            self.search_index_builder = SearchIndexBuilder(output_path.with_name(f"{output_path.stem}_search"))
+        return self.search_index_builder
+
+    def finish_search_index(self) -> None:
+        """Write the index started by begin_search_index, if any."""
+        builder = self.search_index_builder
+        if builder is None:
+            return
+        self.search_index_builder = None
+        with stage_timer(self.stage_metrics, 'search_index') as stage:
+            stage.items = builder.messages
+            stage.bytes = builder.write()
 
     def generate_html(
         self,
@@ -47,6 +218,11 @@ class HTMLGenerator:
     ) -> str:
         """Generate complete HTML document from messages."""
         message_html = self._generate_message_html(messages, chat_metadata, media_handler)
+        return f"{self.document_head()}{message_html}{self.document_tail()}"
+
+    def document_head(self) -> str:
+        """Return the document markup preceding the first message."""
+        searching = self.search_index_builder is not None
         return (
             "<!DOCTYPE html>\n"
             "<html lang=\"en\">\n"
@@ -56,16 +232,46 @@ class HTMLGenerator:
             "    <title>WhatsApp Chat</title>\n"
             "    <style>\n"
             f"{self.css_template}\n"
+            f"{SEARCH_CSS if searching else ''}"
             "    </style>\n"
             "</head>\n"
             "<body>\n"
+            f"{SEARCH_BAR_HTML if searching else ''}"
             "    <div class=\"chat-container\">\n"
-            f"{message_html}\n"
+        )
+
+    def document_tail(self) -> str:
+        """Return the document markup following the last message."""
+        builder = self.search_index_builder
+        return (
+            "\n"
             "    </div>\n"
+            f"{search_page_script(builder) if builder is not None else ''}"
             "</body>\n"
             "</html>"
         )
 
+    def iter_message_html(
+        self,
+        message_batches: Iterable[List[Message]],
+        chat_metadata: ChatMetadata,
+        media_handler: MediaHandler
+    ) -> Iterator[str]:
+        """
+        Lazily render batches of messages.
+
+        The concatenated chunks equal _generate_message_html for the same messages.
+        """
+        self.message_renderer.prepare(chat_metadata, media_handler)
+        leading_separator = False
+        for batch in message_batches:
+            if not batch:
+                continue
+            html_parts: List[str] = []
+            self._render_into(html_parts.append, batch, chat_metadata.my_name, media_handler, leading_separator)
+            leading_separator = True
+            yield ''.join(html_parts)
+
     def _generate_message_html(
         self,
         messages: List[Message],
@@ -73,16 +279,44 @@ class HTMLGenerator:
         media_handler: MediaHandler
     ) -> str:
         """Generate HTML for all messages using renderer class."""
-        html_parts = []
+        html_parts: List[str] = []
+        self.message_renderer.prepare(chat_metadata, media_handler)
+        progress = self.progress
+        if progress is None:
+            self._render_into(html_parts.append, messages, chat_metadata.my_name, media_handler, False)
+            return ''.join(html_parts)
+        # Rendered in slices so progress is reported, and cancellation noticed, between them
+        total = len(messages)
+        for start in range(0, total, self.PROGRESS_SLICE):
+            progress.rendered(start, total)
+            self._render_into(
+                html_parts.append, messages[start:start + self.PROGRESS_SLICE],
+                chat_metadata.my_name, media_handler, start > 0
+            )
+        progress.rendered(total, total)
+        return ''.join(html_parts)
+
+    def _render_into(
+        self,
+        write: Callable[[str], object],
+        messages: Iterable[Message],
+        my_name: str,
+        media_handler: MediaHandler,
+        leading_separator: bool
+    ) -> None:
+        """Write message HTML fragments, separating messages with newlines."""
+        render_to = self.message_renderer.render_to
+        if self.search_index_builder is not None:
+            messages = self.search_index_builder.indexed(messages)
         for message in messages:
+            if leading_separator:
+                write('\n')
+            leading_separator = True
             if getattr(message, "is_system_message", False):
-                html_parts.append(self._create_system_message_html(message))
+                write(self._create_system_message_html(message))
             else:
-                sender_class = 'me' if message.sender == chat_metadata.my_name else 'other'
-                html_parts.append(
-                    self.message_renderer.render(message, sender_class, media_handler)
-                )
-        return '\n'.join(html_parts)
+                sender_class = 'me' if message.sender == my_name else 'other'
+                render_to(write, message, sender_class, media_handler)
 
     @staticmethod
     def _create_system_message_html(message: Message) -> str:
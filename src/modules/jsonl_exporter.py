@@ -0,0 +1,161 @@
+# src/modules/jsonl_exporter.py
+
+"""
+Streaming JSON Lines export of parsed messages.
+
+Usage:
+    python -m src.modules.jsonl_exporter CHAT.txt [--output OUT.jsonl[.gz]] [--gzip]
+"""
+
+import argparse
+import gzip
+import io
+import json
+from json.encoder import encode_basestring
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, TextIO
+from src.data_models import Message, ParticipantStats
+from src.modules.media_handler import CONTENT_ATTACHMENT, MediaHandler
+from src.modules.owner_resolver import OWNER_PLACEHOLDER
+
+# Bump when a field is renamed, removed or changes meaning; adding fields keeps the version
+JSONL_SCHEMA_VERSION = 1
+JSONL_SCHEMA = 'whatsapp-archive-messages'
+
+RECORD_HEADER = 'header'
+RECORD_MESSAGE = 'message'
+RECORD_SUMMARY = 'summary'
+
+
+@dataclass
+class ExportReport:
+    """Outcome of a JSONL export."""
+    output_path: str
+    messages: int
+    bytes_written: int
+    compressed: bool
+
+
+class JSONLExporter:
+    """
+    Writes one JSON record per line: a header, one record per message and a summary.
+
+    Message records hold "timestamp" (ISO 8601 or null), "sender", "content",
+    "attachment" (file name or null), "system" and "from_owner". Messages
+    marked with MY_MESSAGE_PREFIX are streamed before the owner is resolved,
+    so they have "from_owner": true and "sender": null; the summary record
+    at the end names the resolved "owner" and counts messages per sender.
+
+    Messages are consumed from any iterable and written in batches through a
+    buffered (optionally gzip-compressed) stream, so memory use does not grow
+    with the chat.
+    """
+
+    def __init__(self, compress: Optional[bool] = None, buffer_size: int = 1 << 20,
+                 batch_size: int = 1000, compresslevel: int = 6):
+        """compress=None compresses when the output path ends with .gz."""
+        self.compress = compress
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.compresslevel = compresslevel
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        self._sender_json: Dict[str, str] = {}
+
+    def export(
+        self,
+        messages: Iterable[Message],
+        output_path: Path,
+        chat_name: str = '',
+        participant_stats: ParticipantStats = None,
+        resolve_owner: Callable[[], str] = None
+    ) -> ExportReport:
+        """
+        Stream messages to output_path.
+
+        resolve_owner, if given, is called after the last message and returns
+        the owner name recorded in the summary; participant_stats should be the
+        stats the messages' parser fills in.
+        """
+        compress = output_path.suffix == '.gz' if self.compress is None else self.compress
+        count = 0
+        with self._open(output_path, compress) as out:
+            out.write(self._encode({
+                'type': RECORD_HEADER,
+                'schema': JSONL_SCHEMA,
+                'schema_version': JSONL_SCHEMA_VERSION,
+                'chat': chat_name,
+            }))
+            out.write('\n')
+            batch = []
+            for message in messages:
+                batch.append(self._encode_message(message))
+                if len(batch) >= self.batch_size:
+                    out.write('\n'.join(batch))
+                    out.write('\n')
+                    count += len(batch)
+                    batch = []
+            if batch:
+                out.write('\n'.join(batch))
+                out.write('\n')
+                count += len(batch)
+            summary: Dict = {'type': RECORD_SUMMARY, 'messages': count}
+            if participant_stats is not None:
+                summary['participants'] = participant_stats.message_counts
+                summary['owner_marked_messages'] = participant_stats.owner_marked_messages
+            if resolve_owner is not None:
+                summary['owner'] = resolve_owner()
+            out.write(self._encode(summary))
+            out.write('\n')
+        return ExportReport(str(output_path), count, output_path.stat().st_size, compress)
+
+    def _open(self, output_path: Path, compress: bool) -> TextIO:
+        if compress:
+            raw = gzip.open(output_path, 'wb', compresslevel=self.compresslevel)
+            return io.TextIOWrapper(io.BufferedWriter(raw, self.buffer_size), encoding='utf-8', newline='')
+        return open(output_path, 'w', encoding='utf-8', newline='', buffering=self.buffer_size)
+
+    def _encode_message(self, message: Message) -> str:
+        """
+        Encode a message record.
+
+        Assembled from individually escaped values rather than through
+        json.dumps of a dict, which takes several times longer per record;
+        sender names are escaped once per chat.
+        """
+        sender = message.sender
+        sender_json = self._sender_json.get(sender)
+        if sender_json is None:
+            sender_json = self._sender_json[sender] = 'null' if sender == OWNER_PLACEHOLDER else encode_basestring(sender)
+        # ISO timestamps need no escaping
+        timestamp = f'"{message.timestamp.isoformat()}"' if message.timestamp else 'null'
+        kind, filename = MediaHandler.classify_content(message.content)
+        return (
+            f'{{"type":"{RECORD_MESSAGE}",'
+            f'"timestamp":{timestamp},'
+            f'"sender":{sender_json},'
+            f'"content":{encode_basestring(message.content)},'
+            f'"attachment":{encode_basestring(filename) if kind == CONTENT_ATTACHMENT else "null"},'
+            f'"system":{"true" if message.is_system_message else "false"},'
+            f'"from_owner":{"true" if sender == OWNER_PLACEHOLDER else "false"}}}'
+        )
+
+
+def main() -> None:
+    from src.main_orchastrator import WhatsAppChatConverter
+    from src.utils.custom_logging.setup_logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('chat', type=Path)
+    parser.add_argument('--output', type=Path, help='default: CHAT.jsonl, or CHAT.jsonl.gz with --gzip')
+    parser.add_argument('--gzip', action='store_true', help='compress the output')
+    args = parser.parse_args()
+
+    setup_logging()
+    output = args.output or args.chat.with_suffix('.jsonl.gz' if args.gzip else '.jsonl')
+    report = WhatsAppChatConverter().export_jsonl(args.chat, output, compress=True if args.gzip else None)
+    print(f"{report.output_path}: {report.messages:,} messages, {report.bytes_written:,} bytes")
+
+
+if __name__ == '__main__':
+    main()
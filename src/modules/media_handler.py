@@ -1,26 +1,46 @@
 # src/modules/media_handler.py
 
 import html
+import os
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set, Tuple
 from src.configuration_and_enums.special_messages import SpecialMessages
 from src.configuration_and_enums.media_type import MediaType
+from src.modules.media_index import MediaIndex, MediaReport
+from src.modules.media_store import ContentAddressedMediaStore
 from src.utils.text_utils import TextUtils
 
+# Content kinds returned by MediaHandler.classify_content
+CONTENT_TEXT = 'text'
+CONTENT_CALL = 'call'
+CONTENT_ATTACHMENT = 'attachment'
+
+ATTACHED_TAG = '<attached: '
+_ATTACHMENT_MARKER = re.compile(f"<attached:|{re.escape(SpecialMessages.FILE_ATTACHED)}")
+
 class MediaEmbedderInterface:
     """Interface for creating media embeds."""
     def create_embed(self, file_path: Path, media_type: Optional[MediaType], sender_class: str) -> str:
         raise NotImplementedError
 
+    def media_src(self, file_path: Path) -> str:
+        """Return the path written into src/href attributes for a media file."""
+        raise NotImplementedError
+
 class DefaultMediaEmbedder(MediaEmbedderInterface):
-    """Default implementation for embedding known media types."""
+    """
+    Default implementation for embedding known media types.
+
+    With a media_store, embeds point at the shared content-addressed blobs,
+    relative to html_dir when given and as file:// URIs otherwise.
+    """
+    def __init__(self, media_store: Optional[ContentAddressedMediaStore] = None, html_dir: Optional[Path] = None):
+        self.media_store = media_store
+        self.html_dir = html_dir
+
     def create_embed(self, file_path: Path, media_type: Optional[MediaType], sender_class: str) -> str:
-        relative_path = file_path
-        # For portability, try/except for relative_path resolution
-        try:
-            relative_path = file_path.relative_to(file_path.parents[1])
-        except Exception:
-            relative_path = file_path.name
+        relative_path = self.media_src(file_path)
         if media_type == MediaType.IMAGE:
             return f'<img src="{relative_path}" alt="Image" class="{sender_class}">'
         elif media_type == MediaType.AUDIO:
@@ -32,23 +52,96 @@ class DefaultMediaEmbedder(MediaEmbedderInterface):
         # Unknown file type
         return f'<span class="{sender_class}">📎 {html.escape(file_path.name)} (unknown type)</span>'
 
+    def media_src(self, file_path: Path) -> str:
+        if self.media_store is not None:
+            blob = self.media_store.path_for(file_path)
+            if blob is not None:
+                if self.html_dir is None:
+                    return blob.resolve().as_uri()
+                return Path(os.path.relpath(blob.resolve(), self.html_dir.resolve())).as_posix()
+        # For portability, try/except for relative_path resolution
+        try:
+            return str(file_path.relative_to(file_path.parents[1]))
+        except Exception:
+            return file_path.name
+
 class MediaHandler:
     """Responsible for handling media files and generating media embeds"""
 
+    # Files in the export folder that are never referenced as attachments
+    NON_MEDIA_SUFFIXES = ('.txt', '.html')
+
     def __init__(
         self,
         media_folder: Path,
-        media_embedder: Optional[MediaEmbedderInterface] = None
+        media_embedder: Optional[MediaEmbedderInterface] = None,
+        media_index: Optional[MediaIndex] = None
     ):
         self.media_folder = media_folder
         self.media_embedder = media_embedder or DefaultMediaEmbedder()
+        self._media_index = media_index
+        self.referenced_files: Set[str] = set()
+        self.missing_files: Set[str] = set()
+
+    @property
+    def media_index(self) -> MediaIndex:
+        """Index of the media folder, scanned on first use."""
+        if self._media_index is None:
+            self._media_index = MediaIndex.scan(self.media_folder)
+        return self._media_index
+
+    def media_report(self) -> MediaReport:
+        """Report attachments missing from the media folder and media files no message references."""
+        orphaned = [
+            name for name in self.media_index
+            if name not in self.referenced_files and not name.lower().endswith(self.NON_MEDIA_SUFFIXES)
+        ]
+        return MediaReport(missing=sorted(self.missing_files), orphaned=sorted(orphaned))
 
     def create_media_embed(self, message_content: str, sender_class: str) -> str:
         """Create HTML embed for media in message."""
-        if message_content.lower() == SpecialMessages.NULL_MESSAGE:
+        kind, filename = self.classify_content(message_content)
+        return self.create_classified_embed(kind, filename, message_content, sender_class)
+
+    @staticmethod
+    def classify_content(message_content: str) -> Tuple[str, Optional[str]]:
+        """
+        Classify message content in a single scan.
+
+        Returns:
+            (kind, filename) where kind is one of CONTENT_TEXT, CONTENT_CALL or
+            CONTENT_ATTACHMENT and filename is set only for attachments.
+        """
+        if len(message_content) == len(SpecialMessages.NULL_MESSAGE) \
+                and message_content.lower() == SpecialMessages.NULL_MESSAGE:
+            return CONTENT_CALL, None
+        marker = _ATTACHMENT_MARKER.search(message_content)
+        if marker is None:
+            return CONTENT_TEXT, None
+        if marker.group() == SpecialMessages.FILE_ATTACHED and '<attached:' not in message_content[marker.end():]:
+            filename = message_content[:marker.start()].strip()
+        else:
+            tag_start = message_content.find(ATTACHED_TAG)
+            if tag_start < 0:
+                return CONTENT_TEXT, None
+            rest = message_content[tag_start + len(ATTACHED_TAG):]
+            filename = rest.split(ATTACHED_TAG, 1)[0].split('>', 1)[0].strip()
+        if not filename:
+            return CONTENT_TEXT, None
+        return CONTENT_ATTACHMENT, filename
+
+    def create_classified_embed(
+        self,
+        kind: str,
+        filename: Optional[str],
+        message_content: str,
+        sender_class: str
+    ) -> str:
+        """Create HTML embed for content already classified by classify_content."""
+        if kind == CONTENT_CALL:
             return self._create_call_indicator(sender_class)
-        if SpecialMessages.FILE_ATTACHED in message_content or '<attached:' in message_content:
-            return self._create_file_attachment_embed(message_content, sender_class)
+        if kind == CONTENT_ATTACHMENT:
+            return self._create_file_attachment_embed(filename, sender_class)
         # Regular text
         return f'<span class="{sender_class}">{TextUtils.escape_html(message_content)}</span>'
 
@@ -58,30 +151,43 @@ class MediaHandler:
         call_type = "Incoming" if sender_class == 'other' else "Outgoing"
         return f'<span class="call-indicator">📞 {call_type} call</span>'
 
-    def _create_file_attachment_embed(self, message_content: str, sender_class: str) -> str:
+    def resolve_attachment(self, message_content: str) -> Optional[Tuple[str, Optional[MediaType], Optional[Path]]]:
+        """
+        Resolve the attachment referenced by a message.
+
+        Returns:
+            (filename, media type, file path) for attachment messages, with a
+            file path of None when the file is missing; None for other messages.
+        """
+        kind, filename = self.classify_content(message_content)
+        if kind != CONTENT_ATTACHMENT:
+            return None
+        return self._resolve_filename(filename)
+
+    def _resolve_filename(self, filename: str) -> Tuple[str, Optional[MediaType], Optional[Path]]:
+        if '/' in filename or '\\' in filename:
+            # Paths into subfolders are outside the index
+            stored_name = filename if (self.media_folder / filename).exists() else None
+            media_type = MediaType.from_filename(filename)
+        else:
+            stored_name = self.media_index.lookup(filename)
+            media_type = (
+                self.media_index.entries[stored_name].media_type if stored_name is not None
+                else MediaType.from_filename(filename)
+            )
+        if stored_name is None:
+            self.missing_files.add(filename)
+            return filename, media_type, None
+        self.referenced_files.add(stored_name)
+        return filename, media_type, self.media_folder / stored_name
+
+    def _create_file_attachment_embed(self, filename: str, sender_class: str) -> str:
         """Create HTML embed for file attachments."""
-        filename = self._extract_filename(message_content)
-        if not filename:
-            return f'<span class="{sender_class}">{TextUtils.escape_html(message_content)}</span>'
-        media_type = MediaType.from_filename(filename)
-        file_path = self.media_folder / filename
-        if not file_path.exists():
+        filename, media_type, file_path = self._resolve_filename(filename)
+        if file_path is None:
             return self._create_missing_file_message(filename, sender_class)
         return self.media_embedder.create_embed(file_path, media_type, sender_class)
 
-    @staticmethod
-    def _extract_filename(message_content: str) -> Optional[str]:
-        if '<attached:' in message_content:
-            try:
-                return message_content.split('<attached: ')[1].split('>')[0].strip()
-            except IndexError:
-                return None
-        if SpecialMessages.FILE_ATTACHED in message_content:
-            parts = message_content.split(SpecialMessages.FILE_ATTACHED)
-            if len(parts) > 1:
-                return parts[0].strip()
-        return None
-
     @staticmethod
     def _create_missing_file_message(filename: str, sender_class: str) -> str:
         return f'<span class="{sender_class}">📎 {html.escape(filename)} (file not found)</span>'
@@ -0,0 +1,84 @@
+# src/modules/media_index.py
+
+import os
+import zipfile
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from src.configuration_and_enums.media_type import MediaType
+
+# True on platforms whose file systems match names case-insensitively (Windows)
+_CASE_INSENSITIVE_FS = os.path.normcase('A') == 'a'
+
+
+class MediaFileInfo(NamedTuple):
+    """Size and detected type of one file in the media folder."""
+    size: int
+    media_type: Optional[MediaType]
+
+
+@dataclass
+class MediaReport:
+    """Attachments that could not be found, and media files nothing refers to."""
+    missing: List[str]
+    orphaned: List[str]
+
+
+class MediaIndex:
+    """
+    In-memory index of a media folder, built with a single directory scan.
+
+    Replaces one exists()/stat() call per attachment with a dictionary lookup.
+    """
+
+    def __init__(self, entries: Dict[str, MediaFileInfo]):
+        self.entries = entries
+        self._casefolded = (
+            {name.lower(): name for name in entries} if _CASE_INSENSITIVE_FS else {}
+        )
+
+    @classmethod
+    def scan(cls, folder: Path) -> 'MediaIndex':
+        """Index the regular files directly inside folder."""
+        entries: Dict[str, MediaFileInfo] = {}
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_file():
+                        entries[entry.name] = MediaFileInfo(
+                            entry.stat().st_size, MediaType.from_filename(entry.name)
+                        )
+        except FileNotFoundError:
+            pass
+        return cls(entries)
+
+    @classmethod
+    def from_zip(cls, zip_file: zipfile.ZipFile, member_prefix: str = '') -> 'MediaIndex':
+        """Index the files stored directly under member_prefix inside a ZIP, without extracting them."""
+        entries: Dict[str, MediaFileInfo] = {}
+        for info in zip_file.infolist():
+            if info.is_dir() or not info.filename.startswith(member_prefix):
+                continue
+            name = info.filename[len(member_prefix):]
+            if '/' not in name:
+                entries[name] = MediaFileInfo(info.file_size, MediaType.from_filename(name))
+        return cls(entries)
+
+    def lookup(self, filename: str) -> Optional[str]:
+        """Return the indexed name matching filename, or None if there is no such file."""
+        if filename in self.entries:
+            return filename
+        return self._casefolded.get(filename.lower())
+
+    def get(self, filename: str) -> Optional[MediaFileInfo]:
+        name = self.lookup(filename)
+        return self.entries[name] if name is not None else None
+
+    def __contains__(self, filename: str) -> bool:
+        return self.lookup(filename) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,158 @@
+# src/modules/media_store.py
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class StoreReport:
+    """Outcome of adding a batch of files to the media store."""
+    files: int = 0
+    hashed_files: int = 0
+    hashed_bytes: int = 0
+    new_blobs: int = 0
+    stored_bytes: int = 0
+    deduplicated_bytes: int = 0
+
+
+class ContentAddressedMediaStore:
+    """
+    Stores each unique media file once, under the hex digest of its content.
+
+    Layout below root:
+        objects/<first two digest chars>/<digest><original suffix>
+        hash_cache.json   path -> [size, mtime_ns, digest]
+
+    Blobs keep the original file suffix so browsers can still infer the media
+    type. The hash cache lets repeated runs over the same exports skip
+    re-hashing files whose size and modification time are unchanged.
+
+    Files are copied into the store, never linked, so editing an export in
+    place cannot change a blob stored under the old content's digest.
+    """
+
+    HASH_ALGORITHM = 'sha256'
+    READ_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, root: Path, max_workers: Optional[int] = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.cache_file = self.root / 'hash_cache.json'
+        self.max_workers = max_workers
+        self._digests: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._hash_cache = self._load_hash_cache()
+
+    def __getstate__(self) -> dict:
+        # Locks cannot be pickled, e.g. to send an embedder to render worker processes
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add_files(self, file_paths: Iterable[Path]) -> StoreReport:
+        """Hash files in a thread pool and store every blob not already present."""
+        file_paths = [Path(path) for path in file_paths]
+        report = StoreReport(files=len(file_paths))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(self._digest_with_cache, file_paths))
+        for file_path, (digest, size, hashed) in zip(file_paths, results):
+            if hashed:
+                report.hashed_files += 1
+                report.hashed_bytes += size
+            blob = self.blob_path(digest, file_path.suffix)
+            if blob.exists():
+                report.deduplicated_bytes += size
+            else:
+                self._store_blob(file_path, blob)
+                report.new_blobs += 1
+                report.stored_bytes += size
+            self._digests[self._key(file_path)] = (digest, file_path.suffix.lower())
+        self._save_hash_cache()
+        return report
+
+    def blob_path(self, digest: str, suffix: str = '') -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{suffix.lower()}"
+
+    def path_for(self, file_path: Path) -> Optional[Path]:
+        """Return the blob path of a file previously added to the store."""
+        entry = self._digests.get(self._key(file_path))
+        return self.blob_path(*entry) if entry else None
+
+    def link_into(self, file_paths: Iterable[Path], target_dir: Path) -> int:
+        """
+        Materialize stored files under their original names in target_dir,
+        hard-linking blobs where the file system allows it and copying otherwise.
+
+        Linked files share their blob's data: replace them rather than edit them in place.
+        """
+        target_dir.mkdir(parents=True, exist_ok=True)
+        linked = 0
+        for file_path in file_paths:
+            blob = self.path_for(file_path)
+            if blob is None:
+                continue
+            target = target_dir / Path(file_path).name
+            if target.exists():
+                target.unlink()
+            self._link_or_copy(blob, target)
+            linked += 1
+        return linked
+
+    def _digest_with_cache(self, file_path: Path) -> Tuple[str, int, bool]:
+        """Return (digest, size, hashed) where hashed is False on a cache hit."""
+        stat = file_path.stat()
+        key = self._key(file_path)
+        with self._lock:
+            cached = self._hash_cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2], stat.st_size, False
+        hasher = hashlib.new(self.HASH_ALGORITHM)
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(self.READ_CHUNK_SIZE):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with self._lock:
+            self._hash_cache[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest, stat.st_size, True
+
+    def _store_blob(self, source: Path, blob: Path) -> None:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        temp = blob.with_name(f".{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        # A copy, not a link: a link would let later edits of the source rewrite the blob
+        shutil.copyfile(source, temp)
+        # Atomic, so concurrent stores of the same blob cannot leave a partial file
+        os.replace(temp, blob)
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path) -> None:
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return str(Path(file_path).resolve())
+
+    def _load_hash_cache(self) -> Dict[str, list]:
+        try:
+            return json.loads(self.cache_file.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_hash_cache(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp = self.cache_file.with_suffix('.json.tmp')
+        temp.write_text(json.dumps(self._hash_cache), encoding='utf-8')
+        os.replace(temp, self.cache_file)
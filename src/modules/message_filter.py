@@ -0,0 +1,47 @@
+# src/modules/message_filter.py
+
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import FrozenSet, Optional
+from src.modules.media_handler import CONTENT_ATTACHMENT, MediaHandler
+
+
+@dataclass(frozen=True)
+class MessageFilter:
+    """
+    Selects the messages a conversion keeps.
+
+    MessageParser applies each check as early as the data allows: the sender
+    right after the first line is split, the timestamp before continuation
+    lines are joined into the body, and media_only once the body is known,
+    so rejected messages are never built or rendered. Messages without a
+    timestamp (e.g. system notices) are dropped when a date range is set.
+    """
+    senders: Optional[FrozenSet[str]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    media_only: bool = False
+
+    @property
+    def filters_dates(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    def accepts_sender(self, sender: str) -> bool:
+        return self.senders is None or sender in self.senders
+
+    def accepts_timestamp(self, timestamp: Optional[datetime]) -> bool:
+        """Accept timestamps in [start, end)."""
+        if not self.filters_dates:
+            return True
+        if timestamp is None:
+            return False
+        return (self.start is None or timestamp >= self.start) and (self.end is None or timestamp < self.end)
+
+    def accepts_day(self, day: date) -> bool:
+        """False if no moment of the day falls in [start, end), so its messages can be skipped unparsed."""
+        return (self.start is None or day >= self.start.date()) and (
+            self.end is None or datetime.combine(day, time.min) < self.end
+        )
+
+    def accepts_content(self, content: str) -> bool:
+        return not self.media_only or MediaHandler.classify_content(content)[0] == CONTENT_ATTACHMENT
@@ -1,26 +1,35 @@
 # src/modules/message_grouper.py
 
-from typing import List
+import re
+from typing import Iterable, Iterator, List
 from src.utils.text_utils import TextUtils
 
+# Timestamp of compact exports, e.g. '2020-01-01, 080132 AM Name text', which have neither ' - ' nor brackets
+COMPACT_TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2}, \d{5,6} ?[AaPp][Mm] ')
+
 class MessageStartStrategyInterface:
     """Strategy interface for identifying message start lines."""
     def get_message_start_lines(self, lines: List[str]) -> List[int]:
         raise NotImplementedError
 
+    def is_message_start(self, line: str) -> bool:
+        raise NotImplementedError
+
 class DefaultMessageStartStrategy(MessageStartStrategyInterface):
-    """Default implementation covering iOS and Android formats."""
+    """Default implementation covering iOS, Android and compact formats."""
     def get_message_start_lines(self, lines: List[str]) -> List[int]:
-        message_starts = []
-        for i, line in enumerate(lines):
-            clean_line = TextUtils.clean_unicode(line)
-            if clean_line.startswith("[") and "] " in clean_line:
-                message_starts.append(i)
-            elif clean_line and ' - ' in clean_line and ': ' in clean_line:
-                # Android format: starts with a digit (likely date)
-                if clean_line[0].isdigit():
-                    message_starts.append(i)
-        return message_starts
+        return [i for i, line in enumerate(lines) if self.is_message_start(line)]
+
+    def is_message_start(self, line: str) -> bool:
+        clean_line = TextUtils.clean_unicode(line)
+        if clean_line.startswith("[") and "] " in clean_line:
+            return True
+        if not clean_line or not clean_line[0].isdigit():
+            return False
+        # Android format: starts with a digit (likely date)
+        if ' - ' in clean_line and ': ' in clean_line:
+            return True
+        return COMPACT_TIMESTAMP.match(clean_line) is not None
 
 class MessageGrouper:
     """Responsible for grouping lines into messages."""
@@ -38,3 +47,22 @@ class MessageGrouper:
             List of line indices where messages start
         """
         return self.start_strategy.get_message_start_lines(lines)
+
+    def iter_message_groups(self, lines: Iterable[str]) -> Iterator[List[str]]:
+        """
+        Lazily group a stream of lines into per-message line lists.
+
+        Lines before the first message start are skipped, matching
+        get_message_start_lines based grouping.
+        """
+        is_message_start = self.start_strategy.is_message_start
+        group: List[str] = []
+        for line in lines:
+            if is_message_start(line):
+                if group:
+                    yield group
+                group = [line]
+            elif group:
+                group.append(line)
+        if group:
+            yield group
@@ -1,10 +1,17 @@
 # src/modules/message_parser.py
 
 import re
-from datetime import datetime
+import sys
+from datetime import date, datetime
 from typing import List, Optional, Tuple
 from src.configuration_and_enums.special_messages import SpecialMessages
-from src.data_models import Message
+from src.data_models import Message, ParticipantStats
+from src.modules.date_order_resolver import DefaultDateOrderResolver, iter_text_chunks
+from src.modules.message_filter import MessageFilter
+from src.modules.message_grouper import COMPACT_TIMESTAMP
+from src.modules.owner_resolver import OWNER_PLACEHOLDER
+from src.modules.system_message_classifier import DefaultSystemMessageClassifier, SystemMessageClassifierInterface
+from src.modules.timestamp_parser import create_timestamp_parser
 from src.utils.text_utils import TextUtils
 from src.configuration_and_enums.format_detector import FormatDetector, WhatsAppFormat
 
@@ -34,6 +41,10 @@ class DefaultStructuredMessageStrategy(StructuredMessageStrategyInterface):
             parts = line.split(' - ', 1)
             if len(parts) == 2:
                 return parts[0], parts[1]
+        if compact := COMPACT_TIMESTAMP.match(line):
+            # Compact exports put no ': ' between sender and text, so the two cannot be
+            # told apart; the whole rest is the text of an unnamed sender
+            return compact.group().rstrip(), f": {line[compact.end():]}"
         return None
 
 class MessageParser:
@@ -43,32 +54,74 @@ class MessageParser:
         self,
         date_format: str,
         my_name: str,
-        structured_strategy: StructuredMessageStrategyInterface = None
+        structured_strategy: StructuredMessageStrategyInterface = None,
+        participant_stats: ParticipantStats = None,
+        message_filter: MessageFilter = None,
+        parse_timestamps: bool = True,
+        system_classifier: SystemMessageClassifierInterface = None
     ):
+        """
+        participant_stats, if given, is updated with the sender of every parsed
+        message, including messages the message_filter rejects. Senders of
+        system messages (e.g. the group name on iOS notices) are not recorded.
+
+        parse_timestamps=False leaves timestamps unparsed, for passes that only
+        collect participant_stats ahead of the real parse.
+        """
         self.date_format = date_format
         self.my_name = my_name
         self.structured_strategy = structured_strategy or DefaultStructuredMessageStrategy()
+        self.participant_stats = participant_stats
+        self.message_filter = message_filter
+        self.parse_timestamps = parse_timestamps
+        self.system_classifier = system_classifier or DefaultSystemMessageClassifier()
+        self._timestamp_parser = create_timestamp_parser(date_format)
+
+    def set_date_format(self, date_format: str) -> None:
+        """Parse timestamps with date_format from now on, e.g. where the export format switches."""
+        if date_format != self.date_format:
+            self.date_format = date_format
+            self._timestamp_parser = create_timestamp_parser(date_format)
+
+    def parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
+        """Parse a timestamp as written in the export; None if it does not match the date format."""
+        return self._timestamp_parser.parse(timestamp_str)
 
-    def parse_message(self, message_lines: List[str], last_sender: str) -> Message:
+    def _parse_day(self, timestamp_str: str) -> Optional[date]:
+        """Date of a timestamp, parsed once per distinct date text."""
+        return self._timestamp_parser.parse_day(timestamp_str)
+
+    def parse_message(self, message_lines: List[str], last_sender: str) -> Optional[Message]:
+        """Parse one message; None if the message filter rejects it."""
+        message_filter = self.message_filter
         first_line = TextUtils.clean_unicode(message_lines[0])
-        rest_of_message = "\n".join(message_lines[1:]).strip()
         if parsed := self.structured_strategy.try_parse_structured_message(
             first_line
         ):
             timestamp_str, content = parsed
-            timestamp, sender, message_content = self._parse_message_content(
-                timestamp_str, content, first_line, rest_of_message
-            )
+            parsed_content = self._parse_message_content(timestamp_str, content, first_line, message_lines)
+            if parsed_content is None:
+                return None
+            timestamp, sender, message_content, is_system_message = parsed_content
         else:
+            if message_filter is not None and not (
+                message_filter.accepts_sender(last_sender) and message_filter.accepts_timestamp(None)
+            ):
+                return None
             timestamp = None
             timestamp_str = ''
             sender = last_sender
+            rest_of_message = "\n".join(message_lines[1:]).strip()
             message_content = f"{first_line}\n{rest_of_message}" if rest_of_message else first_line
+            if message_filter is not None and not message_filter.accepts_content(message_content):
+                return None
+            is_system_message = False
         return Message(
             timestamp=timestamp,
             sender=sender,
             content=message_content,
-            timestamp_str=timestamp_str
+            timestamp_str=timestamp_str,
+            is_system_message=is_system_message
         )
 
     def _parse_message_content(
@@ -76,21 +129,55 @@ class MessageParser:
         timestamp_str: str,
         content: str,
         first_line: str,
-        rest_of_message: str
-    ) -> Tuple[Optional[datetime], str, str]:
-        try:
-            timestamp = datetime.strptime(timestamp_str, self.date_format)
-            if content.startswith(SpecialMessages.MY_MESSAGE_PREFIX):
-                sender = self.my_name
-                message_content = content[len(SpecialMessages.MY_MESSAGE_PREFIX):]
-            else:
-                sender, message_content = content.split(': ', 1)
+        message_lines: List[str]
+    ) -> Optional[Tuple[Optional[datetime], str, str, bool]]:
+        message_filter = self.message_filter
+        if content.startswith(SpecialMessages.MY_MESSAGE_PREFIX):
+            sender = self.my_name or ''
+            message_content = content[len(SpecialMessages.MY_MESSAGE_PREFIX):]
+            is_system_message = self.system_classifier.is_system_message(message_content)
+            if self.participant_stats is not None:
+                self.participant_stats.owner_marked_messages += 1
+        elif ': ' in content:
+            sender, message_content = content.split(': ', 1)
+            # Interned, so a long chat holds one copy of each sender name
+            sender = sys.intern(sender.strip())
+            is_system_message = self.system_classifier.is_system_message(message_content)
+            if self.participant_stats is not None and sender and not is_system_message:
+                self.participant_stats.record(sender)
+        else:
+            # No sender, e.g. a system notice
+            sender = ''
+            message_content = None
+            is_system_message = True
+        # An unresolved owner is checked once it is known (see OWNER_PLACEHOLDER)
+        if message_filter is not None and sender != OWNER_PLACEHOLDER and not message_filter.accepts_sender(sender):
+            return None
+        timestamp = None
+        if message_filter is not None and message_filter.filters_dates:
+            if message_content is not None:
+                # Whole days outside the range are rejected without parsing the time
+                day = self._parse_day(timestamp_str)
+                if day is not None and not message_filter.accepts_day(day):
+                    return None
+                timestamp = self.parse_timestamp(timestamp_str)
+            if not message_filter.accepts_timestamp(timestamp):
+                return None
+        rest_of_message = "\n".join(message_lines[1:]).strip()
+        is_notice = message_content is None
+        if is_notice:
+            message_content = f"{first_line}\n{rest_of_message}" if rest_of_message else first_line
+        else:
             if rest_of_message:
                 message_content = f"{message_content}\n{rest_of_message}"
-            return timestamp, sender.strip(), message_content.strip()
-        except Exception:
-            full_content = f"{first_line}\n{rest_of_message}" if rest_of_message else first_line
-            return None, '', full_content
+                # Notices are one line long
+                is_system_message = False
+            message_content = message_content.strip()
+        if message_filter is not None and not message_filter.accepts_content(message_content):
+            return None
+        if timestamp is None and not is_notice and self.parse_timestamps:
+            timestamp = self.parse_timestamp(timestamp_str)
+        return timestamp, sender, message_content, is_system_message
 
 class WhatsAppMessageParser:
     """Parses WhatsApp chat files, delegates format logic via strategies."""
@@ -103,7 +190,9 @@ class WhatsAppMessageParser:
             raise ValueError(f"Unknown or unsupported WhatsApp format in {file_path}")
         self.format_info = FormatDetector.get_format_info(self.format_type)
         self.pattern = re.compile(self.format_info.regex)
-        self.date_format = f"{self.format_info.date_format} {self.format_info.time_format}"
+        self.date_format = DefaultDateOrderResolver().resolve(
+            iter_text_chunks(file_path, self.encoding), self.format_info
+        ).date_format
         self.my_name = my_name
         self.structured_strategy = structured_strategy or DefaultStructuredMessageStrategy()
 
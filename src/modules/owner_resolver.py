@@ -0,0 +1,88 @@
+# src/modules/owner_resolver.py
+
+import json
+from pathlib import Path
+from typing import Iterable, Mapping
+from src.data_models.message import Message
+from src.data_models.participant_stats import ParticipantStats
+
+# Stands in for the owner in messages parsed before the owner is resolved
+OWNER_PLACEHOLDER = '\x00owner\x00'
+
+# Name given to MY_MESSAGE_PREFIX messages when no configured name applies
+DEFAULT_OWNER_NAME = 'Me'
+
+# Export file names, e.g. "WhatsApp Chat - Alice.zip" (iOS) or "WhatsApp Chat with Alice.txt" (Android)
+CHAT_NAME_PREFIXES = ('WhatsApp Chat - ', 'WhatsApp Chat with ')
+
+
+def chat_name_from_path(path: Path) -> str:
+    """
+    Chat title encoded in an export's file name, or '' if there is none.
+
+    iOS chat files are always named _chat.txt, so the folder they were
+    extracted to (named after the ZIP) is used instead.
+    """
+    name = path.parent.name if path.stem == '_chat' else path.stem
+    for prefix in CHAT_NAME_PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):].strip()
+    return ''
+
+
+class OwnerResolverInterface:
+    """Interface for deciding which participant exported the chat."""
+    def resolve(self, stats: ParticipantStats, chat_name: str = '') -> str:
+        raise NotImplementedError
+
+
+class DefaultOwnerResolver(OwnerResolverInterface):
+    """
+    Resolves the owner without asking, in this order:
+
+    1. chat_owners: owner configured for this chat name
+    2. known_owners: the first configured name that sent messages in the chat
+    3. MY_MESSAGE_PREFIX markers: the owner is not among the named senders,
+       so the marked messages get the first known owner name, or "Me"
+    4. In a two-person chat named after one participant, the other one
+    5. The participant with the most messages, ties broken alphabetically
+
+    The same chat always resolves to the same owner.
+    """
+
+    def __init__(self, known_owners: Iterable[str] = None, chat_owners: Mapping[str, str] = None):
+        self.known_owners = list(known_owners or [])
+        self.chat_owners = dict(chat_owners or {})
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'DefaultOwnerResolver':
+        """Load {"known_owners": [...], "chat_owners": {"chat name": "owner"}} from a JSON file."""
+        config = json.loads(Path(path).read_text(encoding='utf-8'))
+        return cls(config.get('known_owners'), config.get('chat_owners'))
+
+    def resolve(self, stats: ParticipantStats, chat_name: str = '') -> str:
+        if chat_name and chat_name in self.chat_owners:
+            return self.chat_owners[chat_name]
+        counts = stats.message_counts
+        for name in self.known_owners:
+            if name in counts:
+                return name
+        if stats.owner_marked_messages:
+            return self.known_owners[0] if self.known_owners else DEFAULT_OWNER_NAME
+        if len(counts) == 2 and chat_name in counts:
+            return next(name for name in counts if name != chat_name)
+        if not counts:
+            return ''
+        return self._most_active(counts)
+
+    @staticmethod
+    def _most_active(counts: Mapping[str, int]) -> str:
+        return min(counts, key=lambda name: (-counts[name], name))
+
+
+def assign_owner(messages: Iterable[Message], owner: str) -> None:
+    """Replace OWNER_PLACEHOLDER senders once the owner is known."""
+    for message in messages:
+        if message.sender == OWNER_PLACEHOLDER:
+            message.sender = owner
+
@@ -0,0 +1,133 @@
+# src/modules/parallel_renderer.py
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+from src.data_models import Message
+from src.data_models.chat_metadata import ChatMetadata
+from src.modules.html_generator import HTMLGenerator, MessageHTMLRendererInterface, SingleFileHTMLBackend
+from src.modules.media_handler import MediaHandler
+from src.utils.custom_logging.decorators import stage_timer
+
+# Set in each worker process by _init_render_worker
+_worker_context: Optional[Tuple[HTMLGenerator, ChatMetadata, MediaHandler]] = None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, which may be fewer than the machine has."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _init_render_worker(
+    message_renderer: MessageHTMLRendererInterface,
+    chat_metadata: ChatMetadata,
+    media_handler: MediaHandler
+) -> None:
+    global _worker_context
+    _worker_context = (HTMLGenerator(message_renderer=message_renderer), chat_metadata, media_handler)
+
+
+def _render_chunk(messages: List[Message]) -> Tuple[str, List[str], List[str]]:
+    """Render a run of messages in a worker; returns (html, referenced files, missing files) of the run."""
+    html_generator, chat_metadata, media_handler = _worker_context
+    media_handler.referenced_files.clear()
+    media_handler.missing_files.clear()
+    html = ''.join(html_generator.iter_message_html([messages], chat_metadata, media_handler))
+    return html, list(media_handler.referenced_files), list(media_handler.missing_files)
+
+
+class ParallelSingleFileHTMLBackend(SingleFileHTMLBackend):
+    """
+    Writes the same document as SingleFileHTMLBackend, rendering in worker processes.
+
+    Messages are cut into contiguous chunks of chunk_size. The renderer, chat
+    metadata and media handler (with its scanned media index) go to each
+    worker once, when the pool starts; after that only chunks travel. At most
+    max_pending chunks are in flight, and finished chunks are written in
+    order as they arrive, so the file is streamed rather than built in
+    memory. The attachments each chunk referenced or missed are merged back
+    into the media handler, and the search index is built here in message
+    order. The renderer and media embedder must be picklable.
+
+    Workers are spawned rather than forked: the converter runs on a GUI
+    thread next to the logging listener thread, and a fork taken while one
+    of them holds a lock would deadlock the child.
+
+    Chats of a single chunk, or with one worker, are rendered serially.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 2000, max_pending: Optional[int] = None):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.workers = workers or available_cpus()
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * self.workers
+
+    def write(
+        self,
+        html_generator: HTMLGenerator,
+        messages: List[Message],
+        chat_metadata: ChatMetadata,
+        media_handler: MediaHandler,
+        output_path: Path
+    ) -> Path:
+        if self.workers < 2 or len(messages) <= self.chunk_size:
+            return super().write(html_generator, messages, chat_metadata, media_handler, output_path)
+
+        stage_metrics = getattr(html_generator, 'stage_metrics', None)
+        progress = getattr(html_generator, 'progress', None)
+        search_index = html_generator.begin_search_index(output_path)
+        # Scan the media folder here, once, rather than in every worker
+        media_handler.media_index
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_render_worker,
+            initargs=(html_generator.message_renderer, chat_metadata, media_handler)
+        )
+        starts = iter(range(0, len(messages), self.chunk_size))
+        pending: Deque[Tuple[int, Future]] = deque()
+
+        def submit_next() -> None:
+            start = next(starts, None)
+            if start is not None:
+                pending.append((start, pool.submit(_render_chunk, messages[start:start + self.chunk_size])))
+
+        try:
+            with open(output_path, 'wb') as out:
+                with stage_timer(stage_metrics, 'writing') as stage:
+                    stage.bytes += out.write(html_generator.document_head().encode('utf-8'))
+                for _ in range(self.max_pending):
+                    submit_next()
+                while pending:
+                    start, future = pending.popleft()
+                    chunk = messages[start:start + self.chunk_size]
+                    with stage_timer(stage_metrics, 'rendering', items=len(chunk)):
+                        html, referenced_files, missing_files = future.result()
+                        submit_next()
+                        media_handler.referenced_files.update(referenced_files)
+                        media_handler.missing_files.update(missing_files)
+                        if search_index is not None:
+                            for message in chunk:
+                                search_index.add(message)
+                    with stage_timer(stage_metrics, 'writing') as stage:
+                        # Serial output separates every message, including across chunks, by a newline
+                        stage.bytes += out.write(('\n' + html if start else html).encode('utf-8'))
+                    if progress is not None:
+                        progress.rendered(start + len(chunk), len(messages))
+                with stage_timer(stage_metrics, 'writing') as stage:
+                    stage.bytes += out.write(html_generator.document_tail().encode('utf-8'))
+        except BaseException:
+            output_path.unlink(missing_ok=True)
+            # Nothing of the index is written yet; a later conversion must not inherit it
+            html_generator.search_index_builder = None
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        html_generator.finish_search_index()
+        return output_path
@@ -0,0 +1,196 @@
+# src/modules/pipeline_executor.py
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# Marks the end of a stage's output stream
+_END = object()
+# How often blocked stages re-check whether the pipeline was aborted (seconds)
+_POLL_INTERVAL = 0.1
+
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage failed and the pipeline is shutting down."""
+
+
+@dataclass
+class PipelineStage:
+    """
+    One stage of a pipeline.
+
+    The first stage's func takes no arguments and returns an iterable of items.
+    Every later stage's func receives an iterator over the previous stage's
+    items and returns an iterable of its own items (or None for the sink).
+    """
+    name: str
+    func: Callable[..., Optional[Iterable[Any]]]
+
+
+@dataclass
+class StageStats:
+    """Timing and throughput of a single pipeline stage."""
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    input_wait_seconds: float = 0.0
+    output_wait_seconds: float = 0.0
+
+    @property
+    def busy_seconds(self) -> float:
+        return max(self.wall_seconds - self.input_wait_seconds - self.output_wait_seconds, 0.0)
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the stage's lifetime spent working rather than waiting on its queues."""
+        return self.busy_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+
+@dataclass
+class PipelineReport:
+    """Per-stage statistics for one pipeline run."""
+    stages: List[StageStats] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def bottleneck(self) -> Optional[StageStats]:
+        """The stage with the highest utilization."""
+        return max(self.stages, key=lambda stats: stats.utilization, default=None)
+
+    def format(self) -> str:
+        lines = [f"Pipeline finished in {self.wall_seconds:.3f}s"]
+        for stats in self.stages:
+            lines.append(
+                f"  {stats.name:<10} util={stats.utilization:6.1%} busy={stats.busy_seconds:.3f}s "
+                f"cpu={stats.cpu_seconds:.3f}s wait_in={stats.input_wait_seconds:.3f}s "
+                f"wait_out={stats.output_wait_seconds:.3f}s in={stats.items_in} out={stats.items_out}"
+            )
+        if self.bottleneck is not None:
+            lines.append(f"  bottleneck: {self.bottleneck.name}")
+        return "\n".join(lines)
+
+
+class PipelineExecutor:
+    """
+    Runs pipeline stages concurrently, one thread per stage, linked by bounded queues.
+
+    A full queue blocks the producing stage (backpressure), so memory stays
+    bounded by queue_size items per link. Threads overlap well wherever a
+    stage releases the GIL, e.g. file reads, decoding and writes.
+    """
+
+    def __init__(self, queue_size: int = 8):
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.queue_size = queue_size
+
+    def run(self, stages: List[PipelineStage]) -> PipelineReport:
+        """Run all stages to completion and return their statistics; re-raises the first stage error."""
+        if not stages:
+            return PipelineReport()
+        links = [queue.Queue(maxsize=self.queue_size) for _ in stages[1:]]
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        report = PipelineReport(stages=[StageStats(stage.name) for stage in stages])
+
+        threads = []
+        for index, stage in enumerate(stages):
+            inbox = links[index - 1] if index > 0 else None
+            outbox = links[index] if index < len(links) else None
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(stage, inbox, outbox, report.stages[index], abort, errors),
+                name=f"pipeline-{stage.name}",
+                daemon=True,
+            )
+            threads.append(thread)
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report.wall_seconds = time.perf_counter() - started
+
+        if errors:
+            raise errors[0]
+        return report
+
+    def _run_stage(
+        self,
+        stage: PipelineStage,
+        inbox: Optional[queue.Queue],
+        outbox: Optional[queue.Queue],
+        stats: StageStats,
+        abort: threading.Event,
+        errors: List[BaseException]
+    ) -> None:
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            stage_input = _StageInput(inbox, stats, abort) if inbox is not None else None
+            output = stage.func() if stage_input is None else stage.func(iter(stage_input))
+            for item in output or ():
+                stats.items_out += 1
+                if outbox is not None:
+                    self._put(outbox, item, stats, abort)
+            if stage_input is not None and not stage_input.finished:
+                # Let the upstream stage finish even if this stage stopped reading early
+                for _ in stage_input:
+                    pass
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            abort.set()
+        finally:
+            if outbox is not None:
+                try:
+                    self._put(outbox, _END, stats, abort)
+                except PipelineAborted:
+                    pass
+            stats.wall_seconds = time.perf_counter() - started
+            stats.cpu_seconds = time.thread_time() - cpu_started
+
+    @staticmethod
+    def _put(outbox: queue.Queue, item: Any, stats: StageStats, abort: threading.Event) -> None:
+        waited = time.perf_counter()
+        while True:
+            try:
+                outbox.put(item, timeout=_POLL_INTERVAL)
+                break
+            except queue.Full:
+                if abort.is_set():
+                    raise PipelineAborted()
+        stats.output_wait_seconds += time.perf_counter() - waited
+
+
+class _StageInput:
+    """Iterates over a stage's inbox until the upstream end marker, recording wait time."""
+
+    def __init__(self, inbox: queue.Queue, stats: StageStats, abort: threading.Event):
+        self.inbox = inbox
+        self.stats = stats
+        self.abort = abort
+        self.finished = False
+
+    def __iter__(self) -> Iterator[Any]:
+        while not self.finished:
+            waited = time.perf_counter()
+            while True:
+                try:
+                    item = self.inbox.get(timeout=_POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    if self.abort.is_set():
+                        raise PipelineAborted()
+            self.stats.input_wait_seconds += time.perf_counter() - waited
+            if item is _END:
+                self.finished = True
+                return
+            self.stats.items_in += 1
+            yield item
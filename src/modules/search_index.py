@@ -0,0 +1,246 @@
+# src/modules/search_index.py
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+from src.data_models import Message
+
+# Words are runs of letters, digits and underscores; the page tokenizes queries the same way
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def shard_file_name(key: str) -> str:
+    """File name of the shard holding tokens starting with key; safe for any script or file system."""
+    return '_'.join(f'{ord(char):x}' for char in key) + '.js'
+
+
+class SearchIndexBuilder:
+    """
+    Builds a static full-text index of a chat while its messages are rendered.
+
+    Every word of at least min_token_length characters maps to the positions
+    (0-based, in output order) of the messages containing it. Words are
+    sharded by their first prefix_length characters, one JSONP-style script
+    per prefix (``searchShard("ab", {...})``), so the page loads only the
+    shards a query needs, also from local disk where fetch() is blocked.
+    Postings are delta-encoded to keep shards small.
+    """
+
+    def __init__(self, directory: Path, prefix_length: int = 2, min_token_length: int = 2):
+        if not 1 <= prefix_length <= min_token_length:
+            raise ValueError("prefix_length must be between 1 and min_token_length")
+        self.directory = directory
+        self.prefix_length = prefix_length
+        self.min_token_length = min_token_length
+        self.messages = 0
+        self._postings: Dict[str, List[int]] = {}
+
+    def indexed(self, messages: Iterable[Message]) -> Iterator[Message]:
+        """Yield messages unchanged, indexing each one on the way."""
+        add = self.add
+        for message in messages:
+            add(message)
+            yield message
+
+    def add(self, message: Message) -> None:
+        """Index the next message's content."""
+        position = self.messages
+        self.messages += 1
+        postings = self._postings
+        min_length = self.min_token_length
+        for token in set(_TOKEN_RE.findall(message.content.lower())):
+            if len(token) < min_length:
+                continue
+            positions = postings.get(token)
+            if positions is None:
+                postings[token] = [position]
+            else:
+                positions.append(position)
+
+    def write(self) -> int:
+        """Write the shards and return their total size in bytes."""
+        shards: Dict[str, Dict[str, List[int]]] = {}
+        for token, positions in self._postings.items():
+            previous = 0
+            deltas = []
+            for position in positions:
+                deltas.append(position - previous)
+                previous = position
+            shards.setdefault(token[:self.prefix_length], {})[token] = deltas
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        total = 0
+        for key, postings in shards.items():
+            key_json = json.dumps(key, ensure_ascii=False)
+            payload = json.dumps(postings, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+            encoded = f"searchShard({key_json},{payload});\n".encode('utf-8')
+            (self.directory / shard_file_name(key)).write_bytes(encoded)
+            total += len(encoded)
+        return total
+
+    def page_config(self) -> dict:
+        """Settings the search script needs, with the shard folder relative to the page."""
+        return {
+            'dir': self.directory.name,
+            'prefixLength': self.prefix_length,
+            'minTokenLength': self.min_token_length,
+        }
+
+
+SEARCH_CSS = """
+        .search-bar {
+            position: sticky;
+            top: 0;
+            z-index: 10;
+            max-width: 800px;
+            margin: 0 auto 10px;
+            padding: 8px;
+            background: #f0f2f5;
+            border-radius: 5px;
+        }
+        .search-bar input {
+            width: 100%;
+            box-sizing: border-box;
+            padding: 6px;
+        }
+        .search-results {
+            max-height: 40vh;
+            overflow-y: auto;
+            font-size: 0.9em;
+        }
+        .search-results div {
+            cursor: pointer;
+            padding: 4px;
+            border-bottom: 1px solid #ddd;
+        }
+        .search-hit {
+            outline: 2px solid #25d366;
+        }
+"""
+
+SEARCH_BAR_HTML = (
+    "    <div class=\"search-bar\">"
+    "<input type=\"search\" id=\"search-input\" placeholder=\"Search messages\" autocomplete=\"off\">"
+    "<div class=\"search-count\" id=\"search-count\"></div>"
+    "<div class=\"search-results\" id=\"search-results\"></div>"
+    "</div>\n"
+)
+
+# Each query word matches every indexed word it is a prefix of; a message is a
+# hit when it matches all query words. Only the shards of the query's prefixes
+# are loaded, once each. Pages may define window.chatView = {preview(n, cb),
+# show(n)} to locate messages; by default message n is the n-th child of
+# .chat-container, as in single-file output.
+SEARCH_SCRIPT = """
+(function () {
+    const MAX_RESULTS = 200;
+    const TOKEN = /[\\p{L}\\p{N}_]+/gu;
+    const input = document.getElementById('search-input');
+    const count = document.getElementById('search-count');
+    const results = document.getElementById('search-results');
+    const shards = new Map();
+    const waiting = new Map();
+    let generation = 0;
+
+    window.searchShard = function (key, postings) {
+        shards.set(key, postings);
+        const callbacks = waiting.get(key) || [];
+        waiting.delete(key);
+        callbacks.forEach(function (cb) { cb(postings); });
+    };
+
+    function fileName(key) {
+        return Array.from(key).map(function (c) { return c.codePointAt(0).toString(16); }).join('_') + '.js';
+    }
+
+    function loadShard(key, cb) {
+        if (shards.has(key)) { cb(shards.get(key)); return; }
+        if (waiting.has(key)) { waiting.get(key).push(cb); return; }
+        waiting.set(key, [cb]);
+        const script = document.createElement('script');
+        script.src = SEARCH_INDEX.dir + '/' + fileName(key);
+        script.onload = function () { script.remove(); };
+        // No shard means no indexed word with this prefix
+        script.onerror = function () { script.remove(); window.searchShard(key, {}); };
+        document.head.appendChild(script);
+    }
+
+    function matches(word, cb) {
+        const key = Array.from(word).slice(0, SEARCH_INDEX.prefixLength).join('');
+        loadShard(key, function (postings) {
+            const hits = new Set();
+            for (const token in postings) {
+                if (!token.startsWith(word)) continue;
+                let position = 0;
+                postings[token].forEach(function (delta) { position += delta; hits.add(position); });
+            }
+            cb(hits);
+        });
+    }
+
+    const defaultView = {
+        element: function (n) {
+            return document.querySelector('.chat-container').children[n];
+        },
+        preview: function (n, cb) {
+            const node = defaultView.element(n);
+            cb(node ? node.textContent : '');
+        },
+        show: function (n) {
+            const node = defaultView.element(n);
+            if (!node) return;
+            document.querySelectorAll('.search-hit').forEach(function (hit) { hit.classList.remove('search-hit'); });
+            node.classList.add('search-hit');
+            node.scrollIntoView({ block: 'center' });
+        }
+    };
+
+    function showResults(positions) {
+        const view = window.chatView || defaultView;
+        results.replaceChildren();
+        count.textContent = positions.length === 1 ? '1 message' : positions.length + ' messages';
+        positions.slice(0, MAX_RESULTS).forEach(function (n) {
+            const row = document.createElement('div');
+            row.textContent = '#' + (n + 1);
+            view.preview(n, function (text) { row.textContent = '#' + (n + 1) + '  ' + text.slice(0, 160); });
+            row.onclick = function () { view.show(n); };
+            results.appendChild(row);
+        });
+    }
+
+    function search(query) {
+        const current = ++generation;
+        const words = Array.from(new Set(query.toLowerCase().match(TOKEN) || []))
+            .filter(function (word) { return Array.from(word).length >= SEARCH_INDEX.minTokenLength; });
+        if (!words.length) { results.replaceChildren(); count.textContent = ''; return; }
+        const sets = [];
+        words.forEach(function (word) {
+            matches(word, function (hits) {
+                sets.push(hits);
+                if (sets.length < words.length || current !== generation) return;
+                sets.sort(function (a, b) { return a.size - b.size; });
+                const positions = Array.from(sets[0]).filter(function (n) {
+                    return sets.every(function (set) { return set.has(n); });
+                });
+                showResults(positions.sort(function (a, b) { return a - b; }));
+            });
+        });
+    }
+
+    let timer = null;
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () { search(input.value); }, 150);
+    });
+})();
+"""
+
+
+def search_page_script(builder: SearchIndexBuilder) -> str:
+    """Markup loading the search script, to place after the search bar and messages."""
+    config = json.dumps(builder.page_config(), ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    return (
+        f"    <script>const SEARCH_INDEX = {config};</script>\n"
+        f"    <script>{SEARCH_SCRIPT}</script>\n"
+    )
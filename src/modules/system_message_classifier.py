@@ -0,0 +1,105 @@
+# src/modules/system_message_classifier.py
+
+import re
+from typing import Dict, Iterable, List, Mapping, Tuple
+from src.configuration_and_enums.system_messages import SYSTEM_MESSAGE_PHRASES
+
+# Characters exports use interchangeably, each mapped to the class matching all of them
+_EQUIVALENT_CHARS = {
+    "'": "['’]",
+    '’': "['’]",
+    '"': '["“”«»„]',
+}
+_CHAR_CLASSES = frozenset(_EQUIVALENT_CHARS.values())
+# What each slot of a phrase matches; names and values are lazy so the fixed text after them decides
+_SLOTS = {
+    '{name}': r'.+?',
+    '{value}': r'.*?',
+    '{more}': r'(?:\..*)?',
+}
+_SLOT_SPLIT = re.compile('(' + '|'.join(map(re.escape, _SLOTS)) + ')')
+
+
+class SystemMessageClassifierInterface:
+    """Interface for recognising WhatsApp system notices."""
+    def is_system_message(self, content: str) -> bool:
+        raise NotImplementedError
+
+
+class DefaultSystemMessageClassifier(SystemMessageClassifierInterface):
+    """
+    Recognises system notices by their wording, in every language of
+    SYSTEM_MESSAGE_PHRASES at once.
+
+    A body is a notice only if it is one line that a phrase matches as a
+    whole, its slots filled in; a message that merely mentions a notice is
+    not one. All phrases are compiled into a single regex shaped like a trie
+    (phrases sharing a prefix share its branch), so a body is matched once
+    whatever the number of phrases and languages. The regex only runs on
+    lines that contain a gate word: for each phrase, its longest fixed word
+    that is always a whole word of the line (not the last, which a period may
+    follow) and holds no quotation mark. Ordinary messages mostly share no
+    word with the gate set, which a set lookup settles faster than a match.
+    """
+
+    def __init__(self, phrases: Mapping[str, Iterable[str]] = None):
+        """phrases: locale -> phrases; defaults to SYSTEM_MESSAGE_PHRASES."""
+        self.phrases = SYSTEM_MESSAGE_PHRASES if phrases is None else phrases
+        phrases = tuple(phrase for locale in sorted(self.phrases) for phrase in self.phrases[locale])
+        self._fullmatch = _compile(phrases).fullmatch
+        self._gate_words = frozenset(_gate_word(phrase) for phrase in phrases)
+
+    def is_system_message(self, content: str) -> bool:
+        # Matching lowercased text keeps re's first-character skip, which IGNORECASE disables
+        line = content.strip().lower()
+        if '\n' in line or self._gate_words.isdisjoint(line.split()):
+            return False
+        return self._fullmatch(line) is not None
+
+
+def _tokens(phrase: str) -> List[str]:
+    """A phrase as lowercased characters and whole slots."""
+    tokens: List[str] = []
+    for part in _SLOT_SPLIT.split(phrase):
+        tokens.extend([part] if part in _SLOTS else part.lower())
+    return tokens
+
+
+def _gate_word(phrase: str) -> str:
+    words = _SLOT_SPLIT.sub(' ', phrase).lower().split()
+    candidates = [word for word in words[:-1] if not any(char in _EQUIVALENT_CHARS for char in word)]
+    return max(candidates or words, key=len)
+
+
+_compiled: Dict[Tuple[str, ...], 're.Pattern[str]'] = {}
+
+
+def _compile(phrases: Tuple[str, ...]) -> 're.Pattern[str]':
+    """Compile phrases into one trie-shaped pattern matching whole lowercased lines; cached per phrase set."""
+    if phrases not in _compiled:
+        trie: dict = {}
+        for phrase in phrases:
+            node = trie
+            for token in _tokens(phrase):
+                node = node.setdefault(_EQUIVALENT_CHARS.get(token, token), {})
+            node[''] = True
+        # A pattern matching nothing if there are no phrases
+        _compiled[phrases] = re.compile(rf"(?:{_trie_pattern(trie)})\.?" if trie else r'(?!)', re.DOTALL)
+    return _compiled[phrases]
+
+
+def _trie_pattern(node: dict) -> str:
+    branches = [
+        _token_pattern(token) + _trie_pattern(child)
+        for token, child in sorted(node.items()) if token
+    ]
+    if '' in node:
+        # A phrase ends here; the empty branch comes last so longer phrases are tried first
+        branches.append('')
+    return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+
+def _token_pattern(token: str) -> str:
+    if token in _SLOTS:
+        return _SLOTS[token]
+    return token if token in _CHAR_CLASSES else re.escape(token)
@@ -0,0 +1,187 @@
+# src/modules/time_index.py
+
+import bisect
+import codecs
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+from src.modules.message_grouper import MessageGrouper
+from src.modules.message_parser import DefaultStructuredMessageStrategy, MessageParser
+from src.utils.text_utils import TextUtils
+
+logger = logging.getLogger(__name__)
+
+# Bump when the sidecar layout changes; older sidecars are then rebuilt
+TIME_INDEX_SCHEMA_VERSION = 1
+TIME_INDEX_SUFFIX = '.index.json'
+
+
+def is_line_seekable(encoding: str) -> bool:
+    """True if b'\\n' only ever ends a line in this encoding (UTF-8 and single-byte code pages)."""
+    try:
+        return 'a\n'.encode(encoding) == b'a\n' and codecs.lookup(encoding).name != 'utf-8-sig'
+    except LookupError:
+        return False
+
+
+@dataclass
+class TimeIndexEntry:
+    """A message start: its byte offset, ordinal (0-based) and timestamp, if it could be parsed."""
+    offset: int
+    ordinal: int
+    timestamp: Optional[datetime]
+
+
+class TimeIndex:
+    """
+    Sparse byte-offset index of a chat file, stored as a JSON sidecar next to it.
+
+    Holds an entry for the first message of every day and at least one every
+    `every` messages, so a time range or a run of messages can be read by
+    seeking to the nearest entry and parsing only the span up to the next one.
+    Only built for encodings where a byte offset at a line start can be
+    seeked to (see is_line_seekable).
+    """
+
+    def __init__(
+        self,
+        entries: List[TimeIndexEntry],
+        end_offset: int,
+        message_count: int,
+        encoding: str,
+        date_format: str,
+        every: int,
+        source_size: int,
+        source_mtime_ns: int
+    ):
+        self.entries = entries
+        self.end_offset = end_offset
+        self.message_count = message_count
+        self.encoding = encoding
+        self.date_format = date_format
+        self.every = every
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        self._ordinals = [entry.ordinal for entry in entries]
+        # Entries without a timestamp inherit the previous one, keeping the list sorted for bisect
+        self._times: List[datetime] = []
+        last = datetime.min
+        for entry in entries:
+            last = max(last, entry.timestamp) if entry.timestamp else last
+            self._times.append(last)
+
+    @staticmethod
+    def sidecar_path(chat_file: Path) -> Path:
+        return chat_file.with_name(chat_file.name + TIME_INDEX_SUFFIX)
+
+    @classmethod
+    def build(
+        cls,
+        chat_file: Path,
+        encoding: str,
+        date_format: str,
+        grouper: MessageGrouper = None,
+        every: int = 1000
+    ) -> 'TimeIndex':
+        """Scan the chat file once, parsing a timestamp only where the date changes or an entry is due."""
+        if not is_line_seekable(encoding):
+            raise ValueError(f"Cannot index {chat_file}: byte offsets are not seekable in {encoding}")
+        is_message_start = (grouper or MessageGrouper()).start_strategy.is_message_start
+        structured = DefaultStructuredMessageStrategy()
+        parser = MessageParser(date_format, '')
+        stat = chat_file.stat()
+        entries: List[TimeIndexEntry] = []
+        offset = 0
+        ordinal = 0
+        last_date_text = None
+        with open(chat_file, 'rb') as f:
+            for raw_line in f:
+                line = raw_line.decode(encoding, errors='replace')
+                if is_message_start(line):
+                    parsed = structured.try_parse_structured_message(TextUtils.clean_unicode(line))
+                    timestamp_str = parsed[0] if parsed else ''
+                    # The date is everything before the first comma or space of the timestamp
+                    date_text = timestamp_str.replace(',', ' ').split(' ', 1)[0]
+                    due = not entries or ordinal - entries[-1].ordinal >= every
+                    if due or date_text != last_date_text:
+                        entries.append(TimeIndexEntry(offset, ordinal, parser.parse_timestamp(timestamp_str)))
+                        last_date_text = date_text
+                    ordinal += 1
+                offset += len(raw_line)
+        return cls(entries, offset, ordinal, encoding, date_format, every, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['TimeIndex']:
+        """Load a sidecar; None if it is missing or was written by another schema version."""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if data.get('schema_version') != TIME_INDEX_SCHEMA_VERSION:
+            return None
+        entries = [
+            TimeIndexEntry(offset, ordinal, datetime.fromisoformat(timestamp) if timestamp else None)
+            for offset, ordinal, timestamp in data['entries']
+        ]
+        return cls(
+            entries, data['end_offset'], data['message_count'], data['encoding'], data['date_format'],
+            data['every'], data['source_size'], data['source_mtime_ns']
+        )
+
+    def save(self, path: Path) -> None:
+        payload = {
+            'schema_version': TIME_INDEX_SCHEMA_VERSION,
+            'encoding': self.encoding,
+            'date_format': self.date_format,
+            'every': self.every,
+            'source_size': self.source_size,
+            'source_mtime_ns': self.source_mtime_ns,
+            'end_offset': self.end_offset,
+            'message_count': self.message_count,
+            # [offset, ordinal, timestamp] triples keep the sidecar small
+            'entries': [
+                [entry.offset, entry.ordinal, entry.timestamp.isoformat() if entry.timestamp else None]
+                for entry in self.entries
+            ],
+        }
+        temp_path = path.with_name(f"{path.name}.tmp")
+        temp_path.write_text(json.dumps(payload, separators=(',', ':')), encoding='utf-8')
+        os.replace(temp_path, path)
+
+    def is_current(self, chat_file: Path) -> bool:
+        """True if the chat file is unchanged since the index was built."""
+        try:
+            stat = chat_file.stat()
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns
+
+    def span_for_time(self, start: Optional[datetime], end: Optional[datetime]) -> Tuple[int, int, int]:
+        """
+        Byte span (start, end) covering every message timestamped in [start, end), plus
+        the ordinal of its first message. The span may hold a few messages outside the range.
+        """
+        first = 0
+        if start is not None:
+            # The last entry before start; messages from start on may follow it on the same day
+            first = max(bisect.bisect_left(self._times, start) - 1, 0)
+        last = len(self.entries)
+        if end is not None:
+            last = bisect.bisect_left(self._times, end, lo=first)
+        return self._span(first, last)
+
+    def span_for_messages(self, first_message: int, count: int) -> Tuple[int, int, int]:
+        """Byte span (start, end) holding messages first_message .. first_message + count - 1, plus its first ordinal."""
+        first = max(bisect.bisect_right(self._ordinals, first_message) - 1, 0)
+        last = bisect.bisect_left(self._ordinals, first_message + count, lo=first)
+        return self._span(first, last)
+
+    def _span(self, first: int, last: int) -> Tuple[int, int, int]:
+        if not self.entries or first >= last:
+            return 0, 0, 0
+        end = self.entries[last].offset if last < len(self.entries) else self.end_offset
+        return self.entries[first].offset, end, self.entries[first].ordinal
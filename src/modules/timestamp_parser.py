@@ -0,0 +1,192 @@
+# src/modules/timestamp_parser.py
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence, Tuple
+
+# strptime directives the compiled parser understands, with the pattern each one matches
+_DIRECTIVES = {
+    'd': r'(\d{1,2})',
+    'm': r'(\d{1,2})',
+    'Y': r'(\d{4})',
+    'y': r'(\d{2})',
+    'H': r'(\d{1,2})',
+    'I': r'(\d{1,2})',
+    'M': r'(\d{2})',
+    'S': r'(\d{2})',
+    'p': r'([AaPp])\.?\s?[Mm]\.?',
+}
+_DIRECTIVE = re.compile(r'%(.)')
+_AMPM_WITHOUT_SPACE = re.compile(r'(\d)([AaPp]\.?[Mm]\.?)$')
+
+
+def normalize_timestamp(timestamp_str: str, spaced_ampm: bool = True) -> str:
+    """
+    Converts '2022-05-05, 9:13:12PM' -> '2022-05-05 9:13:12 PM', the layout
+    of '<date_format> <time_format>'. Exports put a comma after the date, and
+    the narrow no-break space before AM/PM is removed by clean_unicode.
+    """
+    timestamp_str = timestamp_str.replace(',', '')
+    return _AMPM_WITHOUT_SPACE.sub(r'\1 \2', timestamp_str) if spaced_ampm else timestamp_str
+
+
+class TimestampParserInterface:
+    """Interface for turning timestamp text from an export into datetimes."""
+    def parse(self, timestamp_str: str) -> Optional[datetime]:
+        raise NotImplementedError
+
+    def parse_day(self, timestamp_str: str) -> Optional[date]:
+        raise NotImplementedError
+
+
+class CompiledTimestampParser(TimestampParserInterface):
+    """
+    Parses timestamps with one regex compiled from a strptime-style format.
+
+    Several times faster than datetime.strptime, which re-validates its
+    format on every call. Lenient the way exports are: spaces in the format
+    also match a comma (the one after the date) or nothing (AM/PM glued to
+    the time once clean_unicode removed the narrow no-break space), and
+    AM/PM may be lower case or dotted. Only the directives in _DIRECTIVES
+    are supported; see create_timestamp_parser for the fallback.
+    """
+
+    def __init__(self, date_format: str):
+        self.date_format = date_format
+        fields = []
+        parts = []
+        position = 0
+        for directive in _DIRECTIVE.finditer(date_format):
+            parts.append(self._literal(date_format[position:directive.start()]))
+            code = directive.group(1)
+            if code not in _DIRECTIVES:
+                raise ValueError(f"Unsupported directive %{code} in {date_format!r}")
+            parts.append(_DIRECTIVES[code])
+            fields.append(code)
+            position = directive.end()
+        parts.append(self._literal(date_format[position:]))
+        self._pattern = re.compile(''.join(parts) + r'\s*$')
+        # Group index of each field, or None if the format lacks it
+        position_of = {code: index for index, code in enumerate(fields)}
+        year = position_of.get('Y', position_of.get('y'))
+        self._two_digit_year = 'y' in position_of
+        self._positions = (
+            year, position_of.get('m'), position_of.get('d'), position_of.get('H', position_of.get('I')),
+            position_of.get('M'), position_of.get('S'), position_of.get('p')
+        )
+        date_codes = [code for code in fields if code in 'dmYy']
+        # The date comes first in every export format, so the prefix of the
+        # pattern up to the last date field matches the date alone
+        date_end = fields.index(date_codes[-1]) + 1 if date_codes else 0
+        self._date_pattern = re.compile(''.join(parts[:2 * date_end]))
+        self._date_fields = fields[:date_end]
+        self._day_cache = {}
+
+    @staticmethod
+    def _literal(text: str) -> str:
+        pattern = []
+        for char in text:
+            if char.isspace():
+                pattern.append(r'[\s,]*')
+            elif char == ',':
+                pattern.append(',?')
+            else:
+                pattern.append(re.escape(char))
+        return ''.join(pattern)
+
+    def parse(self, timestamp_str: str) -> Optional[datetime]:
+        match = self._pattern.match(timestamp_str)
+        if match is None:
+            return None
+        groups = match.groups()
+        year, month, day, hour, minute, second, ampm = self._positions
+        if year is None:
+            year = 1
+        else:
+            year = _expand_year(int(groups[year])) if self._two_digit_year else int(groups[year])
+        hour = int(groups[hour]) if hour is not None else 0
+        if ampm is not None:
+            if not 1 <= hour <= 12:
+                return None
+            hour = hour % 12 + (12 if groups[ampm] in 'Pp' else 0)
+        try:
+            return datetime(
+                year,
+                int(groups[month]) if month is not None else 1,
+                int(groups[day]) if day is not None else 1,
+                hour,
+                int(groups[minute]) if minute is not None else 0,
+                int(groups[second]) if second is not None else 0
+            )
+        except ValueError:
+            return None
+
+    def parse_day(self, timestamp_str: str) -> Optional[date]:
+        """Date of a timestamp, cached per distinct date text."""
+        match = self._date_pattern.match(timestamp_str)
+        if match is None:
+            return None
+        date_text = match.group()
+        if date_text not in self._day_cache:
+            values = dict(zip(self._date_fields, match.groups()))
+            if 'y' in values:
+                year = _expand_year(int(values['y']))
+            else:
+                year = int(values.get('Y', 1))
+            try:
+                self._day_cache[date_text] = date(year, int(values.get('m', 1)), int(values.get('d', 1)))
+            except ValueError:
+                self._day_cache[date_text] = None
+        return self._day_cache[date_text]
+
+
+class StrptimeTimestampParser(TimestampParserInterface):
+    """Fallback for formats with directives the compiled parser lacks, such as month names."""
+
+    def __init__(self, date_format: str):
+        self.date_format = date_format
+        self._day_format = date_format.split(' ', 1)[0]
+        self._spaced_ampm = ' %p' in date_format
+
+    def parse(self, timestamp_str: str) -> Optional[datetime]:
+        try:
+            return datetime.strptime(normalize_timestamp(timestamp_str, self._spaced_ampm), self.date_format)
+        except ValueError:
+            return None
+
+    def parse_day(self, timestamp_str: str) -> Optional[date]:
+        date_text = timestamp_str.replace(',', ' ').split(' ', 1)[0]
+        try:
+            return datetime.strptime(date_text, self._day_format).date()
+        except ValueError:
+            return None
+
+
+def _expand_year(year: int) -> int:
+    """Two-digit years as strptime reads %y: 69-99 are 1969-1999, 00-68 are 2000-2068."""
+    return year + (1900 if year >= 69 else 2000)
+
+
+@lru_cache(maxsize=64)
+def create_timestamp_parser(date_format: str) -> TimestampParserInterface:
+    """The compiled parser for date_format, or the strptime one if the format is not supported."""
+    try:
+        return CompiledTimestampParser(date_format)
+    except ValueError:
+        return StrptimeTimestampParser(date_format)
+
+
+def best_timestamp_format(candidates: Iterable[str], samples: Sequence[str]) -> Tuple[Optional[str], int]:
+    """
+    The candidate format whose parser reads the most samples, with that count.
+
+    Earlier candidates win ties; (None, 0) if no candidate reads any sample.
+    """
+    best, best_count = None, 0
+    for candidate in candidates:
+        parse = create_timestamp_parser(candidate).parse
+        count = sum(1 for sample in samples if parse(sample) is not None)
+        if count > best_count:
+            best, best_count = candidate, count
+    return best, best_count
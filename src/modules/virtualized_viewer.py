@@ -0,0 +1,304 @@
+# src/modules/virtualized_viewer.py
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List
+from src.configuration_and_enums.special_messages import SpecialMessages
+from src.data_models import Message
+from src.data_models.chat_metadata import ChatMetadata
+from src.modules.conversion_progress import ConversionCancelled
+from src.modules.html_generator import HTMLGenerator, HTMLOutputBackendInterface
+from src.modules.media_handler import MediaHandler
+from src.modules.search_index import SEARCH_BAR_HTML, SEARCH_CSS, SearchIndexBuilder, search_page_script
+from src.utils.custom_logging.decorators import stage_timer
+
+# Record kinds understood by the viewer script
+KIND_TEXT = 't'
+KIND_SYSTEM = 's'
+KIND_CALL = 'c'
+KIND_MISSING = 'x'
+KIND_UNKNOWN = 'u'
+
+
+class VirtualizedViewerBackend(HTMLOutputBackendInterface):
+    """
+    Writes messages as compact JSON shards plus one static viewer page.
+
+    Shards are wrapped in a JSONP-style call (``chatShard(i, [...])``) so the
+    viewer can load them with script tags, which browsers allow for pages
+    opened straight from local disk where fetch() of file:// URLs is blocked.
+    """
+
+    def __init__(self, shard_size: int = 500):
+        if shard_size < 1:
+            raise ValueError("shard_size must be at least 1")
+        self.shard_size = shard_size
+
+    def write(
+        self,
+        html_generator: HTMLGenerator,
+        messages: List[Message],
+        chat_metadata: ChatMetadata,
+        media_handler: MediaHandler,
+        output_path: Path
+    ) -> Path:
+        shard_dir = output_path.with_name(f"{output_path.stem}_shards")
+        shard_dir.mkdir(parents=True, exist_ok=True)
+
+        stage_metrics = getattr(html_generator, 'stage_metrics', None)
+        progress = getattr(html_generator, 'progress', None)
+        search_index = html_generator.begin_search_index(output_path)
+        sender_index: Dict[str, int] = {}
+        shard_counts = []
+        try:
+            for start in range(0, len(messages), self.shard_size):
+                if progress is not None:
+                    progress.rendered(start, len(messages))
+                batch = messages[start:start + self.shard_size]
+                if search_index is not None:
+                    batch = list(search_index.indexed(batch))
+                with stage_timer(stage_metrics, 'rendering', items=len(batch)):
+                    records = [self._to_record(message, sender_index, media_handler) for message in batch]
+                with stage_timer(stage_metrics, 'writing') as stage:
+                    stage.bytes += self._write_shard(shard_dir, len(shard_counts), records)
+                shard_counts.append(len(records))
+        except ConversionCancelled:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+            raise
+
+        senders = list(sender_index)
+        manifest = {
+            'shardDir': shard_dir.name,
+            'shardCounts': shard_counts,
+            'senders': senders,
+            'me': sender_index.get(chat_metadata.my_name, -1),
+        }
+        output_path.write_text(self._viewer_page(html_generator.css_template, manifest, search_index), encoding='utf-8')
+        html_generator.finish_search_index()
+        return output_path
+
+    @staticmethod
+    def _to_record(message: Message, sender_index: Dict[str, int], media_handler: MediaHandler) -> list:
+        """Convert a message into a compact [timestamp, sender, kind, value] record."""
+        timestamp_display = message.timestamp.strftime('%Y-%m-%d %H:%M') if message.timestamp else ''
+        sender = sender_index.setdefault(message.sender, len(sender_index))
+        content = message.content
+        if getattr(message, "is_system_message", False):
+            return [timestamp_display, sender, KIND_SYSTEM, content]
+        if content.lower() == SpecialMessages.NULL_MESSAGE:
+            return [timestamp_display, sender, KIND_CALL, '']
+        attachment = media_handler.resolve_attachment(content)
+        if attachment is None:
+            return [timestamp_display, sender, KIND_TEXT, content]
+        filename, media_type, file_path = attachment
+        if file_path is None:
+            return [timestamp_display, sender, KIND_MISSING, filename]
+        if media_type is None:
+            return [timestamp_display, sender, KIND_UNKNOWN, filename]
+        return [timestamp_display, sender, media_type.category, media_handler.media_embedder.media_src(file_path)]
+
+    @staticmethod
+    def _write_shard(shard_dir: Path, index: int, records: list) -> int:
+        """Write one shard file and return its size in bytes."""
+        payload = json.dumps(records, ensure_ascii=False, separators=(',', ':'))
+        encoded = f"chatShard({index},{payload});\n".encode('utf-8')
+        (shard_dir / f"shard_{index:05d}.js").write_bytes(encoded)
+        return len(encoded)
+
+    @staticmethod
+    def _viewer_page(css_template: str, manifest: dict, search_index: SearchIndexBuilder = None) -> str:
+        manifest_json = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+        return (
+            "<!DOCTYPE html>\n"
+            "<html lang=\"en\">\n"
+            "<head>\n"
+            "    <meta charset=\"UTF-8\">\n"
+            "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">\n"
+            "    <title>WhatsApp Chat</title>\n"
+            "    <style>\n"
+            f"{css_template}\n"
+            f"{VIEWER_CSS}\n"
+            f"{SEARCH_CSS if search_index is not None else ''}"
+            "    </style>\n"
+            "</head>\n"
+            "<body>\n"
+            f"{SEARCH_BAR_HTML if search_index is not None else ''}"
+            "    <div class=\"chat-container\" id=\"chat\"></div>\n"
+            f"    <script>const MANIFEST = {manifest_json};</script>\n"
+            f"    <script>{VIEWER_SCRIPT}</script>\n"
+            f"{search_page_script(search_index) if search_index is not None else ''}"
+            "</body>\n"
+            "</html>"
+        )
+
+
+VIEWER_CSS = """
+        .shard { display: flow-root; }
+        .content span { white-space: pre-wrap; }
+"""
+
+# Each shard is a placeholder sized from an estimated (later measured) height.
+# Shards near the viewport are loaded and rendered; shards that scroll far
+# away are emptied again, so the DOM only ever holds a small window.
+VIEWER_SCRIPT = """
+(function () {
+    const ESTIMATED_ROW_HEIGHT = 72;
+    const CACHE_LIMIT = 8;
+    const chat = document.getElementById('chat');
+    const cache = new Map();
+    const waiting = new Map();
+    const placeholders = [];
+
+    window.chatShard = function (index, rows) {
+        cache.set(index, rows);
+        if (cache.size > CACHE_LIMIT) {
+            for (const key of cache.keys()) {
+                if (!placeholders[key].dataset.rendered) { cache.delete(key); break; }
+            }
+        }
+        const callbacks = waiting.get(index) || [];
+        waiting.delete(index);
+        callbacks.forEach(function (cb) { cb(rows); });
+    };
+
+    function loadShard(index, cb) {
+        if (cache.has(index)) { cb(cache.get(index)); return; }
+        if (waiting.has(index)) { waiting.get(index).push(cb); return; }
+        waiting.set(index, [cb]);
+        const script = document.createElement('script');
+        script.src = MANIFEST.shardDir + '/shard_' + String(index).padStart(5, '0') + '.js';
+        script.onload = script.onerror = function () { script.remove(); };
+        document.head.appendChild(script);
+    }
+
+    function el(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    function media(kind, value, cls) {
+        if (kind === 'image') {
+            const img = el('img', cls);
+            img.loading = 'lazy';
+            img.alt = 'Image';
+            img.src = value;
+            return img;
+        }
+        if (kind === 'audio' || kind === 'video') {
+            const player = el(kind, cls);
+            player.controls = true;
+            player.preload = 'none';
+            const source = document.createElement('source');
+            source.src = value;
+            player.appendChild(source);
+            return player;
+        }
+        if (kind === 'pdf') {
+            const link = el('a', cls, '\\ud83d\\udcc4 View PDF');
+            link.href = value;
+            link.target = '_blank';
+            return link;
+        }
+        return null;
+    }
+
+    function renderRow(row) {
+        const ts = row[0], sender = row[1], kind = row[2], value = row[3];
+        if (kind === 's') return el('div', 'system-message', value);
+        const cls = sender === MANIFEST.me ? 'me' : 'other';
+        const node = el('div', 'message ' + cls);
+        node.appendChild(el('div', 'sender', MANIFEST.senders[sender]));
+        node.appendChild(el('div', 'timestamp', ts));
+        const content = el('div', 'content');
+        if (kind === 't') {
+            content.appendChild(el('span', cls, value));
+        } else if (kind === 'c') {
+            content.appendChild(el('span', 'call-indicator',
+                '\\ud83d\\udcde ' + (cls === 'other' ? 'Incoming' : 'Outgoing') + ' call'));
+        } else if (kind === 'x') {
+            content.appendChild(el('span', cls, '\\ud83d\\udcce ' + value + ' (file not found)'));
+        } else if (kind === 'u') {
+            content.appendChild(el('span', cls, '\\ud83d\\udcce ' + value + ' (unknown type)'));
+        } else {
+            content.appendChild(media(kind, value, cls));
+        }
+        node.appendChild(content);
+        return node;
+    }
+
+    function mount(placeholder) {
+        const index = Number(placeholder.dataset.index);
+        placeholder.dataset.wanted = '1';
+        loadShard(index, function (rows) {
+            if (!placeholder.dataset.wanted || placeholder.dataset.rendered) return;
+            const fragment = document.createDocumentFragment();
+            rows.forEach(function (row) { fragment.appendChild(renderRow(row)); });
+            placeholder.appendChild(fragment);
+            placeholder.style.height = '';
+            placeholder.dataset.rendered = '1';
+        });
+    }
+
+    function unmount(placeholder) {
+        delete placeholder.dataset.wanted;
+        if (!placeholder.dataset.rendered) return;
+        placeholder.style.height = placeholder.offsetHeight + 'px';
+        placeholder.replaceChildren();
+        delete placeholder.dataset.rendered;
+    }
+
+    const observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) mount(entry.target); else unmount(entry.target);
+        });
+    }, { rootMargin: '1500px 0px' });
+
+    MANIFEST.shardCounts.forEach(function (count, index) {
+        const placeholder = el('div', 'shard');
+        placeholder.dataset.index = index;
+        placeholder.style.height = (count * ESTIMATED_ROW_HEIGHT) + 'px';
+        placeholders.push(placeholder);
+        chat.appendChild(placeholder);
+        observer.observe(placeholder);
+    });
+
+    // Locates message n (0-based, across shards) for the search bar
+    function locate(n) {
+        let index = 0;
+        while (index < MANIFEST.shardCounts.length - 1 && n >= MANIFEST.shardCounts[index]) {
+            n -= MANIFEST.shardCounts[index];
+            index++;
+        }
+        return [index, n];
+    }
+
+    window.chatView = {
+        preview: function (n, cb) {
+            const at = locate(n);
+            loadShard(at[0], function (rows) {
+                const row = rows[at[1]];
+                if (!row) { cb(''); return; }
+                cb(row[2] === 's' ? row[3] : MANIFEST.senders[row[1]] + ': ' + row[3]);
+            });
+        },
+        show: function (n) {
+            const at = locate(n);
+            const placeholder = placeholders[at[0]];
+            if (!placeholder) return;
+            placeholder.scrollIntoView();
+            mount(placeholder);
+            // Runs after mount's own callback has rendered the shard
+            loadShard(at[0], function () {
+                const node = placeholder.children[at[1]];
+                if (!node) return;
+                document.querySelectorAll('.search-hit').forEach(function (hit) { hit.classList.remove('search-hit'); });
+                node.classList.add('search-hit');
+                node.scrollIntoView({ block: 'center' });
+            });
+        }
+    };
+})();
+"""
@@ -0,0 +1,21 @@
+# src/services/__init__.py
+
+"""
+Long-running services built on the converter.
+
+This package contains:
+- ArchiveServer: Local HTTP server rendering an export's pages on demand
+- WatchFolderService: Converts exports dropped into an inbox directory
+- WorkerDaemon: Warm conversion workers behind a local Unix socket
+"""
+
+from .archive_server import ArchiveServer, ArchiveSession
+from .watch_folder import WatchFolderService
+from .worker_daemon import WorkerDaemon
+
+__all__ = [
+    'ArchiveServer',
+    'ArchiveSession',
+    'WatchFolderService',
+    'WorkerDaemon',
+]
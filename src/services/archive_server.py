@@ -0,0 +1,438 @@
+# src/services/archive_server.py
+
+"""
+Local web server browsing an export page by page, rendered on demand.
+
+Usage:
+    python -m src.services.archive_server EXPORT [--port 8000] [--page-size 500] [--cache-mb 64] [--me NAME]
+
+EXPORT is a WhatsApp ZIP export or a chat .txt file next to its media.
+"""
+
+import argparse
+import json
+import logging
+import mimetypes
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import quote, unquote
+from src.configuration_and_enums.format_detector import FormatDetector, WhatsAppFormat, normalize_encoding
+from src.data_models import ChatMetadata, Message, ParticipantStats
+from src.main_orchastrator import WhatsAppChatConverter
+from src.modules.archive_packager import DirectoryMediaSource, MediaSourceInterface, ZipMediaSource
+from src.modules.date_order_resolver import DateOrderResolverInterface, DefaultDateOrderResolver, iter_text_chunks
+from src.modules.html_generator import HTMLGenerator
+from src.modules.media_handler import DefaultMediaEmbedder, MediaHandler
+from src.modules.message_grouper import MessageGrouper
+from src.modules.message_parser import MessageParser
+from src.modules.owner_resolver import (
+    OWNER_PLACEHOLDER,
+    DefaultOwnerResolver,
+    OwnerResolverInterface,
+    chat_name_from_path,
+)
+from src.modules.time_index import is_line_seekable
+
+logger = logging.getLogger(__name__)
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+COPY_BUFFER_SIZE = 64 * 1024
+# Characters scanned for the chat's date order when a session opens
+DATE_ORDER_SCAN_CHARS = 8 * 1024 * 1024
+
+
+class LRUCache:
+    """Thread-safe LRU cache of byte strings, bounded by their total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[object, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+class ServerMediaEmbedder(DefaultMediaEmbedder):
+    """Points media embeds at the server's /media/ URLs."""
+
+    def __init__(self, media_folder: Path):
+        super().__init__()
+        self.media_folder = media_folder
+
+    def media_src(self, file_path: Path) -> str:
+        return '/media/' + quote(file_path.relative_to(self.media_folder).as_posix())
+
+
+class PageIndex:
+    """
+    Byte offsets of every page_size-th message of a chat file, built in the background.
+
+    The chat must be in an encoding where b'\\n' only ever ends a line (UTF-8
+    and single-byte code pages), so a page can be read by seeking to its offset.
+    Pages become available as soon as the scan has passed them.
+    """
+
+    def __init__(self, chat_file: Path, encoding: str, page_size: int, grouper: MessageGrouper):
+        self.chat_file = chat_file
+        self.encoding = encoding
+        self.page_size = page_size
+        self.grouper = grouper
+        self.offsets: List[int] = []
+        self.end_offset: Optional[int] = None
+        self.message_count = 0
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._scan, name='page-indexer', daemon=True)
+        self._thread.start()
+
+    @property
+    def complete(self) -> bool:
+        return self.end_offset is not None
+
+    def page_span(self, page: int) -> Optional[Tuple[int, int]]:
+        """Return the (start, end) byte span of a page, waiting for the scan to reach it; None past the end."""
+        with self._condition:
+            self._condition.wait_for(lambda: len(self.offsets) > page + 1 or self.complete)
+            if page >= len(self.offsets):
+                return None
+            end = self.offsets[page + 1] if page + 1 < len(self.offsets) else self.end_offset
+            return self.offsets[page], end
+
+    def _scan(self) -> None:
+        is_message_start = self.grouper.start_strategy.is_message_start
+        offset = 0
+        messages = 0
+        try:
+            with open(self.chat_file, 'rb') as f:
+                for raw_line in f:
+                    if is_message_start(raw_line.decode(self.encoding, errors='replace')):
+                        if messages % self.page_size == 0:
+                            with self._condition:
+                                self.offsets.append(offset)
+                                self._condition.notify_all()
+                        messages += 1
+                    offset += len(raw_line)
+        finally:
+            with self._condition:
+                self.message_count = messages
+                self.end_offset = offset
+                self._condition.notify_all()
+            logger.info("Indexed %d message(s) in %d page(s)", messages, len(self.offsets))
+
+
+class ArchiveSession:
+    """
+    An export opened for browsing.
+
+    Only the chat text is read up front (and, for ZIP exports, extracted);
+    messages are parsed and rendered per page when requested, and rendered
+    pages are kept in a size-bounded LRU cache.
+    """
+
+    def __init__(
+        self,
+        export_path: Path,
+        page_size: int = 500,
+        cache_bytes: int = 64 * 1024 * 1024,
+        my_name: str = None,
+        html_generator: HTMLGenerator = None,
+        message_grouper: MessageGrouper = None,
+        owner_resolver: OwnerResolverInterface = None,
+        date_order_resolver: DateOrderResolverInterface = None
+    ):
+        self.page_size = page_size
+        self.owner_resolver = owner_resolver or DefaultOwnerResolver()
+        self.chat_name = chat_name_from_path(export_path)
+        self.html_generator = html_generator or HTMLGenerator()
+        self.message_grouper = message_grouper or MessageGrouper()
+        self.cache = LRUCache(cache_bytes)
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._render_lock = threading.Lock()
+
+        self.chat_file, self.media_source, media_folder = self._open_export(export_path)
+        encoding, _ = FormatDetector.detect_encoding(str(self.chat_file))
+        self.encoding = normalize_encoding(encoding)
+        if not is_line_seekable(self.encoding):
+            self.chat_file = self._transcode_to_utf8(self.chat_file, self.encoding)
+            self.encoding = 'utf-8'
+        whatsapp_format, _, _ = FormatDetector().detect_format(str(self.chat_file), self.encoding)
+        if whatsapp_format == WhatsAppFormat.UNKNOWN:
+            raise ValueError("Could not detect WhatsApp format in chat file")
+        format_info = FormatDetector.get_format_info(whatsapp_format)
+        # Only the start of the chat is scanned, so opening stays quick
+        self.date_format = (date_order_resolver or DefaultDateOrderResolver()).resolve(
+            iter_text_chunks(self.chat_file, self.encoding, DATE_ORDER_SCAN_CHARS), format_info
+        ).date_format
+
+        self.media_handler = MediaHandler(media_folder, ServerMediaEmbedder(media_folder), self.media_source.index())
+        self.page_index = PageIndex(self.chat_file, self.encoding, page_size, self.message_grouper)
+        self.chat_metadata = ChatMetadata(participant_names=set(), date_format=self.date_format, my_name=my_name)
+
+    def close(self) -> None:
+        self._temp_dir.cleanup()
+
+    def render_page(self, page: int) -> Optional[bytes]:
+        """Return the HTML of a page, or None if the chat has fewer pages."""
+        cached = self.cache.get(page)
+        if cached is not None:
+            return cached
+        if self.chat_metadata.my_name is None:
+            self._resolve_my_name()
+        messages = self._parse_page(page)
+        if messages is None:
+            return None
+        with self._render_lock:
+            body = ''.join(self.html_generator.iter_message_html([messages], self.chat_metadata, self.media_handler))
+        navigation = self._navigation(page)
+        document = (
+            self.html_generator.document_head() + navigation + '\n' + body + '\n' + navigation
+            + self.html_generator.document_tail()
+        ).encode('utf-8')
+        self.cache.put(page, document)
+        return document
+
+    def status(self) -> dict:
+        return {
+            'pages_indexed': len(self.page_index.offsets),
+            'index_complete': self.page_index.complete,
+            'messages': self.page_index.message_count if self.page_index.complete else None,
+            'page_size': self.page_size,
+            'cache': self.cache.stats(),
+        }
+
+    def _resolve_my_name(self) -> None:
+        """Without --me, resolve the owner from the participants of the first page."""
+        stats = ParticipantStats()
+        self._parse_page(0, MessageParser(self.date_format, OWNER_PLACEHOLDER, participant_stats=stats))
+        my_name = self.owner_resolver.resolve(stats, self.chat_name)
+        with self._render_lock:
+            if self.chat_metadata.my_name is None:
+                self.chat_metadata.my_name = my_name
+
+    def _parse_page(self, page: int, parser: MessageParser = None) -> Optional[List[Message]]:
+        span = self.page_index.page_span(page)
+        if span is None:
+            return None
+        start, end = span
+        with open(self.chat_file, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        lines = data.decode(self.encoding, errors='replace').splitlines()
+        parser = parser or MessageParser(self.date_format, self.chat_metadata.my_name or '')
+        messages = []
+        last_sender = ''
+        for group in self.message_grouper.iter_message_groups(lines):
+            message = parser.parse_message(group, last_sender)
+            messages.append(message)
+            if message.sender:
+                last_sender = message.sender
+        return messages
+
+    def _navigation(self, page: int) -> str:
+        known_pages = len(self.page_index.offsets)
+        total = str(known_pages) if self.page_index.complete else f"{known_pages}+"
+        links = []
+        if page > 0:
+            links.append(f'<a href="/page/{page - 1}">&larr; Previous</a>')
+        links.append(f'<span>Page {page + 1} of {total}</span>')
+        if not self.page_index.complete or page + 1 < known_pages:
+            links.append(f'<a href="/page/{page + 1}">Next &rarr;</a>')
+        return f'        <div class="system-message">{" &middot; ".join(links)}</div>'
+
+    def _open_export(self, export_path: Path) -> Tuple[Path, MediaSourceInterface, Path]:
+        """Return the chat file on disk, the media source and the folder media paths are relative to."""
+        if export_path.suffix.lower() != '.zip':
+            return export_path, DirectoryMediaSource(export_path.parent), export_path.parent
+        with zipfile.ZipFile(export_path) as zip_file:
+            chat_member = WhatsAppChatConverter.find_chat_member(zip_file)
+            chat_file = Path(self._temp_dir.name) / chat_member.name
+            with zip_file.open(str(chat_member)) as src, open(chat_file, 'wb') as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+        member_prefix = "" if str(chat_member.parent) == "." else f"{chat_member.parent}/"
+        return chat_file, ZipMediaSource(export_path, member_prefix), chat_file.parent
+
+    def _transcode_to_utf8(self, chat_file: Path, encoding: str) -> Path:
+        target = Path(self._temp_dir.name) / f"{chat_file.stem}.utf8.txt"
+        with open(chat_file, 'r', encoding=encoding, errors='replace', newline='') as src, \
+                open(target, 'w', encoding='utf-8', newline='') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+        return target
+
+
+class ArchiveRequestHandler(BaseHTTPRequestHandler):
+    """Serves /page/<n>, /media/<name> (with Range support) and /status for the server's session."""
+
+    server_version = 'WhatsAppArchiveServer/1.0'
+
+    @property
+    def session(self) -> ArchiveSession:
+        return self.server.session
+
+    def do_GET(self) -> None:
+        self._handle(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._handle(send_body=False)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _handle(self, send_body: bool) -> None:
+        path = unquote(self.path.split('?', 1)[0])
+        if path == '/':
+            self.send_response(HTTPStatus.FOUND)
+            self.send_header('Location', '/page/0')
+            self.end_headers()
+        elif path.startswith('/page/') and path[len('/page/'):].isdigit():
+            document = self.session.render_page(int(path[len('/page/'):]))
+            if document is None:
+                self.send_error(HTTPStatus.NOT_FOUND, "No such page")
+            else:
+                self._send_bytes(document, 'text/html; charset=utf-8', send_body)
+        elif path.startswith('/media/'):
+            self._send_media(path[len('/media/'):], send_body)
+        elif path == '/status':
+            self._send_bytes(json.dumps(self.session.status()).encode('utf-8'), 'application/json', send_body)
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def _send_bytes(self, data: bytes, content_type: str, send_body: bool) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def _send_media(self, name: str, send_body: bool) -> None:
+        # Only names in the export's index are served, which also rules out path traversal
+        media_index = self.session.media_handler.media_index
+        name = media_index.lookup(name)
+        info = media_index.get(name) if name is not None else None
+        if info is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "No such media file")
+            return
+        size = info.size
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get('Range')
+        if range_header:
+            byte_range = self._parse_range(range_header, size)
+            if byte_range is None:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.end_headers()
+                return
+            start, end = byte_range
+            status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_header('Content-Type', mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+        if not send_body:
+            return
+        with self.session.media_source.open(name) as src:
+            if start:
+                src.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = src.read(min(COPY_BUFFER_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    @staticmethod
+    def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+        """Parse a single-range Range header into inclusive (start, end); None if unsatisfiable."""
+        match = _RANGE.match(header.strip())
+        if match is None or size == 0:
+            return None
+        first, last = match.groups()
+        if not first:
+            if not last or int(last) == 0:
+                return None
+            return max(0, size - int(last)), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start > end:
+            return None
+        return start, end
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    """HTTP server bound to one ArchiveSession."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], session: ArchiveSession):
+        super().__init__(address, ArchiveRequestHandler)
+        self.session = session
+
+
+def main() -> None:
+    from src.utils.custom_logging.setup_logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('export', type=Path)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--page-size', type=int, default=500, help='messages per page')
+    parser.add_argument('--cache-mb', type=int, default=64, help='rendered page cache size in MB')
+    parser.add_argument('--me', help='your name in the chat, for message alignment')
+    args = parser.parse_args()
+
+    setup_logging()
+    session = ArchiveSession(args.export, args.page_size, args.cache_mb * 1024 * 1024, args.me)
+    server = ArchiveServer((args.host, args.port), session)
+    logger.info("Serving %s on http://%s:%d/", args.export, args.host, server.server_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+# src/services/watch_folder.py
+
+"""
+Long-running service converting exports dropped into an inbox directory.
+
+Usage:
+    python -m src.services.watch_folder INBOX OUTPUT_DIR [--workers N] [--poll-interval S] [--settle-time S]
+        [--owners OWNERS.json]
+
+Chat owners are resolved without prompting; OWNERS.json may list known
+owner names and per-chat owners (see DefaultOwnerResolver.from_file).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Job states
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+EXPORT_SUFFIXES = ('.zip', '.txt')
+
+
+@dataclass
+class Job:
+    """One export in the inbox and what happened to it."""
+    path: str
+    size: int
+    mtime_ns: int
+    status: str = PENDING
+    output: Optional[str] = None
+    error: Optional[str] = None
+    queued_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Dict = field(default_factory=dict)
+
+    def matches(self, size: int, mtime_ns: int) -> bool:
+        return self.size == size and self.mtime_ns == mtime_ns
+
+
+class JobStore:
+    """
+    Job states persisted as one JSON file.
+
+    The file is rewritten atomically after every change, so after a crash or
+    restart it holds either the previous or the new state, never a torn one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.jobs: Dict[str, Job] = {}
+        if path.exists():
+            data = json.loads(path.read_text(encoding='utf-8'))
+            self.jobs = {job['path']: Job(**job) for job in data.get('jobs', [])}
+
+    def get(self, path: str) -> Optional[Job]:
+        return self.jobs.get(path)
+
+    def put(self, job: Job) -> None:
+        self.jobs[job.path] = job
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.tmp")
+        payload = {'jobs': [asdict(job) for job in self.jobs.values()]}
+        temp_path.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+        os.replace(temp_path, self.path)
+
+
+class ServiceMetrics:
+    """Queue depth and latency figures of the service."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.queue_wait: List[float] = []
+        self.conversion_time: List[float] = []
+        self.end_to_end: List[float] = []
+
+    def record(self, job: Job) -> None:
+        if job.status == DONE:
+            self.completed += 1
+        else:
+            self.failed += 1
+        for samples, value in (
+            (self.queue_wait, job.started_at - job.queued_at),
+            (self.conversion_time, job.finished_at - job.started_at),
+            (self.end_to_end, job.finished_at - job.queued_at),
+        ):
+            samples.append(value)
+            del samples[:-self.window]
+
+    def snapshot(self, queue_depth: int) -> Dict:
+        return {
+            'timestamp': time.time(),
+            'queue_depth': queue_depth,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'queue_wait_seconds': self._percentiles(self.queue_wait),
+            'conversion_seconds': self._percentiles(self.conversion_time),
+            'end_to_end_seconds': self._percentiles(self.end_to_end),
+        }
+
+    @staticmethod
+    def _percentiles(samples: List[float]) -> Dict[str, float]:
+        if not samples:
+            return {}
+        ordered = sorted(samples)
+        return {
+            'p50': statistics.median(ordered),
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'max': ordered[-1],
+        }
+
+
+def _init_worker() -> None:
+    from src.utils.custom_logging.setup_logging import setup_logging
+    setup_logging()
+
+
+def convert_export(export_path: str, output_dir: str, owners_path: Optional[str] = None) -> Dict:
+    """Convert one export in a worker process and return where it went plus its metrics."""
+    from src.main_orchastrator import WhatsAppChatConverter
+    from src.modules.archive_packager import DirectoryMediaSource
+    from src.modules.owner_resolver import DefaultOwnerResolver
+
+    export = Path(export_path)
+    package_path = Path(output_dir) / f"{export.stem}_archive.zip"
+    owner_resolver = DefaultOwnerResolver.from_file(Path(owners_path)) if owners_path else None
+    converter = WhatsAppChatConverter(owner_resolver=owner_resolver)
+    if export.suffix.lower() == '.zip':
+        report = converter.convert_zip_export(export, package_path)
+    else:
+        report = converter.convert_and_package(export, package_path, DirectoryMediaSource(export.parent))
+    return {
+        'output': str(package_path),
+        'packaging': asdict(report),
+        'metrics': converter.last_metrics.to_dict() if converter.last_metrics else {},
+    }
+
+
+class WatchFolderService:
+    """
+    Polls an inbox directory and converts new exports with a bounded process pool.
+
+    A file is only queued once its size and modification time have not
+    changed for settle_time seconds, so exports still being copied are left
+    alone. Queued exports are converted smallest first. Job states are kept
+    in a JSON file (by default inside output_dir); on restart, finished jobs
+    are skipped unless the file changed and interrupted ones are queued again.
+    """
+
+    def __init__(
+        self,
+        inbox: Path,
+        output_dir: Path,
+        state_path: Path = None,
+        workers: int = 2,
+        poll_interval: float = 2.0,
+        settle_time: float = 5.0,
+        owners_path: Path = None
+    ):
+        self.inbox = inbox
+        self.output_dir = output_dir
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.owners_path = owners_path
+        self.store = JobStore(state_path or output_dir / 'watch_folder_state.json')
+        self.metrics_path = self.store.path.with_name('watch_folder_metrics.json')
+        self.metrics = ServiceMetrics()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._queued: set = set()
+        # path -> (size, mtime_ns, monotonic time the file was first seen with these values)
+        self._observed: Dict[str, Tuple[int, int, float]] = {}
+        self._sequence = 0
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def run(self, stop: asyncio.Event = None) -> None:
+        """Run until stop is set (or forever); interrupted jobs are resumed on the next run."""
+        stop = stop or asyncio.Event()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.PriorityQueue()
+        loop = asyncio.get_running_loop()
+        self._resume_jobs()
+        # Spawned, not forked: the logging listener thread may hold a lock at fork time
+        with ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker
+        ) as pool:
+            dispatchers = [asyncio.create_task(self._dispatch(pool)) for _ in range(self.workers)]
+            try:
+                while not stop.is_set():
+                    # Only the directory scan leaves the loop; the job bookkeeping stays on it
+                    entries = await loop.run_in_executor(None, self._scan_inbox)
+                    if entries is not None:
+                        self._poll_inbox(entries)
+                    self._write_metrics()
+                    try:
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                for dispatcher in dispatchers:
+                    dispatcher.cancel()
+                await asyncio.gather(*dispatchers, return_exceptions=True)
+                self._write_metrics()
+
+    def _resume_jobs(self) -> None:
+        for job in self.store.jobs.values():
+            if job.status in (PENDING, RUNNING) and Path(job.path).exists():
+                logger.info("Resuming %s", job.path)
+                self._enqueue(job)
+
+    def _scan_inbox(self) -> Optional[List[Tuple[str, int, int]]]:
+        """(path, size, mtime_ns) of every export in the inbox; runs in a thread to keep the loop responsive."""
+        try:
+            entries = list(os.scandir(self.inbox))
+        except OSError as e:
+            logger.error("Cannot read inbox %s: %s", self.inbox, e)
+            return None
+        exports = []
+        for entry in entries:
+            if not entry.is_file() or not entry.name.lower().endswith(EXPORT_SUFFIXES):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            exports.append((os.path.abspath(entry.path), stat.st_size, stat.st_mtime_ns))
+        return exports
+
+    def _poll_inbox(self, exports: List[Tuple[str, int, int]]) -> None:
+        """Queue every scanned export whose size and mtime settled."""
+        now = time.monotonic()
+        seen = set()
+        settled: List[Job] = []
+        for path, size, mtime_ns in exports:
+            seen.add(path)
+            observed = self._observed.get(path)
+            if observed is None or observed[:2] != (size, mtime_ns):
+                self._observed[path] = (size, mtime_ns, now)
+                continue
+            if now - observed[2] < self.settle_time or path in self._queued:
+                continue
+            job = self.store.get(path)
+            if job is not None and job.matches(size, mtime_ns) and job.status in (DONE, FAILED):
+                continue
+            settled.append(Job(path=path, size=size, mtime_ns=mtime_ns))
+        # Smallest first, also among files settling in the same poll
+        for job in sorted(settled, key=lambda job: job.size):
+            self._enqueue(job)
+        for path in set(self._observed) - seen:
+            del self._observed[path]
+
+    def _enqueue(self, job: Job) -> None:
+        job.status = PENDING
+        job.queued_at = job.queued_at or time.time()
+        self.store.put(job)
+        self._queued.add(job.path)
+        self._sequence += 1
+        self._queue.put_nowait((job.size, self._sequence, job.path))
+        logger.info("Queued %s (%d bytes, queue depth %d)", job.path, job.size, self.queue_depth())
+
+    async def _dispatch(self, pool: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, path = await self._queue.get()
+            job = self.store.get(path)
+            job.status = RUNNING
+            job.started_at = time.time()
+            self.store.put(job)
+            self.metrics.running += 1
+            try:
+                job.result = await loop.run_in_executor(
+                    pool, convert_export, path, str(self.output_dir),
+                    str(self.owners_path) if self.owners_path else None
+                )
+                job.output = job.result.get('output')
+                job.status, job.error = DONE, None
+                logger.info("Converted %s -> %s", path, job.output)
+            except asyncio.CancelledError:
+                # Left as running in the state file, so the next run picks it up again
+                raise
+            except Exception as e:
+                job.status, job.error = FAILED, f"{type(e).__name__}: {e}"
+                logger.error("Conversion of %s failed: %s", path, job.error)
+            finally:
+                self.metrics.running -= 1
+            job.finished_at = time.time()
+            self.store.put(job)
+            self.metrics.record(job)
+            self._queued.discard(path)
+
+    def _write_metrics(self) -> None:
+        snapshot = self.metrics.snapshot(self.queue_depth())
+        self.metrics_path.write_text(json.dumps(snapshot, indent=2), encoding='utf-8')
+        logger.debug("Service metrics: %s", snapshot)
+
+
+def main() -> None:
+    from src.utils.custom_logging.setup_logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inbox', type=Path)
+    parser.add_argument('output_dir', type=Path)
+    parser.add_argument('--state', type=Path, help='job state file (default: OUTPUT_DIR/watch_folder_state.json)')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    parser.add_argument('--settle-time', type=float, default=5.0,
+                        help='seconds a file must stay unchanged before it is converted')
+    parser.add_argument('--owners', type=Path, help='JSON file with known owner names and per-chat owners')
+    args = parser.parse_args()
+
+    setup_logging()
+    service = WatchFolderService(
+        args.inbox, args.output_dir, args.state, args.workers, args.poll_interval, args.settle_time, args.owners
+    )
+    try:
+        asyncio.run(service.run())
+    except KeyboardInterrupt:
+        logger.info("Stopped; unfinished jobs resume on the next start")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+# src/services/worker_daemon.py
+
+"""
+Daemon keeping warm conversion workers behind a local Unix socket.
+
+Starting a Python process and importing rich, chardet and the converter
+costs more than converting a small chat. The daemon pays that once: its
+worker processes import everything, set up logging and compile the format
+regexes at startup, then serve jobs sent by worker_client.py.
+
+Usage:
+    python -m src.services.worker_daemon [--socket PATH] [--workers N]
+
+Protocol: one JSON object per line and connection. Requests are
+{"command": "convert", "chat": PATH, "output": PATH|null},
+{"command": "package", "export": ZIP, "output": PATH|null},
+{"command": "ping"} or {"command": "shutdown"}; responses carry "ok" and
+either the result or "error".
+"""
+
+import argparse
+import errno
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_BYTES = 64 * 1024
+# Unix sockets and per-user socket names are unavailable on Windows, where the daemon cannot run
+UNIX_SOCKETS_AVAILABLE = hasattr(socket, 'AF_UNIX') and hasattr(os, 'getuid')
+# Keeps the module importable where socketserver has no UnixStreamServer
+_UnixStreamServer = getattr(socketserver, 'UnixStreamServer', socketserver.TCPServer)
+
+
+def default_socket_path() -> Optional[Path]:
+    """
+    Where the daemon listens unless told otherwise; None where Unix sockets are unavailable.
+
+    worker_client.py derives the same default, so both ends meet without configuration.
+    """
+    if not UNIX_SOCKETS_AVAILABLE:
+        return None
+    configured = os.environ.get('WHATSAPP_WORKER_SOCKET')
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / f"whatsapp-archive-worker-{os.getuid()}.sock"
+
+
+def _warm_worker() -> None:
+    """Pay the per-process start-up costs before the first job arrives."""
+    from src.utils.custom_logging.setup_logging import setup_logging
+    from src.configuration_and_enums.whatsapp_format_patterns import precompile_formats
+    import src.main_orchastrator  # noqa: F401  imports rich, chardet and the whole converter
+
+    setup_logging()
+    precompile_formats()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def run_job(request: Dict) -> Dict:
+    """Execute one convert or package request in a worker process."""
+    from src.main_orchastrator import WhatsAppChatConverter
+
+    started = time.perf_counter()
+    converter = WhatsAppChatConverter()
+    result: Dict = {'worker_pid': os.getpid()}
+    if request['command'] == 'convert':
+        output = request.get('output')
+        output_path = converter.convert_chatfile_to_html(Path(request['chat']), Path(output) if output else None)
+        result['output'] = str(output_path)
+    else:
+        export = Path(request['export'])
+        output = Path(request['output']) if request.get('output') else export.with_name(f"{export.stem}_archive.zip")
+        report = converter.convert_zip_export(export, output)
+        result['output'] = str(output)
+        result['packaging'] = asdict(report)
+    result['metrics'] = converter.last_metrics.to_dict() if converter.last_metrics else {}
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class WorkerRequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request line, runs it on the pool and writes one JSON response line."""
+
+    def handle(self) -> None:
+        started = time.perf_counter()
+        try:
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            request = json.loads(line)
+            response = self.server.execute(request)
+        except Exception as e:
+            response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        response['round_trip_seconds'] = time.perf_counter() - started
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class WorkerDaemon(socketserver.ThreadingMixIn, _UnixStreamServer):
+    """
+    Unix socket server dispatching conversion jobs to a pool of pre-warmed processes.
+
+    Each connection is handled on its own thread, so up to `workers` jobs run
+    at once and further ones wait for a free worker.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path = None, workers: int = None):
+        if not UNIX_SOCKETS_AVAILABLE:
+            raise OSError("The worker daemon needs Unix domain sockets, which this platform lacks")
+        self.socket_path = Path(socket_path or default_socket_path())
+        self._remove_stale_socket(self.socket_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self._counter_lock = threading.Lock()
+        self._bound = False
+        # Binds and listens; on failure it closes the server itself
+        super().__init__(str(self.socket_path), WorkerRequestHandler)
+        self._bound = True
+        try:
+            os.chmod(self.socket_path, 0o600)
+            # Spawned, not forked: the logging listener thread may hold a lock at fork time
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_warm_worker,
+            )
+            # Start every worker now instead of on the first jobs
+            for future in [self.pool.submit(_ping) for _ in range(self.workers)]:
+                future.result()
+        except BaseException:
+            self.server_close()
+            raise
+
+    @staticmethod
+    def _remove_stale_socket(socket_path: Path) -> None:
+        """Delete a socket left behind by a daemon that did not shut down cleanly; refuse to take over a live one."""
+        try:
+            mode = socket_path.lstat().st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(errno.EEXIST, f"{socket_path} exists and is not a socket")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(socket_path))
+            except ConnectionRefusedError:
+                socket_path.unlink()
+                return
+        raise OSError(errno.EADDRINUSE, f"A worker daemon is already listening on {socket_path}")
+
+    def execute(self, request: Dict) -> Dict:
+        command = request.get('command')
+        if command == 'ping':
+            return {'ok': True, 'workers': self.workers, 'completed': self.jobs_completed, 'failed': self.jobs_failed}
+        if command == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}
+        if command not in ('convert', 'package'):
+            return {'ok': False, 'error': f"Unknown command: {command!r}"}
+        try:
+            result = self.pool.submit(run_job, request).result()
+        except Exception as e:
+            with self._counter_lock:
+                self.jobs_failed += 1
+            logger.error("Job %s failed: %s", request, e)
+            return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        with self._counter_lock:
+            self.jobs_completed += 1
+        return {'ok': True, **result}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+        # A failed bind left nothing of ours at the path
+        if self._bound:
+            self.socket_path.unlink(missing_ok=True)
+
+
+def main(argv: Optional[list] = None) -> None:
+    from src.utils.custom_logging.setup_logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', type=Path, default=default_socket_path())
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    daemon = WorkerDaemon(args.socket, args.workers)
+    logger.info("%d warm worker(s) listening on %s", daemon.workers, daemon.socket_path)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+if __name__ == '__main__':
+    main()
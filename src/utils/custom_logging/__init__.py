@@ -1,6 +1,6 @@
 # src/utils/custom_logging/__init__.py
-from .setup_logging import setup_logging
-from .decorators import error_handler, temporary_log_level
+from .setup_logging import setup_logging, get_ring_buffer
+from .decorators import error_handler, temporary_log_level, stage_timer, timed_stage, StageMetrics
 from .setup_file_logging import get_update_logger, enable_file_logging, ConditionalFileHandler
 
 import logging
@@ -8,4 +8,4 @@ import logging
 # Create a pre-configured logger
 logger = logging.getLogger(__name__)
 
-__all__ = ['setup_logging', 'error_handler', 'temporary_log_level', 'logger', 'get_update_logger', 'enable_file_logging', 'ConditionalFileHandler']
+__all__ = ['setup_logging', 'get_ring_buffer', 'error_handler', 'temporary_log_level', 'stage_timer', 'timed_stage', 'StageMetrics', 'logger', 'get_update_logger', 'enable_file_logging', 'ConditionalFileHandler']
@@ -19,6 +19,6 @@ SIMPLE_LOG_FORMAT = f'%({LOG_ASCTIME})s - %({LOG_LEVEL})s - %({LOG_MESSAGE})s'
 
 # Default logging configuration
 DEFAULT_LOGGING_CONFIG = {
-    'level': 'DEBUG',
+    'level': 'INFO',
     'ring_buffer_capacity': 100,
 }
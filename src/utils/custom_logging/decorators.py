@@ -1,10 +1,34 @@
 import logging
-from typing import Any, Callable
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
 import functools
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class StageMetrics:
+    """Accumulated cost of one named processing stage."""
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    items: int = 0
+    bytes: int = 0
+    calls: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'items': self.items,
+            'bytes': self.bytes,
+            'calls': self.calls,
+            'items_per_second': self.items / self.wall_seconds if self.wall_seconds else 0.0,
+            'mb_per_second': self.bytes / (1024 * 1024) / self.wall_seconds if self.wall_seconds else 0.0,
+        }
+
 # Decorator function
 def error_handler(func: Callable[..., Any]) -> Callable[..., Any]:
     """A decorator for handling exceptions and logging errors."""
@@ -27,3 +51,61 @@ def temporary_log_level(logger, level):
         yield
     finally:
         logger.setLevel(old_level)
+
+# Callbacks notified with each StageMetrics when a timed stage ends, e.g. by profilers
+_stage_listeners: List[Callable[[StageMetrics], None]] = []
+
+def add_stage_listener(listener: Callable[[StageMetrics], None]) -> None:
+    _stage_listeners.append(listener)
+
+def remove_stage_listener(listener: Callable[[StageMetrics], None]) -> None:
+    if listener in _stage_listeners:
+        _stage_listeners.remove(listener)
+
+@contextmanager
+def stage_timer(
+    stages: Optional[Dict[str, StageMetrics]],
+    name: str,
+    items: int = 0,
+    bytes: int = 0
+) -> Iterator[StageMetrics]:
+    """
+    Record wall time, process CPU time, item count and bytes of a stage into stages[name].
+
+    The yielded StageMetrics may be updated inside the block, e.g. once the
+    number of items is known. Passing stages=None disables recording.
+    """
+    metrics = stages.setdefault(name, StageMetrics(name)) if stages is not None else StageMetrics(name)
+    metrics.items += items
+    metrics.bytes += bytes
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        yield metrics
+    finally:
+        metrics.wall_seconds += time.perf_counter() - wall_started
+        metrics.cpu_seconds += time.process_time() - cpu_started
+        metrics.calls += 1
+        for listener in list(_stage_listeners):
+            listener(metrics)
+
+def timed_stage(name: str, count_items: Optional[Callable[[Any], int]] = None) -> Callable:
+    """
+    Decorator timing a method as stage `name` into the instance's `stage_metrics` dict.
+
+    count_items, if given, maps the method's return value to an item count.
+    Methods on instances without a stage_metrics dict run untimed.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            stages = getattr(self, 'stage_metrics', None)
+            if stages is None:
+                return func(self, *args, **kwargs)
+            with stage_timer(stages, name) as metrics:
+                result = func(self, *args, **kwargs)
+                if count_items is not None:
+                    metrics.items += count_items(result)
+                return result
+        return wrapper
+    return decorator
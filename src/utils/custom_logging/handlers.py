@@ -1,28 +1,30 @@
 # src/utils/custom_logging/handlers.py
 import logging
+from collections import deque
 from .constants import DETAILED_LOG_FORMAT, SIMPLE_LOG_FORMAT
 from rich.console import Console
 from rich.theme import Theme
 
 class RingBuffer(logging.StreamHandler):
+    """Keeps the last `capacity` records; they are only formatted when read with get()."""
     def __init__(self, capacity: int) -> None:
         super().__init__()
         self.capacity = capacity
-        self.buffer = []
+        self.buffer: deque = deque(maxlen=capacity)
         self.detailed_formatter = logging.Formatter(DETAILED_LOG_FORMAT)
         self.simple_formatter = logging.Formatter(SIMPLE_LOG_FORMAT)
 
     def emit(self, record: logging.LogRecord) -> None:
-        if record.levelno <= logging.DEBUG:
-            msg = self.detailed_formatter.format(record)
-        else:
-            msg = self.simple_formatter.format(record)
-        self.buffer.append(msg)
-        if len(self.buffer) > self.capacity:
-            self.buffer.pop(0)
+        self.buffer.append(record)
 
     def get(self) -> list[str]:
-        return self.buffer
+        with self.lock:
+            records = list(self.buffer)
+        return [
+            self.detailed_formatter.format(record) if record.levelno <= logging.DEBUG
+            else self.simple_formatter.format(record)
+            for record in records
+        ]
 
 class DetailedRichHandler(logging.Handler):
     def __init__(self, level=logging.NOTSET):
@@ -1,17 +1,27 @@
 # src/utils/custom_logging/setup_logging.py
+import atexit
 import logging
 import logging.config
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict, Optional
 from .constants import DEFAULT_LOGGING_CONFIG, DETAILED_LOG_FORMAT, SIMPLE_LOG_FORMAT
 from src.utils.custom_logging.handlers import RingBuffer, DetailedRichHandler
 
 logger = logging.getLogger(__name__)
 
+# Background listener feeding the console and ring buffer handlers
+_queue_listener: Optional[QueueListener] = None
+
 def setup_logging(config: Optional[Dict[str, Any]] = None) -> None:
     """
     Set up logging configuration.
 
+    The root logger only enqueues records; formatting and console output
+    happen on a background QueueListener thread, so logging calls do not
+    block on terminal I/O.
+
     Args:
         config (Optional[Dict[str, Any]]): Custom logging configuration.
                                             If None, DEFAULT_LOGGING_CONFIG is used.
@@ -37,6 +47,7 @@ def setup_logging(config: Optional[Dict[str, Any]] = None) -> None:
 
     config['level'] = env_log_level
 
+    log_queue = queue.SimpleQueue()
     logging_config = {
         'version': 1,
         'disable_existing_loggers': False,
@@ -45,29 +56,30 @@ def setup_logging(config: Optional[Dict[str, Any]] = None) -> None:
             'simple': {'format': SIMPLE_LOG_FORMAT},
         },
         'handlers': {
-            'console': {
-                '()': DetailedRichHandler,
-                'level': config['level'],
-            },
-            'ring_buffer': {
-                '()': RingBuffer,
-                'capacity': config['ring_buffer_capacity'],
+            'queue': {
+                '()': QueueHandler,
+                'queue': log_queue,
                 'level': config['level'],
             },
         },
         'loggers': {
             '': {  # Root logger
-                'handlers': ['console', 'ring_buffer'],
+                'handlers': ['queue'],
                 'level': config['level'],
             },
         },
     }
 
     try:
+        console_handler = DetailedRichHandler(level=config['level'])
+        ring_buffer = RingBuffer(capacity=config['ring_buffer_capacity'])
+        ring_buffer.setLevel(config['level'])
         logging.config.dictConfig(logging_config)
     except (ValueError, TypeError, AttributeError) as e:
         raise ValueError(f"Invalid logging configuration: {str(e)}") from e
 
+    _start_queue_listener(log_queue, console_handler, ring_buffer)
+
     # Suppress unnecessary logging from other libraries
     libraries_to_suppress = ["urllib3", "httpx", "diffusers", "torch"]
     for library in libraries_to_suppress:
@@ -84,3 +96,27 @@ def setup_logging(config: Optional[Dict[str, Any]] = None) -> None:
     logging_config['loggers']['']['handlers'].append('file')
 
     logger.info("Logging setup completed successfully")
+
+
+def _start_queue_listener(log_queue: queue.SimpleQueue, *handlers: logging.Handler) -> None:
+    """Replace any previous listener with one dispatching log_queue to handlers."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+    else:
+        atexit.register(_stop_queue_listener)
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+
+def _stop_queue_listener() -> None:
+    """Flush queued records at interpreter exit."""
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+
+def get_ring_buffer() -> Optional[RingBuffer]:
+    """Return the ring buffer handler installed by setup_logging, if any."""
+    if _queue_listener is None:
+        return None
+    return next((h for h in _queue_listener.handlers if isinstance(h, RingBuffer)), None)
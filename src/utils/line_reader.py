@@ -0,0 +1,84 @@
+# src/utils/line_reader.py
+
+import codecs
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# Characters str.splitlines() treats as line boundaries
+LINE_BREAK_CHARS = '\r\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+_LINE_BREAKS = tuple(LINE_BREAK_CHARS)
+
+
+def iter_decoded_chunks(
+    path: Path,
+    encoding: str,
+    errors: str = 'replace',
+    chunk_size: int = 1 << 20,
+    on_bytes: Optional[Callable[[int], object]] = None
+) -> Iterator[str]:
+    """
+    Decode a file chunk by chunk with the codec's incremental decoder.
+
+    Only one raw chunk and its text are held at a time. Byte sequences cut by
+    a chunk edge, such as half of a UTF-16 surrogate pair or of a multi-byte
+    UTF-8 character, are kept by the decoder until the next chunk completes
+    them; a BOM is consumed as read_text() would. on_bytes, if given, receives
+    the number of bytes read so far after every chunk.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    bytes_read = 0
+    with open(path, 'rb', buffering=0) as f:
+        while raw := f.read(chunk_size):
+            bytes_read += len(raw)
+            text = decoder.decode(raw)
+            if on_bytes is not None:
+                on_bytes(bytes_read)
+            if text:
+                yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def split_line_batches(chunks: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Split a stream of text chunks into lists of lines.
+
+    Lines are split like str.splitlines() on the whole text, including lines
+    and \\r\\n pairs that straddle chunk edges.
+    """
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(keepends=True)
+        last = lines[-1]
+        # The final line may continue in the next chunk, as may a trailing \r of \r\n
+        pending = lines.pop() if last.endswith('\r') or not last.endswith(_LINE_BREAKS) else ''
+        if lines:
+            yield [line.rstrip(LINE_BREAK_CHARS) for line in lines]
+    if pending:
+        yield pending.splitlines()
+
+
+def iter_line_batches(
+    path: Path,
+    encoding: str,
+    errors: str = 'replace',
+    chunk_size: int = 1 << 20,
+    on_bytes: Optional[Callable[[int], object]] = None
+) -> Iterator[List[str]]:
+    """Decode a file incrementally and yield its lines in batches, one batch per decoded chunk."""
+    return split_line_batches(iter_decoded_chunks(path, encoding, errors, chunk_size, on_bytes))
+
+
+def read_lines(
+    path: Path,
+    encoding: str,
+    errors: str = 'replace',
+    chunk_size: int = 1 << 20,
+    on_bytes: Optional[Callable[[int], object]] = None
+) -> List[str]:
+    """All lines of a file, as read_text().splitlines() gives them but without holding the whole text."""
+    lines: List[str] = []
+    for batch in iter_line_batches(path, encoding, errors, chunk_size, on_bytes):
+        lines.extend(batch)
+    return lines
@@ -0,0 +1,231 @@
+# src/utils/profiling.py
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from src.utils.custom_logging.decorators import StageMetrics, add_stage_listener, remove_stage_listener
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it cannot be read cheaply."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is the peak, in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class RSSSampler:
+    """Samples the process RSS on a background thread."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[tuple] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @property
+    def peak_bytes(self) -> Optional[int]:
+        values = [rss for _, rss in self.samples if rss is not None]
+        return max(values) if values else None
+
+    def _run(self) -> None:
+        while True:
+            self.samples.append((time.perf_counter() - self._started, current_rss_bytes()))
+            if self._stop.wait(self.interval):
+                return
+
+
+class ConversionProfiler:
+    """
+    Context manager running a conversion under cProfile and/or tracemalloc.
+
+    While active, stages recorded with stage_timer are aggregated by name
+    (calls, wall time, traced memory peak, RSS). Backends time a stage once
+    per shard or chunk, so tracemalloc snapshots, which are slow and allocate
+    themselves, are only taken when a stage name ends for the first time and
+    on exit. The top allocation sites between two snapshots are reported as
+    one phase, naming every stage that ended in it. On exit the following
+    files are written to output_dir:
+        conversion.prof      cProfile stats (load with pstats or snakeviz)
+        profile_report.json  per-stage memory, allocation phases and RSS samples
+        profile_report.txt   human-readable summary to attach to bug reports
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        cpu: bool = True,
+        memory: bool = True,
+        rss_interval: float = 0.05,
+        top_allocations: int = 10,
+        traceback_depth: int = 1
+    ):
+        self.output_dir = Path(output_dir)
+        self.cpu = cpu
+        self.memory = memory
+        self.top_allocations = top_allocations
+        self.traceback_depth = traceback_depth
+        self.rss_sampler = RSSSampler(rss_interval)
+        self.stages: List[Dict[str, Any]] = []
+        self.allocation_phases: List[Dict[str, Any]] = []
+        self._stages_by_name: Dict[str, Dict[str, Any]] = {}
+        # Last StageMetrics seen per name and its wall time then, to add only the new time
+        self._last_metrics: Dict[str, tuple] = {}
+        # Stage names ended since the last snapshot
+        self._phase: List[str] = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+
+    def __enter__(self) -> 'ConversionProfiler':
+        self.stages = []
+        self.allocation_phases = []
+        self._stages_by_name = {}
+        self._last_metrics = {}
+        self._phase = []
+        self._snapshot = None
+        self.rss_sampler = RSSSampler(self.rss_sampler.interval)
+        if self.memory:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start(self.traceback_depth)
+            tracemalloc.reset_peak()
+            self._snapshot = self._take_snapshot()
+        add_stage_listener(self._on_stage_end)
+        self.rss_sampler.start()
+        self._started = time.perf_counter()
+        if self.cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        wall_seconds = time.perf_counter() - self._started
+        remove_stage_listener(self._on_stage_end)
+        self.rss_sampler.stop()
+        if self._phase and self._tracing_allocations:
+            self._close_phase()
+        if self.memory and self._started_tracing:
+            tracemalloc.stop()
+        self._write_reports(wall_seconds)
+
+    def _on_stage_end(self, metrics: StageMetrics) -> None:
+        name = metrics.name
+        stage = self._stages_by_name.get(name)
+        first_end = stage is None
+        if first_end:
+            stage = self._stages_by_name[name] = {'name': name, 'calls': 0, 'wall_seconds': 0.0}
+            self.stages.append(stage)
+        # Converter stages accumulate into one StageMetrics per conversion; count each call's time once
+        previous, previous_seconds = self._last_metrics.get(name, (None, 0.0))
+        stage['wall_seconds'] += metrics.wall_seconds - (previous_seconds if previous is metrics else 0.0)
+        self._last_metrics[name] = (metrics, metrics.wall_seconds)
+        stage['calls'] += 1
+        stage['rss_bytes'] = current_rss_bytes()
+        if name not in self._phase:
+            self._phase.append(name)
+        if self._tracing_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            stage['traced_current_bytes'] = current
+            stage['traced_peak_bytes'] = max(stage.get('traced_peak_bytes', 0), peak)
+            tracemalloc.reset_peak()
+            if first_end:
+                self._close_phase()
+
+    @property
+    def _tracing_allocations(self) -> bool:
+        # tracemalloc may also be tracing for someone else, e.g. PYTHONTRACEMALLOC, with memory off
+        return self.memory and self._snapshot is not None and tracemalloc.is_tracing()
+
+    def _close_phase(self) -> None:
+        """Attribute the allocations since the previous snapshot to the stages that ended since then."""
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self._snapshot, 'lineno')[:self.top_allocations]
+        self.allocation_phases.append({
+            'stages': self._phase,
+            'top_allocations': [
+                {'site': str(stat.traceback[0]), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in stats
+            ],
+        })
+        self._snapshot = snapshot
+        self._phase = []
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _write_reports(self, wall_seconds: float) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        report = {
+            'wall_seconds': wall_seconds,
+            'peak_rss_bytes': self.rss_sampler.peak_bytes,
+            'rss_samples': self.rss_sampler.samples,
+            'stages': self.stages,
+            'allocation_phases': self.allocation_phases,
+        }
+        (self.output_dir / 'profile_report.json').write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+        lines = [
+            f"Wall time: {wall_seconds:.3f}s",
+            f"Peak RSS: {self._format_bytes(self.rss_sampler.peak_bytes)}",
+            "",
+        ]
+        for stage in self.stages:
+            lines.append(
+                f"[{stage['name']}] {stage['wall_seconds']:.3f}s in {stage['calls']} call(s), "
+                f"traced peak {self._format_bytes(stage.get('traced_peak_bytes'))}, "
+                f"RSS {self._format_bytes(stage['rss_bytes'])}"
+            )
+        for phase in self.allocation_phases:
+            lines.append(f"\nAllocations during {', '.join(phase['stages'])}:")
+            for allocation in phase['top_allocations']:
+                lines.append(
+                    f"    {allocation['size_diff']:>+12,d} B {allocation['count_diff']:>+9,d} blocks  {allocation['site']}"
+                )
+        if self._profile is not None:
+            profile_path = self.output_dir / 'conversion.prof'
+            self._profile.dump_stats(profile_path)
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats('cumulative').print_stats(40)
+            lines += ["", stream.getvalue()]
+        (self.output_dir / 'profile_report.txt').write_text("\n".join(lines), encoding='utf-8')
+        logger.info("Profile written to %s", self.output_dir)
+
+    @staticmethod
+    def _format_bytes(value: Optional[int]) -> str:
+        return f"{value / (1024 * 1024):.1f} MB" if value is not None else 'n/a'
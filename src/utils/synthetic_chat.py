@@ -0,0 +1,178 @@
+# src/utils/synthetic_chat.py
+
+"""
+Deterministic synthetic WhatsApp chat exports for benchmarks.
+
+Usage:
+    python -m src.utils.synthetic_chat OUTPUT --format ios_us_bracket_12h --messages 100000
+"""
+
+import argparse
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+from src.configuration_and_enums.whatsapp_formats import WhatsAppFormat
+from src.configuration_and_enums.whatsapp_format_patterns import FORMATS
+
+# Timestamp prefix of a message's first line per format, filled from the fields of _timestamp_fields
+LINE_PREFIXES: Dict[WhatsAppFormat, str] = {
+    WhatsAppFormat.ANDROID_US: '{m}/{d}/{y}, {I}:{M} {p} - ',
+    WhatsAppFormat.ANDROID_EU: '{d}/{m}/{Y}, {H}:{M} - ',
+    WhatsAppFormat.ANDROID_24H: '{d}/{m}/{Y}, {H}:{M}:{S} - ',
+    WhatsAppFormat.IOS_STANDARD: '[{d}/{m}/{Y}, {H}:{M}:{S}] ',
+    WhatsAppFormat.IOS_ALT: '[{d}/{m}/{Y}, {I}:{M}:{S} {p}] ',
+    WhatsAppFormat.IOS_US_BRACKET_12H: '[{Y}-{m}-{d}, {i}:{M}:{S} {p}] ',
+    WhatsAppFormat.EUROPEAN_DOT: '{d}.{m}.{y}, {H}:{M} - ',
+    WhatsAppFormat.EUROPEAN_DASH: '{Y}-{m}-{d} {H}:{M}:{S} - ',
+    WhatsAppFormat.ASIAN_STANDARD: '{Y}/{m}/{d} {H}:{M} - ',
+    WhatsAppFormat.UK_FORMAT: '{d}/{m}/{Y}, {H}:{M} - ',
+    WhatsAppFormat.BRAZILIAN: '{d}/{m}/{Y} {H}:{M} - ',
+    WhatsAppFormat.INDIAN: '{d}/{m}/{y}, {i}:{M} {pl} - ',
+    WhatsAppFormat.GENERIC_24H: '{d}/{m}/{y} {H}:{M} - ',
+    WhatsAppFormat.US_BRACKET_AMPMPM: '[{Y}-{m}-{d}, {i}:{M}:{S}{p}] ',
+    WhatsAppFormat.CUSTOM_COMMA_TIME: '{Y}-{m}-{d}, {I}{M}{S} {p} ',
+    WhatsAppFormat.US_COMMA_COMPACT: '{Y}-{m}-{d}, {I}{M}{S} {p} ',
+    WhatsAppFormat.US_COMPACT_NOSEP: '{Y}-{m}-{d}, {I}{M}{S} {p} ',
+    WhatsAppFormat.BRACKETED_US: '[{Y}-{m}-{d}, {i}:{M}:{S} {p}] ',
+}
+
+NAMES = (
+    'Alice Martin', 'Bob', 'Chloé Dubois', 'Dmitri Ivanov', 'Eve', 'Farhan Rahman', 'Grace Lee',
+    'Hiroshi Tanaka', 'Ingrid', 'José Álvarez', 'Kwame Mensah', 'Lena Müller', 'Mohammed Ali', 'Nadia',
+)
+WORDS = (
+    'ok', 'yes', 'no', 'see', 'you', 'soon', 'on', 'my', 'way', 'lol', 'thanks', 'dinner', 'tonight',
+    'meeting', 'at', 'the', 'office', 'call', 'me', 'later', 'photo', 'weekend', 'R&D', '<b>not bold</b>',
+)
+LEFT_TO_RIGHT_MARK = '\u200e'
+NARROW_NO_BREAK_SPACE = '\u202f'
+NOISY_WORDS = ('😂', '👍', 'café', 'naïve', 'Привет', 'こんにちは', 'שלום', LEFT_TO_RIGHT_MARK + 'edited')
+ATTACHMENT_KINDS = (('PHOTO', 'jpg'), ('VIDEO', 'mp4'), ('AUDIO', 'opus'), ('DOC', 'pdf'))
+
+
+@dataclass
+class SyntheticChatConfig:
+    """Knobs of a generated chat; the same config and seed always produce the same file."""
+    messages: int = 10_000
+    participants: int = 4
+    multiline_ratio: float = 0.1
+    attachment_ratio: float = 0.05
+    unicode_noise_ratio: float = 0.05
+    seed: int = 42
+    start: datetime = datetime(2020, 1, 1, 8, 0, 0)
+
+
+class SyntheticChatGenerator:
+    """
+    Streams a chat export in one of the FORMATS, line by line.
+
+    Unicode noise mixes in the characters real exports contain: U+200E marks
+    before attachments and in text, U+202F before AM/PM (only where the
+    format's regex accepts it) and non-ASCII words.
+    """
+
+    def __init__(self, whatsapp_format: WhatsAppFormat, config: SyntheticChatConfig = None):
+        if whatsapp_format not in LINE_PREFIXES:
+            raise ValueError(f"No synthetic line layout for {whatsapp_format}")
+        self.whatsapp_format = whatsapp_format
+        self.config = config or SyntheticChatConfig()
+        self.prefix = LINE_PREFIXES[whatsapp_format]
+        # Formats without a "sender:" separator put the sender straight after the timestamp
+        self.sender_separator = ' ' if FORMATS[whatsapp_format].separator == ' ' else ': '
+        self.participants: List[str] = [
+            NAMES[i % len(NAMES)] + (f' {i // len(NAMES) + 1}' if i >= len(NAMES) else '')
+            for i in range(max(1, self.config.participants))
+        ]
+        pattern = FORMATS[whatsapp_format].pattern
+        sample = self.prefix.replace(' {p', NARROW_NO_BREAK_SPACE + '{p').format(**self._timestamp_fields(self.config.start))
+        self._narrow_space_allowed = bool(pattern.match(f"{sample}Bob{self.sender_separator}hi"))
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the chat's lines, without line endings."""
+        config = self.config
+        rng = random.Random(config.seed)
+        timestamp = config.start
+        for index in range(config.messages):
+            timestamp += timedelta(seconds=int(rng.expovariate(1 / 90)) + 1)
+            noisy = rng.random() < config.unicode_noise_ratio
+            prefix = self.prefix
+            if noisy and self._narrow_space_allowed:
+                prefix = prefix.replace(' {p', NARROW_NO_BREAK_SPACE + '{p')
+            sender = rng.choice(self.participants)
+            yield f"{prefix.format(**self._timestamp_fields(timestamp))}{sender}{self.sender_separator}{self._content(rng, index, timestamp, noisy)}"
+            if rng.random() < config.multiline_ratio:
+                for _ in range(rng.randint(1, 4)):
+                    yield self._text(rng, noisy)
+
+    def write(self, path: Path, encoding: str = 'utf-8', newline: str = '\n', buffer_lines: int = 10_000) -> int:
+        """Write the chat to path in batches of lines, so memory stays flat at any size. Returns the line count."""
+        count = 0
+        batch: List[str] = []
+        with open(path, 'w', encoding=encoding, newline=newline) as f:
+            for line in self.iter_lines():
+                batch.append(line)
+                if len(batch) >= buffer_lines:
+                    f.write('\n'.join(batch) + '\n')
+                    count += len(batch)
+                    batch.clear()
+            if batch:
+                f.write('\n'.join(batch) + '\n')
+                count += len(batch)
+        return count
+
+    def _content(self, rng: random.Random, index: int, timestamp: datetime, noisy: bool) -> str:
+        if rng.random() < self.config.attachment_ratio:
+            kind, suffix = rng.choice(ATTACHMENT_KINDS)
+            name = f"{index:08d}-{kind}-{timestamp:%Y-%m-%d-%H-%M-%S}.{suffix}"
+            return f"{LEFT_TO_RIGHT_MARK if noisy else ''}<attached: {name}>"
+        return self._text(rng, noisy)
+
+    @staticmethod
+    def _text(rng: random.Random, noisy: bool) -> str:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 14))]
+        if noisy:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(NOISY_WORDS))
+        return ' '.join(words)
+
+    @staticmethod
+    def _timestamp_fields(timestamp: datetime) -> Dict[str, str]:
+        hour12 = timestamp.hour % 12 or 12
+        return {
+            'Y': f'{timestamp.year:04d}', 'y': f'{timestamp.year % 100:02d}',
+            'm': f'{timestamp.month:02d}', 'd': f'{timestamp.day:02d}',
+            'H': f'{timestamp.hour:02d}', 'I': f'{hour12:02d}', 'i': str(hour12),
+            'M': f'{timestamp.minute:02d}', 'S': f'{timestamp.second:02d}',
+            'p': 'AM' if timestamp.hour < 12 else 'PM', 'pl': 'am' if timestamp.hour < 12 else 'pm',
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', type=Path)
+    parser.add_argument('--format', default=WhatsAppFormat.IOS_US_BRACKET_12H.value,
+                        choices=[fmt.value for fmt in LINE_PREFIXES])
+    parser.add_argument('--messages', type=int, default=10_000)
+    parser.add_argument('--participants', type=int, default=4)
+    parser.add_argument('--multiline-ratio', type=float, default=0.1)
+    parser.add_argument('--attachment-ratio', type=float, default=0.05)
+    parser.add_argument('--unicode-noise-ratio', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--encoding', default='utf-8')
+    args = parser.parse_args()
+
+    config = SyntheticChatConfig(
+        messages=args.messages,
+        participants=args.participants,
+        multiline_ratio=args.multiline_ratio,
+        attachment_ratio=args.attachment_ratio,
+        unicode_noise_ratio=args.unicode_noise_ratio,
+        seed=args.seed,
+    )
+    lines = SyntheticChatGenerator(WhatsAppFormat(args.format), config).write(args.output, args.encoding)
+    print(f"Wrote {lines:,} lines to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
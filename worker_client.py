@@ -0,0 +1,109 @@
+# worker_client.py
+
+"""
+Thin client sending conversions to a running worker daemon.
+
+Only the standard library is imported, so each call starts in a few
+milliseconds; the converter itself stays loaded in the daemon, started with:
+    python -m src.services.worker_daemon
+
+Usage:
+    python worker_client.py convert CHAT.txt [--output OUT.html]
+    python worker_client.py package EXPORT.zip [--output ARCHIVE.zip]
+    python worker_client.py ping | shutdown
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def default_socket_path() -> Optional[Path]:
+    """Same default as src/services/worker_daemon.py; None where Unix sockets are unavailable."""
+    if not (hasattr(socket, 'AF_UNIX') and hasattr(os, 'getuid')):
+        return None
+    configured = os.environ.get('WHATSAPP_WORKER_SOCKET')
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / f"whatsapp-archive-worker-{os.getuid()}.sock"
+
+
+class WorkerClient:
+    """Sends one request per connection to the worker daemon."""
+
+    def __init__(self, socket_path: Path = None, timeout: float = None):
+        self.socket_path = socket_path or default_socket_path()
+        if self.socket_path is None:
+            raise OSError("The worker daemon needs Unix domain sockets, which this platform lacks")
+        self.timeout = timeout
+
+    def request(self, payload: Dict) -> Dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.socket_path))
+            sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as response:
+                return json.loads(response.readline())
+
+    def convert(self, chat: Path, output: Path = None) -> Dict:
+        return self.request({
+            'command': 'convert',
+            'chat': str(chat.resolve()),
+            'output': str(output.resolve()) if output else None,
+        })
+
+    def package(self, export: Path, output: Path = None) -> Dict:
+        return self.request({
+            'command': 'package',
+            'export': str(export.resolve()),
+            'output': str(output.resolve()) if output else None,
+        })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', type=Path, default=default_socket_path())
+    parser.add_argument('--json', action='store_true', help='print the full JSON response')
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help='convert a chat .txt file to HTML')
+    convert.add_argument('chat', type=Path)
+    convert.add_argument('--output', type=Path)
+    package = commands.add_parser('package', help='convert a ZIP export into an archive ZIP')
+    package.add_argument('export', type=Path)
+    package.add_argument('--output', type=Path)
+    commands.add_parser('ping', help='check the daemon is running')
+    commands.add_parser('shutdown', help='stop the daemon')
+    args = parser.parse_args()
+
+    client = WorkerClient(args.socket)
+    try:
+        if args.command == 'convert':
+            response = client.convert(args.chat, args.output)
+        elif args.command == 'package':
+            response = client.package(args.export, args.output)
+        else:
+            response = client.request({'command': args.command})
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No worker daemon listening on {args.socket}; start it with: python -m src.services.worker_daemon",
+              file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(response, indent=2))
+    elif not response.get('ok'):
+        print(f"Error: {response.get('error')}", file=sys.stderr)
+    elif 'output' in response:
+        metrics = response.get('metrics', {})
+        print(f"{response['output']} ({metrics.get('messages', 0):,} messages in {response['seconds']:.3f}s)")
+    else:
+        print(json.dumps(response))
+    return 0 if response.get('ok') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())